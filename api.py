@@ -9,16 +9,75 @@ import pandas as pd
 import os
 import sys
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Add project root to path so the src package is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from model import load_model
-from data import load_data, prepare_features
+from src.batching import MicroBatcher
+from src.drift import RetrainTrigger
+from src.data import load_data
+from src.ensemble import ABRouter
+from src.registry import ModelRegistry
+from src.serving import ServingState, predict_records
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for API access
 
-MODEL_PATH = 'models/xgb_model.joblib'
+MODEL_PATH = os.environ.get('MODEL_PATH', 'models/xgb_model.joblib')
+HISTORY_PATH = os.environ.get('HISTORY_PATH')
+# Set MODEL_VERSION to a registry version id (pinned) or alias such as "production"
+# (follows promotions); unset serves MODEL_PATH
+MODEL_VERSION = os.environ.get('MODEL_VERSION')
+REGISTRY_PATH = os.environ.get('REGISTRY_PATH', 'models/registry')
+
+# Loaded once per process at import time. Under gunicorn with preload_app
+# (see gunicorn.conf.py) this runs in the master, so all workers share it.
+state = ServingState(
+    MODEL_PATH,
+    history_path=HISTORY_PATH,
+    registry=ModelRegistry(REGISTRY_PATH) if MODEL_VERSION else None,
+    version=MODEL_VERSION,
+).load()
+
+# Drift: each /predict feeds its newest DRIFT_ROWS rows (those not already seen) to the
+# model's drift monitor; with DRIFT_RETRAIN=1 drift detected on /predict or POST /drift/check
+# starts train.py at most once per cooldown. Drift statistics are per worker process (each
+# worker's monitor only sees the requests it served); the cooldown is shared by all workers
+# through DRIFT_RETRAIN_MARKER, so N workers detecting the same drift start one training run
+DRIFT_ROWS = int(os.environ.get('DRIFT_ROWS', 1))
+RETRAIN_DATA_PATH = os.environ.get('RETRAIN_DATA_PATH', HISTORY_PATH or 'data/sample_data.csv')
+
+
+def _start_retrain():
+    import subprocess
+    subprocess.Popen([sys.executable, 'train.py', '--data', RETRAIN_DATA_PATH])
+
+
+retrain = RetrainTrigger(
+    _start_retrain,
+    cooldown=float(os.environ.get('DRIFT_RETRAIN_COOLDOWN', 6 * 3600)),
+    enabled=os.environ.get('DRIFT_RETRAIN', '0') == '1',
+    marker_path=os.environ.get(
+        'DRIFT_RETRAIN_MARKER', os.path.join(os.path.dirname(MODEL_PATH) or '.', 'retrain_marker.json')
+    ),
+)
+
+# Concurrent /predict calls are coalesced into one model call per batch
+batcher = MicroBatcher(
+    lambda X: state.predict(X),
+    max_batch_rows=int(os.environ.get('BATCH_MAX_ROWS', 1024)),
+    max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', 2.0)),
+)
+
+# A/B test: CANDIDATE_FRACTION of /predict calls go to the model at CANDIDATE_MODEL_PATH
+# (e.g. models/xgb_model_ensemble.joblib); drift monitoring follows the primary model only
+CANDIDATE_MODEL_PATH = os.environ.get('CANDIDATE_MODEL_PATH')
+candidate_state = ServingState(CANDIDATE_MODEL_PATH).load() if CANDIDATE_MODEL_PATH else None
+candidate_batcher = MicroBatcher(
+    lambda X: candidate_state.predict(X),
+    max_batch_rows=int(os.environ.get('BATCH_MAX_ROWS', 1024)),
+    max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', 2.0)),
+) if candidate_state is not None else None
+router = ABRouter(float(os.environ.get('CANDIDATE_FRACTION', 0.1)) if candidate_state is not None else 0.0)
 
 # Simple HTML template for homepage
 HOME_HTML = """
@@ -60,10 +119,31 @@ HOME_HTML = """
         <span class="method post">POST</span>
         <strong>/predict</strong>
         <p>Generate stock price predictions</p>
-        <p>Body: <code>{"data_path": "data/sample_data.csv"}</code></p>
+        <p>Body: <code>{"data_path": "data/sample_data.csv"}</code> (optional when the server was started with <code>HISTORY_PATH</code>)</p>
         <p>Example: <code>curl -X POST http://localhost:5000/predict -H "Content-Type: application/json" -d '{"data_path": "data/sample_data.csv"}'</code></p>
     </div>
     
+    <div class="endpoint">
+        <span class="method get">GET</span>
+        <strong>/metrics</strong>
+        <p>Inference batching metrics (batch sizes, queue wait and predict latency)</p>
+        <p>Example: <code>curl http://localhost:5000/metrics</code></p>
+    </div>
+    
+    <div class="endpoint">
+        <span class="method get">GET</span>
+        <strong>/drift</strong>
+        <p>Feature and forecast-error drift against the training distribution (PSI, KS, live vs. training RMSE)</p>
+        <p>Example: <code>curl http://localhost:5000/drift</code></p>
+    </div>
+    
+    <div class="endpoint">
+        <span class="method post">POST</span>
+        <strong>/drift/check</strong>
+        <p>Same report, and start a retrain if it shows drift (with <code>DRIFT_RETRAIN=1</code>)</p>
+        <p>Example: <code>curl -X POST http://localhost:5000/drift/check</code></p>
+    </div>
+    
     <h2>Quick Test:</h2>
     <p>Open a new terminal and try:</p>
     <pre><code>curl http://localhost:5000/health</code></pre>
@@ -93,7 +173,7 @@ def model_info():
     """Get model information"""
     try:
         # Check if model exists
-        if not os.path.exists(MODEL_PATH):
+        if state.get_model() is None:
             return jsonify({
                 "status": "error",
                 "message": "Model not found. Please train the model first."
@@ -102,7 +182,11 @@ def model_info():
         # Load metrics if available
         metrics_path = 'models/metrics.json'
         metrics = {}
-        if os.path.exists(metrics_path):
+        meta = None
+        if state.registry is not None:
+            meta = state.registry.get(state.version)
+            metrics = meta["metrics"]
+        elif os.path.exists(metrics_path):
             import json
             with open(metrics_path, 'r') as f:
                 metrics = json.load(f)
@@ -110,8 +194,9 @@ def model_info():
         return jsonify({
             "status": "success",
             "model": {
-                "path": MODEL_PATH,
-                "size_mb": round(os.path.getsize(MODEL_PATH) / (1024*1024), 2),
+                "path": state.model_path,
+                "version": meta["version"] if meta else None,
+                "size_mb": round(os.path.getsize(state.model_path) / (1024*1024), 2),
                 "algorithm": "XGBoost Regressor"
             },
             "metrics": metrics
@@ -123,60 +208,49 @@ def model_info():
 def predict():
     """Generate predictions"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         
-        if not data or 'data_path' not in data:
+        if 'data_path' not in data and not state.history:
             return jsonify({
                 "status": "error",
                 "message": "Missing 'data_path' in request body"
             }), 400
         
-        data_path = data['data_path']
+        data_path = data.get('data_path')
         
         # Check if data file exists
-        if not os.path.exists(data_path):
+        if data_path is not None and not os.path.exists(data_path):
             return jsonify({
                 "status": "error",
                 "message": f"Data file not found: {data_path}"
             }), 404
         
+        arm = router.choose()
+        arm_state, arm_batcher = (candidate_state, candidate_batcher) if arm == "candidate" else (state, batcher)
+        
         # Check if model exists
-        if not os.path.exists(MODEL_PATH):
+        model = arm_state.get_model()
+        if model is None:
             return jsonify({
                 "status": "error",
                 "message": "Model not found. Please train the model first."
             }), 404
         
-        # Load model and data
-        model = load_model(MODEL_PATH)
-        df = load_data(data_path)
-        dfp = prepare_features(df, dropna=False)
-        
-        # Prepare features
-        import numpy as np
-        features = [c for c in dfp.columns if c not in ["Date", "target"]]
-        X = dfp[features].select_dtypes(include=[np.number])
-        
-        # Remove rows with NaN
-        valid_idx = X.notna().all(axis=1)
-        X_valid = X[valid_idx]
-        dates_valid = dfp["Date"][valid_idx]
-        
-        # Generate predictions
-        predictions = model.predict(X_valid)
-        
-        # Create results
-        results = []
-        for date, pred in zip(dates_valid, predictions):
-            results.append({
-                "date": date.strftime('%Y-%m-%d'),
-                "predicted_close": round(float(pred), 2)
-            })
+        # Use the request's file, or the shared history seeded at startup
+        df = load_data(data_path) if data_path is not None else state.history_frame()
+        monitor = state.get_monitor() if arm == "primary" else None
+        results = predict_records(
+            arm_batcher, df, feature_names=model.feature_names, quantile_model=arm_state.get_quantile_model(),
+            monitor=monitor, monitor_rows=DRIFT_ROWS,
+        )
+        if monitor is not None:
+            retrain.check(monitor.report())
         
         return jsonify({
             "status": "success",
             "predictions": results,
-            "count": len(results)
+            "count": len(results),
+            "model_arm": arm
         })
         
     except Exception as e:
@@ -185,6 +259,38 @@ def predict():
             "message": str(e)
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Inference batching and A/B routing metrics"""
+    body = {"status": "success", "batching": batcher.metrics(), "routing": router.metrics()}
+    if candidate_batcher is not None:
+        body["candidate_batching"] = candidate_batcher.metrics()
+    return jsonify(body)
+
+@app.route('/drift', methods=['GET'])
+def drift():
+    """Drift of live features and realized errors against the training distribution"""
+    monitor = state.get_monitor()
+    if monitor is None:
+        return jsonify({
+            "status": "error",
+            "message": "No drift reference for the current model. Retrain it to create one."
+        }), 404
+    return jsonify({"status": "success", "drift": monitor.report(), "retrain": retrain.status()})
+
+@app.route('/drift/check', methods=['POST'])
+def drift_check():
+    """Drift report, starting a retrain if it shows drift and the cooldown has passed"""
+    monitor = state.get_monitor()
+    if monitor is None:
+        return jsonify({
+            "status": "error",
+            "message": "No drift reference for the current model. Retrain it to create one."
+        }), 404
+    report = monitor.report()
+    triggered = retrain.check(report)
+    return jsonify({"status": "success", "drift": report, "retrain": {**retrain.status(), "triggered": triggered}})
+
 @app.route('/train', methods=['POST'])
 def train():
     """Trigger model training (use with caution in production)"""
@@ -0,0 +1,224 @@
+"""
+ASGI (FastAPI) version of the Stock Forecasting API
+Same endpoints as api.py; run with: uvicorn api_async:app --port 8000
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Add project root to path so the src package is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.batching import MicroBatcher
+from src.drift import RetrainTrigger
+from src.data import load_data
+from src.ensemble import ABRouter
+from src.registry import ModelRegistry
+from src.serving import ServingState, predict_records
+
+MODEL_PATH = os.environ.get('MODEL_PATH', 'models/xgb_model.joblib')
+HISTORY_PATH = os.environ.get('HISTORY_PATH')
+# Set MODEL_VERSION to a registry version id (pinned) or alias such as "production"
+# (follows promotions); unset serves MODEL_PATH
+MODEL_VERSION = os.environ.get('MODEL_VERSION')
+REGISTRY_PATH = os.environ.get('REGISTRY_PATH', 'models/registry')
+# Threads for CPU-heavy work (CSV parsing, feature building, inference)
+POOL_SIZE = int(os.environ.get('POOL_SIZE', os.cpu_count() or 2))
+# Requests allowed in flight on /predict before new ones are shed with 503
+MAX_INFLIGHT = int(os.environ.get('MAX_INFLIGHT', 4 * POOL_SIZE))
+
+app = FastAPI(title="Tata Steel Stock Forecast API")
+state = ServingState(
+    MODEL_PATH,
+    history_path=HISTORY_PATH,
+    registry=ModelRegistry(REGISTRY_PATH) if MODEL_VERSION else None,
+    version=MODEL_VERSION,
+).load()
+# Drift: each /predict feeds its newest DRIFT_ROWS rows (those not already seen) to the
+# model's drift monitor; with DRIFT_RETRAIN=1 drift detected on /predict or POST /drift/check
+# starts train.py at most once per cooldown. Drift statistics are per worker process (each
+# worker's monitor only sees the requests it served); the cooldown is shared by all workers
+# through DRIFT_RETRAIN_MARKER, so N workers detecting the same drift start one training run
+DRIFT_ROWS = int(os.environ.get('DRIFT_ROWS', 1))
+RETRAIN_DATA_PATH = os.environ.get('RETRAIN_DATA_PATH', HISTORY_PATH or 'data/sample_data.csv')
+retrain = RetrainTrigger(
+    lambda: subprocess.Popen([sys.executable, 'train.py', '--data', RETRAIN_DATA_PATH]),
+    cooldown=float(os.environ.get('DRIFT_RETRAIN_COOLDOWN', 6 * 3600)),
+    enabled=os.environ.get('DRIFT_RETRAIN', '0') == '1',
+    marker_path=os.environ.get(
+        'DRIFT_RETRAIN_MARKER', os.path.join(os.path.dirname(MODEL_PATH) or '.', 'retrain_marker.json')
+    ),
+)
+batcher = MicroBatcher(
+    lambda X: state.predict(X),
+    max_batch_rows=int(os.environ.get('BATCH_MAX_ROWS', 1024)),
+    max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', 2.0)),
+)
+# A/B test: CANDIDATE_FRACTION of /predict calls go to the model at CANDIDATE_MODEL_PATH
+# (e.g. models/xgb_model_ensemble.joblib); drift monitoring follows the primary model only
+CANDIDATE_MODEL_PATH = os.environ.get('CANDIDATE_MODEL_PATH')
+candidate_state = ServingState(CANDIDATE_MODEL_PATH).load() if CANDIDATE_MODEL_PATH else None
+candidate_batcher = MicroBatcher(
+    lambda X: candidate_state.predict(X),
+    max_batch_rows=int(os.environ.get('BATCH_MAX_ROWS', 1024)),
+    max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', 2.0)),
+) if candidate_state is not None else None
+router = ABRouter(float(os.environ.get('CANDIDATE_FRACTION', 0.1)) if candidate_state is not None else 0.0)
+pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="forecast")
+_inflight = 0
+# background train.py runs; references keep the watcher tasks alive until the process exits
+_training = set()
+logger = logging.getLogger(__name__)
+
+
+def _error(message: str, status_code: int, **headers) -> JSONResponse:
+    return JSONResponse({"status": "error", "message": message}, status_code=status_code, headers=headers or None)
+
+
+async def _run(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+@app.get('/health')
+async def health():
+    """Health check endpoint"""
+    return {"status": "healthy", "service": "tata-steel-forecast", "version": "0.1.0"}
+
+
+@app.get('/model/info')
+async def model_info():
+    """Get model information"""
+    model = await _run(state.get_model)
+    if model is None:
+        return _error("Model not found. Please train the model first.", 404)
+    metrics_path = 'models/metrics.json'
+    metrics = {}
+    meta = None
+    if state.registry is not None:
+        meta = state.registry.get(state.version)
+        metrics = meta["metrics"]
+    elif os.path.exists(metrics_path):
+        metrics = json.loads(await anyio.Path(metrics_path).read_text())
+    return {
+        "status": "success",
+        "model": {
+            "path": state.model_path,
+            "version": meta["version"] if meta else None,
+            "size_mb": round(os.path.getsize(state.model_path) / (1024*1024), 2),
+            "algorithm": "XGBoost Regressor"
+        },
+        "metrics": metrics
+    }
+
+
+def _predict_from_bytes(raw, feature_names, arm="primary"):
+    df = load_data(io.BytesIO(raw)) if raw is not None else state.history_frame()
+    arm_state, arm_batcher = (candidate_state, candidate_batcher) if arm == "candidate" else (state, batcher)
+    monitor = state.get_monitor() if arm == "primary" else None
+    results = predict_records(
+        arm_batcher, df, feature_names=feature_names, quantile_model=arm_state.get_quantile_model(),
+        monitor=monitor, monitor_rows=DRIFT_ROWS,
+    )
+    if monitor is not None:
+        retrain.check(monitor.report())
+    return results
+
+
+@app.post('/predict')
+async def predict(request: Request):
+    """Generate predictions"""
+    global _inflight
+    # backpressure: shed load instead of queueing unbounded work behind the pool
+    if _inflight >= MAX_INFLIGHT:
+        return _error("Server busy, retry later", 503, **{"Retry-After": "1"})
+    _inflight += 1
+    try:
+        try:
+            data = await request.json()
+        except Exception:
+            data = {}
+        data = data if isinstance(data, dict) else {}
+        if 'data_path' not in data and not state.history:
+            return _error("Missing 'data_path' in request body", 400)
+        data_path = data.get('data_path')
+        if data_path is not None and not os.path.exists(data_path):
+            return _error(f"Data file not found: {data_path}", 404)
+        arm = router.choose()
+        model = await _run((candidate_state if arm == "candidate" else state).get_model)
+        if model is None:
+            return _error("Model not found. Please train the model first.", 404)
+        raw = await anyio.Path(data_path).read_bytes() if data_path is not None else None
+        results = await _run(_predict_from_bytes, raw, model.feature_names, arm)
+        return {"status": "success", "predictions": results, "count": len(results), "model_arm": arm}
+    except Exception as e:
+        return _error(str(e), 500)
+    finally:
+        _inflight -= 1
+
+
+@app.get('/metrics')
+async def metrics():
+    """Inference batching and A/B routing metrics"""
+    body = {"status": "success", "batching": batcher.metrics(), "routing": router.metrics()}
+    if candidate_batcher is not None:
+        body["candidate_batching"] = candidate_batcher.metrics()
+    return body
+
+
+@app.get('/drift')
+async def drift():
+    """Drift of live features and realized errors against the training distribution"""
+    monitor = await _run(state.get_monitor)
+    if monitor is None:
+        return _error("No drift reference for the current model. Retrain it to create one.", 404)
+    return {"status": "success", "drift": monitor.report(), "retrain": retrain.status()}
+
+
+@app.post('/drift/check')
+async def drift_check():
+    """Drift report, starting a retrain if it shows drift and the cooldown has passed"""
+    monitor = await _run(state.get_monitor)
+    if monitor is None:
+        return _error("No drift reference for the current model. Retrain it to create one.", 404)
+    report = monitor.report()
+    triggered = retrain.check(report)
+    return {"status": "success", "drift": report, "retrain": {**retrain.status(), "triggered": triggered}}
+
+
+async def _watch_training(proc, data_path):
+    """Reap a background train.py run and log it if it fails."""
+    returncode = await proc.wait()
+    if returncode != 0:
+        logger.error("train.py --data %s exited with status %s", data_path, returncode)
+
+
+@app.post('/train')
+async def train(request: Request):
+    """Trigger model training (use with caution in production)"""
+    try:
+        try:
+            data = await request.json()
+        except Exception:
+            data = {}
+        data_path = (data or {}).get('data_path', 'data/sample_data.csv')
+        proc = await asyncio.create_subprocess_exec(sys.executable, 'train.py', '--data', data_path)
+        task = asyncio.create_task(_watch_training(proc, data_path))
+        _training.add(task)
+        task.add_done_callback(_training.discard)
+        return {
+            "status": "training started",
+            "data_path": data_path,
+            "message": "Training process initiated in background"
+        }
+    except Exception as e:
+        return _error(str(e), 500)
@@ -0,0 +1,66 @@
+"""
+Benchmark ensemble latency against a single model: one native XGBoost booster vs a
+seed-bagged XGBoost + Ridge ensemble whose members run in parallel threads.
+
+    python benchmarks/bench_ensemble.py --rows 100000 --seeds 0 1 2
+
+Reports median single-row and batch latency per path and the ensemble/single ratio.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.compiled import NativePredictor
+from src.data import prepare_features
+from src.ensemble import train_ensemble
+from src.model import DEFAULT_PARAMS, train_xgb
+from src.synthetic import generate_ohlcv
+
+
+def timeit(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ensemble vs single-model latency")
+    parser.add_argument("--rows", type=int, default=100_000, help="Batch size")
+    parser.add_argument("--repeat", type=int, default=200, help="Repeats for single-row timing")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2], help="One XGBoost member per seed")
+    args = parser.parse_args()
+
+    dfp = prepare_features(generate_ohlcv(max(args.rows, 2000) + 25))
+    X = dfp.drop(columns=["Date", "target"])
+    X_train, y_train = X.head(2000), dfp["target"].head(2000)
+    model, _ = train_xgb(X_train, y_train, n_splits=2)
+    ensemble = train_ensemble(X_train, y_train, seeds=args.seeds, params=DEFAULT_PARAMS)
+    A = X.head(args.rows).to_numpy(dtype=np.float32)
+
+    print(f"{len(ensemble.members)} members, {ensemble.threads_per_member} thread(s) per XGBoost member, "
+          f"{os.cpu_count()} cores")
+    results = {}
+    for name, predict in {"single": NativePredictor(model).predict, "ensemble": ensemble.predict}.items():
+        row = A[:1]
+        predict(row)  # warm-up
+        single = timeit(lambda: predict(row), args.repeat)
+        batch = timeit(lambda: predict(A), 5)
+        results[name] = (single, batch)
+        print(f"{name:>20}: single row {single * 1e6:8.1f} us   batch of {len(A)} {batch * 1000:8.1f} ms")
+
+    (single_row, single_batch), (ensemble_row, ensemble_batch) = results["single"], results["ensemble"]
+    print(f"{'ensemble / single':>20}: single row {ensemble_row / single_row:8.2f} x    "
+          f"batch {ensemble_batch / single_batch:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark inference latency: sklearn wrapper on a DataFrame vs the native booster
+on a NumPy array vs the compiled ONNX graph (when onnxmltools/onnxruntime are installed).
+
+    python benchmarks/bench_inference.py --rows 100000
+
+Reports median single-row latency and batch latency per path.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.compiled import NativePredictor, OnnxPredictor, export_onnx
+from src.data import prepare_features
+from src.model import train_xgb
+from src.synthetic import generate_ohlcv
+
+
+def timeit(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inference paths")
+    parser.add_argument("--rows", type=int, default=100_000, help="Batch size")
+    parser.add_argument("--repeat", type=int, default=200, help="Repeats for single-row timing")
+    args = parser.parse_args()
+
+    dfp = prepare_features(generate_ohlcv(max(args.rows, 2000) + 25))
+    X = dfp.drop(columns=["Date", "target"])
+    model, _ = train_xgb(X.head(2000), dfp["target"].head(2000), n_splits=2)
+    X = X.head(args.rows)
+    A = X.to_numpy(dtype=np.float32)
+
+    paths = {
+        "sklearn (DataFrame)": (lambda batch: model.predict(X.iloc[:len(batch)]), X),
+        "native (NumPy)": (NativePredictor(model).predict, A),
+    }
+    try:
+        onnx_file = os.path.join(tempfile.mkdtemp(), "model.onnx")
+        paths["onnx (NumPy)"] = (OnnxPredictor(export_onnx(model, onnx_file)).predict, A)
+    except RuntimeError as e:
+        print(f"onnx: skipped ({e})")
+
+    for name, (predict, data) in paths.items():
+        row = data[:1]
+        predict(row)  # warm-up
+        single = timeit(lambda: predict(row), args.repeat)
+        batch = timeit(lambda: predict(data), 5)
+        print(f"{name:>20}: single row {single * 1e6:8.1f} us   batch of {len(data)} {batch * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark intraday resampling and multi-frequency features against pandas.
+
+    python benchmarks/bench_resample.py --rows 94000 --tickers 50
+
+Default size is about one trading year of minute bars per ticker.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.resample import add_multi_frequency_features, resample_ohlcv
+from src.synthetic import generate_ohlcv
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OHLCV resampling")
+    parser.add_argument("--rows", type=int, default=94_000, help="Minute bars per ticker")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--freq", default="5min")
+    args = parser.parse_args()
+
+    df = generate_ohlcv(args.rows, args.tickers, freq="min")
+    print(f"{len(df):,} rows")
+    pandas_t = timed(lambda: df.set_index("Date").groupby("Symbol").resample(args.freq).agg(AGG).dropna())
+    ours_t = timed(lambda: resample_ohlcv(df, args.freq))
+    print(f"pandas groupby-resample {args.freq}: {pandas_t * 1000:8.1f} ms")
+    print(f"resample_ohlcv {args.freq}:         {ours_t * 1000:8.1f} ms  ({pandas_t / ours_t:4.1f}x)")
+    t = timed(lambda: add_multi_frequency_features(df, (args.freq, "1h", "1D")))
+    print(f"multi-frequency features ({args.freq}, 1h, 1D): {t * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
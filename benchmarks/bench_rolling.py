@@ -0,0 +1,52 @@
+"""
+Benchmark the return/rolling feature backends of add_return_and_rolling.
+
+    python benchmarks/bench_rolling.py --rows 1000000
+
+Reports best-of-N wall time per backend (numba is skipped if not installed;
+its first call includes JIT compilation and is excluded by a warm-up run).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data import add_return_and_rolling
+from src.synthetic import generate_ohlcv
+
+
+def bench(df, backend: str, repeat: int) -> float:
+    add_return_and_rolling(df.head(100), backend=backend)  # warm-up / JIT
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        add_return_and_rolling(df, backend=backend)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rolling-feature backends")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = generate_ohlcv(args.rows)
+    baseline = None
+    for backend in ("pandas", "numpy", "numba"):
+        try:
+            t = bench(df, backend, args.repeat)
+        except RuntimeError as e:
+            print(f"{backend:>7}: skipped ({e})")
+            continue
+        baseline = baseline or t
+        print(f"{backend:>7}: {t * 1000:8.1f} ms  ({baseline / t:4.1f}x vs pandas)")
+
+
+if __name__ == "__main__":
+    main()
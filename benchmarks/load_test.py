@@ -0,0 +1,78 @@
+"""
+Load test comparing the Flask (api.py) and ASGI (api_async.py) servers.
+
+Start both servers first, e.g.:
+    gunicorn -c gunicorn.conf.py api:app                                   # :5000
+    uvicorn api_async:app --port 8000 --workers 2                          # :8000
+then run:
+    python benchmarks/load_test.py --target flask=http://localhost:5000 --target asgi=http://localhost:8000
+
+A mix of slow /predict calls and cheap /health calls is issued concurrently;
+throughput and p50/p95/p99 latency are reported per server and endpoint.
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def _call(base_url: str, endpoint: str, body: dict = None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + endpoint, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return endpoint, status, time.perf_counter() - start
+
+
+def run(base_url: str, data_path: str, requests: int, concurrency: int, health_ratio: float):
+    n_health = int(requests * health_ratio)
+    jobs = [("/health", None)] * n_health + [("/predict", {"data_path": data_path})] * (requests - n_health)
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(jobs))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(lambda i: _call(base_url, *jobs[i]), order))
+    elapsed = time.perf_counter() - start
+    report = {"throughput_rps": round(len(results) / elapsed, 1), "endpoints": {}}
+    for endpoint in ("/health", "/predict"):
+        lat = np.array([r[2] for r in results if r[0] == endpoint]) * 1000
+        if len(lat) == 0:
+            continue
+        report["endpoints"][endpoint] = {
+            "count": int(len(lat)),
+            "shed_503": int(sum(1 for r in results if r[0] == endpoint and r[1] == 503)),
+            "errors": int(sum(1 for r in results if r[0] == endpoint and r[1] not in (200, 503))),
+            "p50_ms": round(float(np.percentile(lat, 50)), 1),
+            "p95_ms": round(float(np.percentile(lat, 95)), 1),
+            "p99_ms": round(float(np.percentile(lat, 99)), 1),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Flask and ASGI API throughput and tail latency")
+    parser.add_argument("--target", action="append", required=True, help="name=base_url, repeatable")
+    parser.add_argument("--data", default="data/sample_data.csv", help="data_path sent to /predict")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--health_ratio", type=float, default=0.5, help="fraction of requests that hit /health")
+    args = parser.parse_args()
+
+    for target in args.target:
+        name, url = target.split("=", 1)
+        report = run(url.rstrip("/"), args.data, args.requests, args.concurrency, args.health_ratio)
+        print(name, json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
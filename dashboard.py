@@ -7,12 +7,11 @@ import plotly.graph_objects as go
 import sys
 import os
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Add project root to path so the src package is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from data import load_data, prepare_features
-from model import load_model, train_xgb
-import numpy as np
+from src.data import inference_matrix, load_data, prepare_features
+from src.compiled import load_predictor
 
 # Page config
 st.set_page_config(
@@ -80,23 +79,22 @@ with tab2:
         if st.button("🎯 Train New Model", type="primary"):
             with st.spinner("Training model... This may take a minute."):
                 try:
-                    dfp = prepare_features(df)
-                    features = [c for c in dfp.columns if c not in ["Date", "target"]]
-                    X = dfp[features].select_dtypes(include=[np.number])
-                    y = dfp["target"]
-                    
-                    model, summary = train_xgb(X, y, n_splits=3)
-                    
-                    # Save model
-                    from model import save_model
+                    # same publish path as train.py: registry version, atomic export of the
+                    # model and its companions, stale companions of earlier runs removed
                     import json
+                    import tempfile
+                    import train
                     
-                    os.makedirs('models', exist_ok=True)
-                    save_model(model, model_path)
-                    
-                    with open('models/metrics.json', 'w') as f:
-                        json.dump(summary, f)
+                    fd, data_path = tempfile.mkstemp(suffix=".csv")
+                    os.close(fd)
+                    try:
+                        df.to_csv(data_path, index=False)
+                        train.main(["--data", data_path, "--out_dir", "models"])
+                    finally:
+                        os.remove(data_path)
                     
+                    with open('models/metrics.json') as f:
+                        summary = json.load(f)
                     st.success("✅ Model trained successfully!")
                     st.json(summary)
                 except Exception as e:
@@ -122,17 +120,11 @@ with tab2:
         if st.button("🚀 Generate Predictions"):
             with st.spinner("Generating predictions..."):
                 try:
-                    model = load_model(model_path)
+                    model = load_predictor(model_path)
                     dfp = prepare_features(df, dropna=False)
                     
-                    features = [c for c in dfp.columns if c not in ["Date", "target"]]
-                    X = dfp[features].select_dtypes(include=[np.number])
-                    
-                    valid_idx = X.notna().all(axis=1)
-                    X_valid = X[valid_idx]
-                    dates_valid = dfp["Date"][valid_idx]
-                    
-                    predictions = model.predict(X_valid)
+                    X, dates_valid = inference_matrix(dfp, model.feature_names)
+                    predictions = model.predict(X)
                     
                     results = pd.DataFrame({
                         'Date': dates_valid,
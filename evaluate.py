@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import pandas as pd
+from src.data import load_data
+from src.evaluate import align_predictions, evaluate_aligned, write_table
+
+
+def evaluate(
+    prediction_paths,
+    actuals_path: str,
+    date_col: str = "Date",
+    target_col: str = "Close",
+    pred_col: str = "predicted_next_day_close",
+    symbol_col: str = "Symbol",
+    period: str = "M",
+    window: int = 20,
+):
+    """Evaluate one or more prediction files against actuals; groups are file name (and symbol if present)."""
+    actuals = load_data(actuals_path, date_col=date_col)
+    use_symbol = symbol_col if symbol_col in actuals.columns else None
+    aligned = []
+    for path in prediction_paths:
+        preds = pd.read_csv(path, parse_dates=[date_col])
+        sym = use_symbol if use_symbol and use_symbol in preds.columns else None
+        a = align_predictions(preds, actuals, date_col=date_col, pred_col=pred_col, target_col=target_col, symbol_col=sym)
+        name = os.path.basename(path)
+        a["group"] = name + ":" + a[sym].astype(str) if sym else name
+        aligned.append(a)
+    return evaluate_aligned(pd.concat(aligned, ignore_index=True), date_col=date_col, period=period, window=window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate prediction files against actual prices")
+    parser.add_argument("--predictions", nargs="+", default=["predictions.csv"], help="Prediction CSV(s) from predict.py")
+    parser.add_argument("--actuals", default="data/sample_data.csv", help="CSV with actual prices")
+    parser.add_argument("--date_col", default="Date")
+    parser.add_argument("--target", default="Close")
+    parser.add_argument("--pred_col", default="predicted_next_day_close")
+    parser.add_argument("--symbol_col", default="Symbol", help="Ticker column, used when present in both files")
+    parser.add_argument("--period", default="M", help="Pandas period alias for per-period breakdown (empty to disable)")
+    parser.add_argument("--window", type=int, default=20, help="Rolling error window (0 to disable)")
+    parser.add_argument("--output", default="evaluation.json", help="JSON report path")
+    parser.add_argument("--rows_output", default=None, help="Optional per-row table (.parquet or .csv)")
+    args = parser.parse_args()
+
+    report, rows = evaluate(
+        args.predictions, args.actuals, args.date_col, args.target, args.pred_col,
+        args.symbol_col, args.period or None, args.window or None,
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    if args.rows_output:
+        write_table(rows, args.rows_output)
+
+    o = report["overall"]
+    print(f"Evaluated {o['count']} predictions")
+    print(f"RMSE: {o['rmse']:.4f}  MAE: {o['mae']:.4f}  MAPE: {o['mape']:.2f}%  "
+          f"Directional accuracy: {o['directional_accuracy']:.1%}")
+    for g in report["groups"]:
+        print(f"  {g['group']}: n={g['count']} RMSE={g['rmse']:.4f} MAE={g['mae']:.4f} MAPE={g['mape']:.2f}%")
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
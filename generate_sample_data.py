@@ -1,31 +1,33 @@
-import pandas as pd
-import numpy as np
+import argparse
+import time
+from src.synthetic import write_ohlcv
 
-# Generate more realistic sample data
-np.random.seed(42)
-dates = pd.date_range('2023-01-01', periods=100, freq='D')
-base_price = 100
-prices = [base_price]
 
-# Generate more realistic stock prices with trend and noise
-for i in range(99):
-    change = np.random.normal(0.001, 0.02)  # slight upward bias with volatility
-    new_price = prices[-1] * (1 + change)
-    prices.append(new_price)
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic OHLCV data (geometric Brownian motion)")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per ticker")
+    parser.add_argument("--tickers", type=int, default=1, help="Number of tickers (adds a Symbol column when > 1)")
+    parser.add_argument("--freq", default="D", help="Pandas frequency alias, e.g. D, B, h, 5min, min")
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--start_price", type=float, default=100.0)
+    parser.add_argument("--drift", type=float, default=0.0, help="Per-bar log-price drift")
+    parser.add_argument("--reversion", type=float, default=0.0,
+                        help="Pull of log price back to trend per bar (0 = pure GBM; e.g. 0.001 bounds long series)")
+    parser.add_argument("--vol", type=float, nargs="+", default=[0.02], help="Per-bar volatility of each regime")
+    parser.add_argument("--regime_length", type=float, default=250, help="Mean bars between regime switches")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk_rows", type=int, default=1_000_000, help="Rows generated and written per chunk")
+    parser.add_argument("--output", default="data/sample_data.csv", help="Output .csv or .parquet")
+    args = parser.parse_args()
 
-df = pd.DataFrame({
-    'Date': dates,
-    'Open': [p * (1 + np.random.uniform(-0.01, 0.01)) for p in prices],
-    'High': [p * (1 + np.random.uniform(0.005, 0.02)) for p in prices],
-    'Low': [p * (1 + np.random.uniform(-0.02, -0.005)) for p in prices],
-    'Close': prices,
-    'Volume': [int(np.random.uniform(100000, 500000)) for _ in prices]
-})
+    start = time.perf_counter()
+    written = write_ohlcv(
+        args.output, args.rows, args.tickers, freq=args.freq, start=args.start,
+        start_price=args.start_price, drift=args.drift, reversion=args.reversion, regimes=args.vol,
+        regime_length=args.regime_length, seed=args.seed, chunk_rows=args.chunk_rows,
+    )
+    print(f"Generated {written} rows to {args.output} in {time.perf_counter() - start:.2f}s")
 
-df.to_csv('data/sample_data.csv', index=False)
-print(f"Generated {len(df)} rows of sample data")
-print(f"\nFirst 5 rows:")
-print(df.head())
-print(f"\nLast 5 rows:")
-print(df.tail())
-print(f"\nPrice range: ${df['Close'].min():.2f} - ${df['Close'].max():.2f}")
+
+if __name__ == "__main__":
+    main()
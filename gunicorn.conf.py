@@ -0,0 +1,20 @@
+# Gunicorn configuration for the forecast API
+# Run with: gunicorn -c gunicorn.conf.py api:app
+import gc
+import os
+
+bind = "0.0.0.0:5000"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = 120
+# Threads per worker: concurrent requests give the micro-batcher something to coalesce
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import api.py (and load the model + seeded history) once in the master before
+# forking, so workers share those pages copy-on-write instead of each loading a copy.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far into the permanent generation so the cyclic GC
+    # in the workers does not write to (and thereby un-share) the preloaded objects.
+    gc.freeze()
@@ -0,0 +1,36 @@
+import argparse
+import json
+from src.registry import DEFAULT_ALIAS, ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, inspect, promote and roll back registered models")
+    parser.add_argument("--registry", default="models/registry", help="Model registry directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List versions, newest first")
+    show = sub.add_parser("show", help="Print the metadata of a version")
+    show.add_argument("ref", nargs="?", default=DEFAULT_ALIAS, help="Version id, unique prefix or alias")
+    promote = sub.add_parser("promote", help="Point an alias at a version (also used to roll back)")
+    promote.add_argument("ref", help="Version id, unique prefix or alias")
+    promote.add_argument("--alias", default=DEFAULT_ALIAS)
+    promote.add_argument("--out_dir", default="models", help="Also copy the version here for MODEL_PATH readers (empty to skip)")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "list":
+        current = {v: a for a, v in registry.aliases().items()}
+        for meta in registry.list_versions():
+            rmse = meta["metrics"].get("mean_rmse")
+            rmse = f"{rmse:.4f}" if rmse is not None else "-"
+            print(f"{meta['version'][:12]}  {meta['created_at']}  rmse={rmse}  {current.get(meta['version'], '')}")
+    elif args.command == "show":
+        print(json.dumps(registry.get(args.ref), indent=2))
+    else:
+        version = registry.promote(args.ref, alias=args.alias)
+        if args.out_dir:
+            registry.export(version, args.out_dir)
+        print(f"{args.alias} -> {version}")
+
+
+if __name__ == "__main__":
+    main()
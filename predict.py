@@ -1,34 +1,66 @@
 import argparse
 import os
 import pandas as pd
-from src.model import load_model
-from src.data import load_data, prepare_features
+from src.compiled import load_predictor, load_quantile_predictor
+from src.data import inference_matrix, load_data, prepare_features
+from src.exogenous import add_exogenous_features, load_exogenous
+from src.memprofile import MemoryProfiler, stage
+from src.resample import prepare_intraday_features
 
 
-def predict(model_path: str, data_path: str, date_col: str = "Date", target_col: str = "Close"):
-    """Load model and make predictions on new data."""
-    model = load_model(model_path)
-    df = load_data(data_path, date_col=date_col)
-    dfp = prepare_features(df, target_col=target_col, date_col=date_col, dropna=False)
-    
-    # Get features (same as training)
-    import numpy as np
-    features = [c for c in dfp.columns if c not in [date_col, "target"]]
-    X = dfp[features].select_dtypes(include=[np.number])
-    
-    # Remove rows with NaN (initial rows due to lagging)
-    valid_idx = X.notna().all(axis=1)
-    X_valid = X[valid_idx]
-    dates_valid = dfp[date_col][valid_idx]
+def predict(
+    model_path: str,
+    data_path: str,
+    date_col: str = "Date",
+    target_col: str = "Close",
+    resample=None,
+    context_freqs=("1h", "1D"),
+    exogenous=(),
+):
+    """Load model and make predictions on new data.
+
+    Pass the ``resample``/``context_freqs`` and ``exogenous`` (NAME=CSV) series the model was trained with.
+    """
+    # compiled ONNX graph if exported, else the booster's in-place NumPy path
+    with stage("load_model"):
+        model = load_predictor(model_path, target_col=target_col)
+    with stage("load_data"):
+        df = load_data(data_path, date_col=date_col)
+    with stage("features"):
+        side = load_exogenous(exogenous) if exogenous else None
+        if resample:
+            dfp = prepare_intraday_features(
+                df, resample, context_freqs, target_col=target_col, date_col=date_col, dropna=False, exogenous=side
+            )
+            # warm-up restarts at every symbol, so rely on the NaN row filter (as training's dropna) alone
+            X, dates_valid = inference_matrix(dfp, model.feature_names, date_col=date_col, warmup=0)
+        else:
+            if side:
+                df = add_exogenous_features(df, *side, date_col=date_col)
+            dfp = prepare_features(df, target_col=target_col, date_col=date_col, dropna=False)
+            # Complete-feature rows as a float32 matrix in the model's stored feature order
+            X, dates_valid = inference_matrix(dfp, model.feature_names, date_col=date_col)
     
     # Predict
-    predictions = model.predict(X_valid)
+    with stage("predict"):
+        predictions = model.predict(X)
     
     # Create results dataframe
     results = pd.DataFrame({
         date_col: dates_valid.values,
-        "predicted_next_day_close": predictions
+        # intraday models forecast the next resampled bar, not the next day
+        ("predicted_next_bar_close" if resample else "predicted_next_day_close"): predictions
     })
+    if "Symbol" in dfp.columns:
+        results.insert(0, "Symbol", dfp.loc[dates_valid.index, "Symbol"].to_numpy())
+    
+    # Prediction intervals: all quantiles from one multi-output booster call
+    with stage("quantiles"):
+        quantile_model = load_quantile_predictor(model_path, target_col=target_col)
+        if quantile_model is not None:
+            quantiles = quantile_model.predict(X)
+            for j, col in enumerate(quantile_model.columns):
+                results[col] = quantiles[:, j]
     
     return results
 
@@ -40,6 +72,11 @@ def main():
     parser.add_argument("--date_col", default="Date")
     parser.add_argument("--target", default="Close")
     parser.add_argument("--output", default="predictions.csv", help="Output CSV file")
+    parser.add_argument("--resample", default=None, help="Bar frequency the model was trained on (e.g. 5min)")
+    parser.add_argument("--context_freqs", nargs="*", default=["1h", "1D"], help="Coarser bar frequencies used as features")
+    parser.add_argument("--exogenous", nargs="*", default=[], metavar="NAME=CSV", help="Side series the model was trained with")
+    parser.add_argument("--memprofile", nargs="?", const="memprofile.json", default=None, metavar="PATH",
+                        help="Record per-stage memory (tracemalloc + RSS) and write it to PATH (.json or .html)")
     args = parser.parse_args()
     
     if not os.path.exists(args.model):
@@ -50,7 +87,14 @@ def main():
         print(f"Error: Data file not found: {args.data}")
         return
     
-    results = predict(args.model, args.data, args.date_col, args.target)
+    profiler = MemoryProfiler().start() if args.memprofile else None
+    try:
+        results = predict(args.model, args.data, args.date_col, args.target, args.resample, args.context_freqs, args.exogenous)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            print(profiler.summary())
+            print("Memory profile saved to", profiler.write(args.memprofile))
     results.to_csv(args.output, index=False)
     print(f"Predictions saved to {args.output}")
     print(f"\nFirst 5 predictions:")
@@ -33,6 +33,8 @@ setup(
         "console_scripts": [
             "stock-train=train:main",
             "stock-predict=predict:main",
+            "stock-evaluate=evaluate:main",
+            "stock-models=manage_models:main",
         ],
     },
 )
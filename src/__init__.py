@@ -1,4 +1,5 @@
 """
 Tata Steel Stock Forecasting Package
 """
+
 __version__ = "0.1.0"
@@ -0,0 +1,12 @@
+import importlib
+from typing import Optional
+
+
+def require(module: str, purpose: str, pip_name: Optional[str] = None):
+    """Import ``module``, or raise a RuntimeError saying what needs it and how to install it."""
+    try:
+        return importlib.import_module(module)
+    except Exception as e:
+        raise RuntimeError(
+            f"{module.split('.')[0]} is required {purpose}. Install it with `pip install {pip_name or module}`. Error: {e}"
+        ) from e
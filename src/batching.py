@@ -0,0 +1,149 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into one batched model call.
+
+    Requests are queued; a background thread collects them until ``max_batch_rows``
+    rows are pending or ``max_wait_ms`` has passed since the first one arrived, runs
+    ``predict_fn`` once on the stacked matrix and hands each caller its slice. A request
+    that would overflow the batch waits for the next one; a single request larger than
+    ``max_batch_rows`` is predicted in chunks of that size.
+    The thread is started lazily (and restarted after ``fork``) so the batcher can be
+    created in a preloaded gunicorn master.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_rows: int = 1024,
+        max_wait_ms: float = 2.0,
+        stats_window: int = 1024,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._counts = {
+            "requests": 0,
+            "rows": 0,
+            "batches": 0,
+            "max_batch_rows_seen": 0,
+        }
+        self._batch_rows = deque(maxlen=stats_window)
+        self._queue_wait_ms = deque(maxlen=stats_window)
+        self._predict_ms = deque(maxlen=stats_window)
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    daemon=True,
+                    name="micro-batcher",
+                ).start()
+                self._pid = os.getpid()
+
+    def submit(self, X) -> Future:
+        """Queue ``X`` (2-D, one row per sample) and return a Future resolving to its predictions."""
+        self._ensure_worker()
+        X = np.asarray(X)
+        future = Future()
+        self._queue.put((X, future, time.perf_counter()))
+        return future
+
+    def predict(self, X) -> np.ndarray:
+        return self.submit(X).result()
+
+    def _collect(self, q: queue.Queue, held=None):
+        """Next batch, its row count and the request held back for the following batch (or None)."""
+        batch = [held if held is not None else q.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if rows + len(item[0]) > self.max_batch_rows:
+                # flush now rather than push the batch past max_batch_rows
+                return batch, rows, item
+            batch.append(item)
+            rows += len(item[0])
+        return batch, rows, None
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if len(X) <= self.max_batch_rows:
+            return np.asarray(self.predict_fn(X))
+        step = self.max_batch_rows
+        chunks = [X[i : i + step] for i in range(0, len(X), step)]
+        return np.concatenate([np.asarray(self.predict_fn(c)) for c in chunks])
+
+    def _run(self, q: queue.Queue):
+        held = None
+        while True:
+            batch, rows, held = self._collect(q, held)
+            start = time.perf_counter()
+            try:
+                preds = self._predict(np.concatenate([item[0] for item in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            offsets = np.cumsum([len(item[0]) for item in batch])[:-1]
+            for (_, future, queued), part in zip(batch, np.split(preds, offsets)):
+                self._queue_wait_ms.append((start - queued) * 1000)
+                future.set_result(part)
+            self._predict_ms.append((done - start) * 1000)
+            self._batch_rows.append(rows)
+            self._counts["requests"] += len(batch)
+            self._counts["rows"] += rows
+            self._counts["batches"] += 1
+            self._counts["max_batch_rows_seen"] = max(
+                self._counts["max_batch_rows_seen"], rows
+            )
+
+    def metrics(self) -> Dict:
+        """Counters plus recent batch-size and latency percentiles (milliseconds)."""
+
+        def pct(values, q):
+            return round(float(np.percentile(values, q)), 3) if values else None
+
+        batch_rows = list(self._batch_rows)
+        queue_wait = list(self._queue_wait_ms)
+        predict_ms = list(self._predict_ms)
+        return {
+            **self._counts,
+            "max_batch_rows": self.max_batch_rows,
+            "max_wait_ms": self.max_wait_ms,
+            "mean_requests_per_batch": (
+                round(self._counts["requests"] / self._counts["batches"], 3)
+                if self._counts["batches"]
+                else None
+            ),
+            "mean_batch_rows": (
+                round(float(np.mean(batch_rows)), 3) if batch_rows else None
+            ),
+            "queue_wait_ms_p50": pct(queue_wait, 50),
+            "queue_wait_ms_p95": pct(queue_wait, 95),
+            "predict_ms_p50": pct(predict_ms, 50),
+            "predict_ms_p95": pct(predict_ms, 95),
+        }
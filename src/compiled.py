@@ -0,0 +1,129 @@
+import os
+import numpy as np
+from typing import List, Optional
+
+from ._optional import require
+from .data import check_feature_order
+from .model import load_model
+
+
+def quantile_path_for(model_path: str) -> str:
+    """Where train.py stores the quantile model belonging to ``model_path`` (``<stem>_quantile.joblib``)."""
+    return os.path.splitext(model_path)[0] + "_quantile.joblib"
+
+
+def onnx_path_for(model_path: str) -> str:
+    """Where the compiled ONNX graph for ``model_path`` lives (same name, .onnx extension)."""
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+
+def export_onnx(model, path: str) -> str:
+    """Compile the trained booster to an ONNX graph taking one float32 matrix input."""
+    require("onnxmltools", "to export ONNX", "onnxmltools onnx")
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    booster = model.get_booster().copy()
+    n_features = booster.num_features()
+    # the converter only understands positional f0..fN names; column order is kept by the predictor
+    booster.feature_names = None
+    onx = convert_xgboost(
+        booster, initial_types=[("input", FloatTensorType([None, n_features]))]
+    )
+    with open(path, "wb") as f:
+        f.write(onx.SerializeToString())
+    return path
+
+
+class NativePredictor:
+    """Predict with the booster directly on a NumPy array, bypassing the sklearn wrapper and DMatrix."""
+
+    kind = "native"
+
+    def __init__(self, model):
+        self.model = model
+        self.booster = model.get_booster()
+        self.feature_names: Optional[List[str]] = self.booster.feature_names
+
+    def predict(self, X) -> np.ndarray:
+        return self.booster.inplace_predict(np.asarray(X, dtype=np.float32))
+
+
+class QuantilePredictor(NativePredictor):
+    """All quantiles of a multi-output quantile booster from one in-place prediction."""
+
+    kind = "quantile"
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.alphas = np.atleast_1d(
+            np.asarray(model.get_params()["quantile_alpha"], dtype=float)
+        )
+        self.columns = [f"p{round(a * 100)}" for a in self.alphas]
+
+    def predict(self, X) -> np.ndarray:
+        """(n_rows, n_quantiles) array; rows are sorted so quantiles never cross."""
+        preds = super().predict(X).reshape(len(X), len(self.alphas))
+        order = np.argsort(self.alphas)
+        preds[:, order] = np.sort(preds, axis=1)
+        return preds
+
+
+class OnnxPredictor:
+    """Run a compiled ONNX graph with onnxruntime on CPU."""
+
+    kind = "onnx"
+
+    def __init__(self, path: str, feature_names: Optional[List[str]] = None):
+        ort = require("onnxruntime", "for ONNX inference")
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.feature_names = feature_names
+
+    def predict(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self.session.run(None, {self.input_name: X})[0].ravel()
+
+
+def load_predictor(
+    model_path: str, prefer_compiled: bool = True, target_col: str = "Close"
+):
+    """Load the fastest available predictor for ``model_path``.
+
+    Uses the ONNX graph next to the model when it exists and onnxruntime is installed,
+    otherwise the booster's in-place NumPy prediction; an ensemble file (from
+    ``train.py --ensemble``) loads as an EnsemblePredictor. Raises ValueError if the
+    model's stored feature order does not match prepare_features.
+    """
+    model = load_model(model_path)
+    if isinstance(model, dict) and model.get("kind") == "ensemble":
+        from .ensemble import EnsemblePredictor
+
+        ensemble = EnsemblePredictor.from_spec(model)
+        check_feature_order(ensemble.feature_names, target_col)
+        return ensemble
+    native = NativePredictor(model)
+    check_feature_order(native.feature_names, target_col)
+    onnx_path = onnx_path_for(model_path)
+    if (
+        prefer_compiled
+        and os.path.exists(onnx_path)
+        and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path)
+    ):
+        try:
+            return OnnxPredictor(onnx_path, feature_names=native.feature_names)
+        except RuntimeError:
+            pass
+    return native
+
+
+def load_quantile_predictor(
+    model_path: str, target_col: str = "Close"
+) -> Optional[QuantilePredictor]:
+    """Quantile predictor trained alongside ``model_path``, or None if there is none."""
+    path = quantile_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    predictor = QuantilePredictor(load_model(path))
+    check_feature_order(predictor.feature_names, target_col)
+    return predictor
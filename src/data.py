@@ -1,12 +1,45 @@
+import warnings
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
+from .kernels import (
+    resolve_backend,
+    return_and_rolling_matrix,
+    return_and_rolling_names,
+)
+from .validation import HARD_ISSUES, validate_ohlcv
 
-def load_data(path: str, date_col: str = "Date") -> pd.DataFrame:
+# feature configuration used by prepare_features
+LAGS = [1, 2, 3, 5]
+RETURNS_LAGS = [1]
+ROLLING_WINDOWS = [5, 10, 20]
+
+
+def load_data(
+    path: str, date_col: str = "Date", validation: Optional[str] = None
+) -> pd.DataFrame:
+    """Read a CSV, parse dates and sort by date, optionally validating first.
+
+    ``validation`` is None or "off" (the default: no checks), "report" (warn on hard issues),
+    "raise" or "repair" (see ``validate_ohlcv``); the report is stored in ``df.attrs["validation"]``.
+    """
     df = pd.read_csv(path)
     df[date_col] = pd.to_datetime(df[date_col])
-    df = df.sort_values(date_col).reset_index(drop=True)
+    if validation in (None, "off"):
+        return df.sort_values(date_col).reset_index(drop=True)
+    if validation not in ("report", "raise", "repair"):
+        raise ValueError(
+            f"Unknown validation mode {validation!r}; expected off, report, raise or repair"
+        )
+    df, report = validate_ohlcv(df, date_col=date_col, repair=validation == "repair")
+    df.attrs["validation"] = report
+    if not report["ok"] and not report["repaired"]:
+        issues = {k: report[k] for k in HARD_ISSUES if report[k]}
+        message = f"Data validation found issues in {path}: {issues}"
+        if validation == "raise":
+            raise ValueError(message)
+        warnings.warn(message + "; load with validation='repair' to fix them.")
     return df
 
 
@@ -27,10 +60,25 @@ def add_return_and_rolling(
     date_col: str = "Date",
     returns_lags: List[int] = [1],
     rolling_windows: List[int] = [5, 10, 20],
+    backend: str = "pandas",
 ) -> pd.DataFrame:
+    if resolve_backend(backend) != "pandas":
+        # all return/rolling/momentum columns from one kernel pass into one preallocated array
+        names, values = return_and_rolling_matrix(
+            df[target_col].to_numpy(dtype=np.float64),
+            returns_lags,
+            rolling_windows,
+            backend=backend,
+        )
+        df = df.drop(columns=[c for c in names if c in df.columns])
+        df = pd.concat(
+            [df, pd.DataFrame(values, columns=names, index=df.index)], axis=1
+        )
+        return _add_calendar_features(df, date_col)
     df = df.copy()
-    # returns
-    df["return_1"] = df[target_col].pct_change()
+    # returns; fill_method=None so a missing close gives NaN returns on every pandas
+    # version, as in the array backends
+    df["return_1"] = df[target_col].pct_change(fill_method=None)
     for lag in returns_lags:
         df[f"return_{lag}_lag"] = df["return_1"].shift(lag)
     # rolling mean and std (lagged)
@@ -40,7 +88,10 @@ def add_return_and_rolling(
     # momentum: close / close_{n_days_ago} - 1
     for w in rolling_windows:
         df[f"mom_{w}"] = df[target_col] / df[target_col].shift(w) - 1
-    # calendar features
+    return _add_calendar_features(df, date_col)
+
+
+def _add_calendar_features(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
     if date_col in df.columns:
         df["day_of_week"] = df[date_col].dt.dayofweek
         df["month"] = df[date_col].dt.month
@@ -52,12 +103,179 @@ def prepare_features(
     target_col: str = "Close",
     date_col: str = "Date",
     dropna: bool = True,
+    backend: str = "pandas",
 ) -> pd.DataFrame:
     df = df.copy()
-    df = add_lag_features(df, target_col=target_col, lags=[1,2,3,5])
-    df = add_return_and_rolling(df, target_col=target_col, date_col=date_col, returns_lags=[1], rolling_windows=[5,10,20])
+    df = add_lag_features(df, target_col=target_col, lags=LAGS)
+    df = add_return_and_rolling(
+        df,
+        target_col=target_col,
+        date_col=date_col,
+        returns_lags=RETURNS_LAGS,
+        rolling_windows=ROLLING_WINDOWS,
+        backend=backend,
+    )
     # target: next-day return or next-day price
     df["target"] = df[target_col].shift(-1)
     if dropna:
         df = df.dropna().reset_index(drop=True)
     return df
+
+
+def segment_positions(keys: np.ndarray) -> np.ndarray:
+    """Row position within each run of equal ``keys`` (keys must be grouped, e.g. sorted)."""
+    n = len(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return np.arange(n) - np.repeat(starts, np.diff(np.append(starts, n)))
+
+
+def prepare_panel_features(
+    df: pd.DataFrame,
+    symbol_col: str = "Symbol",
+    target_col: str = "Close",
+    date_col: str = "Date",
+    dropna: bool = True,
+    backend: str = "auto",
+    lags: List[int] = LAGS,
+    returns_lags: List[int] = RETURNS_LAGS,
+    rolling_windows: List[int] = ROLLING_WINDOWS,
+) -> pd.DataFrame:
+    """``prepare_features`` for a long (symbol, date) frame, computed for all symbols at once.
+
+    The frame is sorted once and every output column is preallocated for all rows. Lags are
+    shifted over the concatenated series and masked wherever they would reach into the
+    previous symbol; the return/rolling kernel runs once per symbol segment, so its running
+    sums restart at each symbol and long panels keep per-symbol precision.
+    """
+    df = df.sort_values([symbol_col, date_col], kind="stable").reset_index(drop=True)
+    x = df[target_col].to_numpy(dtype=np.float64)
+    n = len(x)
+    pos = segment_positions(df[symbol_col].to_numpy())
+
+    names = [f"{target_col}_lag_{lag}" for lag in lags]
+    lag_values = np.full((n, len(lags)), np.nan, order="F")
+    for j, lag in enumerate(lags):
+        if n > lag:
+            lag_values[lag:, j] = x[: n - lag]
+    # the panel path always needs an array kernel; "auto" falls back to numpy instead of pandas
+    kernel = resolve_backend(backend)
+    kernel = "numpy" if kernel == "pandas" else kernel
+    rr_names = return_and_rolling_names(returns_lags, rolling_windows)
+    rr_values = np.empty((n, len(rr_names)), order="F")
+    bounds = np.append(np.flatnonzero(pos == 0), n)
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        rr_values[begin:end] = return_and_rolling_matrix(
+            x[begin:end], returns_lags, rolling_windows, backend=kernel
+        )[1]
+
+    # rows needed inside the same symbol before each column is valid
+    warmup = (
+        list(lags)
+        + [1]
+        + [1 + lag for lag in returns_lags]
+        + [w for w in rolling_windows for _ in ("mean", "std")]
+        + list(rolling_windows)
+    )
+    values = np.concatenate([lag_values, rr_values], axis=1)
+    values[pos[:, None] < np.asarray(warmup)[None, :]] = np.nan
+
+    target = np.full(n, np.nan)
+    target[:-1] = x[1:]
+    if n:
+        # last row of each symbol has no next close within the symbol
+        target[np.r_[pos[1:] == 0, True]] = np.nan
+
+    features = pd.DataFrame(values, columns=names + rr_names, index=df.index)
+    df = pd.concat(
+        [df.drop(columns=[c for c in features.columns if c in df.columns]), features],
+        axis=1,
+    )
+    df = _add_calendar_features(df, date_col)
+    df["target"] = target
+    if dropna:
+        df = df.dropna().reset_index(drop=True)
+    return df
+
+
+def engineered_feature_names(
+    target_col: str = "Close",
+    lags: Sequence[int] = LAGS,
+    returns_lags: Sequence[int] = RETURNS_LAGS,
+    rolling_windows: Sequence[int] = ROLLING_WINDOWS,
+) -> List[str]:
+    """Columns prepare_features appends to the raw data, in the order it appends them."""
+    return (
+        [f"{target_col}_lag_{lag}" for lag in lags]
+        + return_and_rolling_names(returns_lags, rolling_windows)
+        + ["day_of_week", "month"]
+    )
+
+
+def warmup_rows(
+    lags: Sequence[int] = LAGS,
+    returns_lags: Sequence[int] = RETURNS_LAGS,
+    rolling_windows: Sequence[int] = ROLLING_WINDOWS,
+) -> int:
+    """Leading rows whose features are incomplete: the deepest lag, lagged return or (lagged) window."""
+    return max(max(lags), 1 + max(returns_lags), max(rolling_windows))
+
+
+def check_feature_order(
+    feature_names: Optional[Sequence[str]], target_col: str = "Close"
+):
+    """Raise ValueError unless a model's stored features are raw columns followed by prepare_features' columns in order."""
+    if not feature_names:
+        raise ValueError(
+            "Model has no stored feature names; retrain it on a DataFrame from prepare_features."
+        )
+    engineered = engineered_feature_names(target_col)
+    tail = list(feature_names[-len(engineered) :])
+    raw = list(feature_names[: -len(engineered)])
+    if tail != engineered or any(c in engineered for c in raw):
+        raise ValueError(
+            f"Model feature order {list(feature_names)} does not match prepare_features "
+            f"(expected raw columns followed by {engineered})."
+        )
+
+
+def feature_columns(dfp: pd.DataFrame, date_col: str = "Date") -> List[str]:
+    """Model inputs of a prepared frame: its numeric columns except the date and target, in frame order."""
+    inputs = dfp.drop(columns=[c for c in (date_col, "target") if c in dfp.columns])
+    return list(inputs.select_dtypes(include=[np.number]).columns)
+
+
+def inference_matrix(
+    dfp: pd.DataFrame,
+    feature_names: Sequence[str],
+    date_col: str = "Date",
+    warmup: Optional[int] = None,
+) -> Tuple[np.ndarray, pd.Series]:
+    """Rows of ``dfp`` (from prepare_features with dropna=False) that have complete features.
+
+    ``feature_names`` must equal ``feature_columns(dfp)`` exactly, so data with different raw
+    columns is rejected rather than silently reordered. The warm-up rows are skipped
+    analytically (``warmup_rows``); each feature column is sliced as a view and written once
+    into a C-contiguous float32 matrix, then rows still holding a NaN are dropped, as
+    training's dropna would. Returns ``(X, dates)``; ``dates`` keeps ``dfp``'s index.
+    """
+    start = warmup_rows() if warmup is None else warmup
+    expected = feature_columns(dfp, date_col)
+    if list(feature_names) != expected:
+        missing = [c for c in feature_names if c not in expected]
+        extra = [c for c in expected if c not in feature_names]
+        raise ValueError(
+            f"Data features do not match the model's: missing {missing}, unexpected {extra}"
+            + ("" if missing or extra else ", same columns in a different order")
+            + f". Expected {list(feature_names)}."
+        )
+    n = max(len(dfp) - start, 0)
+    X = np.empty((n, len(feature_names)), dtype=np.float32)
+    for j, col in enumerate(feature_names):
+        X[:, j] = dfp[col].to_numpy()[start:]
+    dates = dfp[date_col].iloc[start:]
+    complete = ~np.isnan(X).any(axis=1)
+    if not complete.all():
+        X, dates = X[complete], dates[complete]
+    return X, dates
@@ -0,0 +1,339 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence
+
+# small probability floor so empty bins do not make PSI infinite
+_EPS = 1e-4
+
+
+def reference_path_for(model_path: str) -> str:
+    """Where train.py stores the training-distribution reference for ``model_path`` (next to it, sharing its stem)."""
+    return os.path.splitext(model_path)[0] + "_drift_reference.json"
+
+
+def _bin_edges(values: np.ndarray, n_bins: int) -> List[float]:
+    """Inner bin edges at the quantiles of ``values`` (duplicates collapsed for discrete features)."""
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return []
+    return np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])).tolist()
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Counts for bins (-inf, e0], (e0, e1], ..., (e_last, inf) plus a trailing NaN bin."""
+    finite = np.isfinite(values)
+    counts = np.bincount(
+        np.searchsorted(edges, values[finite], side="left"), minlength=len(edges) + 1
+    )
+    return np.append(counts, len(values) - finite.sum())
+
+
+def build_reference(
+    X,
+    feature_names: Sequence[str],
+    errors: Optional[np.ndarray] = None,
+    n_bins: int = 10,
+) -> Dict:
+    """Fixed bins and training proportions per feature (and optionally per error) for ``DriftMonitor``."""
+    X = np.asarray(X, dtype=np.float64)
+    features = {}
+    for j, name in enumerate(feature_names):
+        edges = _bin_edges(X[:, j], n_bins)
+        features[name] = {
+            "edges": edges,
+            "counts": _histogram(X[:, j], np.asarray(edges)).tolist(),
+        }
+    reference = {"n_rows": int(len(X)), "features": features}
+    if errors is not None:
+        errors = np.asarray(errors, dtype=np.float64)
+        errors = errors[np.isfinite(errors)]
+        edges = _bin_edges(errors, n_bins)
+        reference["errors"] = {
+            "edges": edges,
+            "counts": _histogram(errors, np.asarray(edges)).tolist(),
+            "rmse": float(np.sqrt(np.mean(errors**2))) if len(errors) else None,
+            "mae": float(np.mean(np.abs(errors))) if len(errors) else None,
+        }
+    return reference
+
+
+def save_reference(reference: Dict, path: str) -> str:
+    with open(path, "w") as f:
+        json.dump(reference, f)
+    return path
+
+
+def load_reference(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two histograms over the same bins."""
+    p = np.maximum(expected / max(expected.sum(), 1), _EPS)
+    q = np.maximum(actual / max(actual.sum(), 1), _EPS)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov distance between histograms, evaluated at the bin edges (a lower bound of the exact KS)."""
+    p = np.cumsum(expected) / max(expected.sum(), 1)
+    q = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(p - q))) if len(p) else 0.0
+
+
+class DriftMonitor:
+    """Fixed-memory drift statistics over live features and realized errors.
+
+    Each feature keeps one counter per reference bin, so an update costs a
+    ``searchsorted`` over the new rows and memory never grows with traffic; no raw
+    rows are stored. Errors also keep Welford mean/variance and a running absolute
+    sum. PSI and KS are computed from the counters on demand.
+
+    Updates given row ``times`` (and optionally ``symbols``) only count rows newer than
+    the last one already ingested for that symbol, so clients resubmitting overlapping
+    history do not count the same bar twice.
+
+    Counters live in process memory: under gunicorn each worker reports drift over
+    the requests it served, not over all traffic.
+    """
+
+    def __init__(
+        self,
+        reference: Dict,
+        psi_threshold: float = 0.2,
+        ks_threshold: float = 0.2,
+        error_ratio_threshold: float = 1.5,
+        min_count: int = 100,
+    ):
+        self.reference = reference
+        self.feature_names = list(reference["features"])
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.error_ratio_threshold = error_ratio_threshold
+        self.min_count = min_count
+        self._edges = [
+            np.asarray(reference["features"][n]["edges"], dtype=np.float64)
+            for n in self.feature_names
+        ]
+        self._ref_counts = [
+            np.asarray(reference["features"][n]["counts"], dtype=np.float64)
+            for n in self.feature_names
+        ]
+        errors = reference.get("errors") or {}
+        self._error_edges = np.asarray(errors.get("edges", []), dtype=np.float64)
+        self._ref_error_counts = np.asarray(
+            errors.get("counts", [0, 0]), dtype=np.float64
+        )
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.counts = [np.zeros(len(c), dtype=np.int64) for c in self._ref_counts]
+            self.error_counts = np.zeros(len(self._ref_error_counts), dtype=np.int64)
+            self.n_errors = 0
+            self.error_mean = 0.0
+            self.error_m2 = 0.0
+            self.error_abs_sum = 0.0
+            # per stream, symbol -> last ingested timestamp (int64 ns)
+            self._last_seen: Dict[str, Dict] = {"features": {}, "errors": {}}
+
+    def _unseen(self, stream: str, times, symbols=None) -> np.ndarray:
+        """Mask of rows newer than the last ingested row of their symbol; advances the watermarks."""
+        times = np.asarray(times, dtype="datetime64[ns]").view(np.int64)
+        if symbols is None:
+            keys, codes = [None], np.zeros(len(times), dtype=np.int64)
+        else:
+            keys, codes = np.unique(np.asarray(symbols), return_inverse=True)
+        mask = np.zeros(len(times), dtype=bool)
+        with self._lock:
+            last_seen = self._last_seen[stream]
+            for code, key in enumerate(keys):
+                rows = codes == code
+                last = last_seen.get(key)
+                mask[rows] = times[rows] > last if last is not None else True
+                if mask[rows].any():
+                    last_seen[key] = int(times[rows].max())
+        return mask
+
+    def update(self, X, times=None, symbols=None) -> None:
+        """Add feature rows (columns in the reference's feature order), skipping already-seen ``times``."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if times is not None:
+            X = X[self._unseen("features", times, symbols)]
+        if len(X) == 0:
+            return
+        hists = [_histogram(X[:, j], edges) for j, edges in enumerate(self._edges)]
+        with self._lock:
+            self.rows += len(X)
+            for counts, h in zip(self.counts, hists):
+                counts += h
+
+    def update_errors(self, errors, times=None, symbols=None) -> None:
+        """Add realized forecast errors (prediction - actual); NaNs and already-seen ``times`` are ignored."""
+        errors = np.asarray(errors, dtype=np.float64).ravel()
+        finite = np.isfinite(errors)
+        errors = errors[finite]
+        if times is not None:
+            # a row's error only becomes known with the next bar, so it is tracked apart from its features
+            symbols = None if symbols is None else np.asarray(symbols)[finite]
+            errors = errors[self._unseen("errors", np.asarray(times)[finite], symbols)]
+        if len(errors) == 0:
+            return
+        h = _histogram(errors, self._error_edges)
+        n_b = len(errors)
+        mean_b = float(errors.mean())
+        m2_b = float(((errors - mean_b) ** 2).sum())
+        with self._lock:
+            self.error_counts += h
+            # Chan et al. merge of the batch into the running Welford accumulators
+            n = self.n_errors + n_b
+            delta = mean_b - self.error_mean
+            self.error_mean += delta * n_b / n
+            self.error_m2 += m2_b + delta**2 * self.n_errors * n_b / n
+            self.n_errors = n
+            self.error_abs_sum += float(np.abs(errors).sum())
+
+    def report(self) -> Dict:
+        with self._lock:
+            counts = [c.copy() for c in self.counts]
+            rows = self.rows
+            error_counts = self.error_counts.copy()
+            n_errors, mean, m2, abs_sum = (
+                self.n_errors,
+                self.error_mean,
+                self.error_m2,
+                self.error_abs_sum,
+            )
+        features = {}
+        drifted = []
+        for name, ref, live in zip(self.feature_names, self._ref_counts, counts):
+            stats = {
+                "psi": round(psi(ref, live), 4),
+                "ks": round(ks(ref, live), 4),
+                "missing": int(live[-1]),
+            }
+            features[name] = stats
+            if rows >= self.min_count and (
+                stats["psi"] > self.psi_threshold or stats["ks"] > self.ks_threshold
+            ):
+                drifted.append(name)
+        report = {"rows": rows, "features": features, "drifted_features": drifted}
+        ref_errors = self.reference.get("errors") or {}
+        if n_errors:
+            rmse = float(np.sqrt(m2 / n_errors + mean**2))
+            errors = {
+                "count": n_errors,
+                "mean": round(mean, 4),
+                "std": round(float(np.sqrt(m2 / n_errors)), 4),
+                "mae": round(abs_sum / n_errors, 4),
+                "rmse": round(rmse, 4),
+                "reference_rmse": ref_errors.get("rmse"),
+                "psi": round(psi(self._ref_error_counts, error_counts), 4),
+            }
+            ratio = rmse / ref_errors["rmse"] if ref_errors.get("rmse") else None
+            errors["rmse_ratio"] = round(ratio, 4) if ratio is not None else None
+            errors["drift"] = bool(
+                n_errors >= self.min_count
+                and ratio is not None
+                and ratio > self.error_ratio_threshold
+            )
+            report["errors"] = errors
+        report["drift"] = bool(drifted) or bool(report.get("errors", {}).get("drift"))
+        return report
+
+
+class RetrainTrigger:
+    """Call ``start_retrain`` when a drift report says so, at most once per ``cooldown`` seconds.
+
+    Each server process builds its own trigger. With ``marker_path`` the cooldown is
+    shared through that file instead: a process claims a retrain under an exclusive
+    lock file and records the time in the marker, so N gunicorn workers seeing the same
+    drift start one training run, not N.
+    """
+
+    # a lock file older than this was left by a process that died while holding it
+    LOCK_TIMEOUT = 60.0
+
+    def __init__(
+        self,
+        start_retrain: Callable[[], None],
+        cooldown: float = 6 * 3600,
+        enabled: bool = True,
+        marker_path: Optional[str] = None,
+    ):
+        self.start_retrain = start_retrain
+        self.cooldown = cooldown
+        self.enabled = enabled
+        self.marker_path = marker_path
+        self.last_triggered: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _read_marker(self) -> Optional[float]:
+        try:
+            with open(self.marker_path) as f:
+                return float(json.load(f)["triggered"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _claim_marker(self, now: float) -> bool:
+        """Record ``now`` in the shared marker unless another process triggered within the cooldown."""
+        lock_path = self.marker_path + ".lock"
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if now - os.path.getmtime(lock_path) > self.LOCK_TIMEOUT:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            return False
+        try:
+            last = self._read_marker()
+            if last is not None and now - last < self.cooldown:
+                self.last_triggered = last
+                return False
+            tmp_path = f"{self.marker_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"triggered": now, "pid": os.getpid()}, f)
+            os.replace(tmp_path, self.marker_path)
+            return True
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+    def check(self, report: Dict) -> bool:
+        """Start a retrain if ``report`` shows drift and the cooldown has passed; returns whether one was started."""
+        if not (self.enabled and report.get("drift")):
+            return False
+        with self._lock:
+            now = time.time()
+            if (
+                self.last_triggered is not None
+                and now - self.last_triggered < self.cooldown
+            ):
+                return False
+            if self.marker_path is not None and not self._claim_marker(now):
+                return False
+            self.last_triggered = now
+        self.start_retrain()
+        return True
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "cooldown_seconds": self.cooldown,
+            "last_triggered": (
+                self._read_marker() if self.marker_path else self.last_triggered
+            ),
+        }
@@ -0,0 +1,271 @@
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+from ._optional import require
+from .compiled import NativePredictor
+from .model import DEFAULT_PARAMS
+
+COMBINE_MODES = ("mean", "stack")
+
+
+def ensemble_path_for(model_path: str) -> str:
+    """Where train.py stores the ensemble trained alongside ``model_path`` (``<stem>_ensemble.joblib``)."""
+    return os.path.splitext(model_path)[0] + "_ensemble.joblib"
+
+
+def _affine(model):
+    """Collapse a fitted imputer -> scaler -> linear model pipeline into ``(fill, coef, intercept)``, or None."""
+    steps = [step for _, step in getattr(model, "steps", [("model", model)])]
+    *transforms, linear = steps
+    if not hasattr(linear, "coef_") or np.ndim(linear.coef_) != 1:
+        return None
+    coef = np.asarray(linear.coef_, dtype=np.float64)
+    intercept = float(linear.intercept_)
+    fill = None
+    for step in reversed(transforms):
+        name = type(step).__name__
+        if name == "StandardScaler":
+            scale = step.scale_ if step.scale_ is not None else 1.0
+            mean = step.mean_ if step.mean_ is not None else 0.0
+            coef = coef / scale
+            intercept -= float(np.dot(mean, coef))
+        elif (
+            name == "SimpleImputer"
+            and step is transforms[0]
+            and step.statistics_.shape == coef.shape
+        ):
+            fill = np.asarray(step.statistics_, dtype=np.float64)
+        else:
+            return None
+    return fill, coef, intercept
+
+
+class LinearPredictor:
+    """Wrap a fitted sklearn regressor (the linear baseline) with the predictor interface.
+
+    An imputer/scaler/linear pipeline is folded into one affine map at load time, so
+    prediction is a single matrix-vector product without sklearn's per-call validation.
+    """
+
+    kind = "linear"
+
+    def __init__(self, model, feature_names: Optional[List[str]] = None):
+        self.model = model
+        self.feature_names = feature_names
+        self._affine = _affine(model)
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if self._affine is None:
+            return self.model.predict(X)
+        fill, coef, intercept = self._affine
+        X = X.astype(np.float64)
+        if fill is not None:
+            missing = np.isnan(X)
+            if missing.any():
+                X[missing] = np.broadcast_to(fill, X.shape)[missing]
+        return X @ coef + intercept
+
+
+def _member(model, feature_names):
+    return (
+        NativePredictor(model)
+        if hasattr(model, "get_booster")
+        else LinearPredictor(model, feature_names)
+    )
+
+
+class EnsemblePredictor:
+    """Weighted combination of member predictors evaluated in parallel threads.
+
+    The float32 feature matrix is built once and shared read-only by every member.
+    XGBoost's in-place prediction and the BLAS call in the linear baseline release
+    the GIL, so members really run concurrently and latency stays close to the
+    slowest member's. Batches under ``parallel_min_rows`` run inline, where thread
+    hand-off would cost more than the members themselves. The thread pool is created
+    lazily per process, so it is safe to preload before a gunicorn fork.
+
+    Each XGBoost member is limited to ``threads_per_member`` threads (default: the
+    CPU count divided by the number of boosters), so concurrent members split the
+    cores instead of each starting a full-width OpenMP team and oversubscribing them.
+    """
+
+    kind = "ensemble"
+
+    def __init__(
+        self,
+        members: Sequence,
+        weights: Sequence[float],
+        feature_names: List[str],
+        names: Optional[List[str]] = None,
+        parallel_min_rows: int = 64,
+        threads_per_member: Optional[int] = None,
+    ):
+        self.members = list(members)
+        self.parallel_min_rows = parallel_min_rows
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.feature_names = feature_names
+        self.names = names or [f"member_{i}" for i in range(len(self.members))]
+        self._pool = None
+        self._pid = None
+        boosters = [m.booster for m in self.members if hasattr(m, "booster")]
+        if threads_per_member is None:
+            threads_per_member = max(1, (os.cpu_count() or 1) // max(1, len(boosters)))
+        self.threads_per_member = threads_per_member
+        for booster in boosters:
+            booster.set_param({"nthread": threads_per_member})
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = ThreadPoolExecutor(
+                max_workers=len(self.members), thread_name_prefix="ensemble"
+            )
+            self._pid = os.getpid()
+        return self._pool
+
+    def predict_members(self, X) -> np.ndarray:
+        """(n_rows, n_members) predictions."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(self.members) == 1 or len(X) < self.parallel_min_rows:
+            return np.column_stack(
+                [np.asarray(m.predict(X), dtype=np.float64) for m in self.members]
+            )
+        futures = [self._executor().submit(m.predict, X) for m in self.members]
+        return np.column_stack(
+            [np.asarray(f.result(), dtype=np.float64) for f in futures]
+        )
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_members(X) @ self.weights
+
+    def to_spec(self) -> Dict:
+        """Picklable description (models, weights, names) for ``save_model``."""
+        return {
+            "kind": self.kind,
+            "models": [m.model for m in self.members],
+            "weights": self.weights.tolist(),
+            "feature_names": self.feature_names,
+            "names": self.names,
+        }
+
+    @classmethod
+    def from_spec(cls, spec: Dict) -> "EnsemblePredictor":
+        members = [_member(m, spec["feature_names"]) for m in spec["models"]]
+        return cls(members, spec["weights"], spec["feature_names"], spec["names"])
+
+
+def stacking_weights(predictions: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Non-negative weights summing to one that minimise squared error of ``predictions @ w`` against ``y``."""
+    from scipy.optimize import nnls
+
+    weights, _ = nnls(predictions, y)
+    if weights.sum() == 0:
+        return np.full(predictions.shape[1], 1.0 / predictions.shape[1])
+    return weights / weights.sum()
+
+
+def train_ensemble(
+    X: pd.DataFrame,
+    y: pd.Series,
+    seeds: Sequence[int] = (0, 1, 2),
+    params: dict = None,
+    include_linear: bool = True,
+    combine: str = "mean",
+    holdout: float = 0.2,
+) -> EnsemblePredictor:
+    """Train XGBoost members that differ by seed (row/column subsampling) plus a Ridge baseline.
+
+    ``combine="mean"`` averages members; ``"stack"`` fits non-negative weights on the
+    last ``holdout`` fraction of rows (members fit on the earlier rows), then refits
+    every member on all rows.
+    """
+    if combine not in COMBINE_MODES:
+        raise ValueError(
+            f"Unknown combine mode {combine!r}; expected one of {COMBINE_MODES}"
+        )
+    xgb = require("xgboost", "to train the model")
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if params is None:
+        params = DEFAULT_PARAMS
+
+    def build():
+        models = [
+            xgb.XGBRegressor(
+                **{
+                    "subsample": 0.8,
+                    "colsample_bytree": 0.8,
+                    **params,
+                    "random_state": seed,
+                }
+            )
+            for seed in seeds
+        ]
+        if include_linear:
+            # imputer: exogenous and context features can be NaN, which XGBoost handles natively
+            models.append(
+                make_pipeline(
+                    SimpleImputer(strategy="median"), StandardScaler(), Ridge(alpha=1.0)
+                )
+            )
+        return models
+
+    def fit(model, X_part, y_part):
+        if hasattr(model, "get_booster"):
+            return model.fit(X_part, y_part, verbose=False)
+        # the baseline is served with plain float32 arrays, so fit it on one
+        return model.fit(X_part.to_numpy(dtype=np.float32), y_part)
+
+    names = [f"xgb_seed_{seed}" for seed in seeds] + (
+        ["ridge"] if include_linear else []
+    )
+    feature_names = list(X.columns)
+    if combine == "stack":
+        cut = int(len(X) * (1 - holdout))
+        fitted = [fit(m, X.iloc[:cut], y.iloc[:cut]) for m in build()]
+        held_out = EnsemblePredictor(
+            [_member(m, feature_names) for m in fitted],
+            np.ones(len(fitted)),
+            feature_names,
+        )
+        weights = stacking_weights(
+            held_out.predict_members(X.iloc[cut:]),
+            y.iloc[cut:].to_numpy(dtype=np.float64),
+        )
+    else:
+        weights = np.full(len(names), 1.0 / len(names))
+    models = [fit(m, X, y) for m in build()]
+    return EnsemblePredictor(
+        [_member(m, feature_names) for m in models], weights, feature_names, names
+    )
+
+
+class ABRouter:
+    """Send a ``fraction`` of requests to the candidate arm and count traffic per arm."""
+
+    def __init__(self, fraction: float = 0.0, seed: Optional[int] = None):
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError(f"fraction must be between 0 and 1, got {fraction}")
+        self.fraction = fraction
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {"primary": 0, "candidate": 0}
+
+    def choose(self) -> str:
+        """``"candidate"`` with probability ``fraction``, else ``"primary"``."""
+        with self._lock:
+            arm = "candidate" if self._random.random() < self.fraction else "primary"
+            self.counts[arm] += 1
+        return arm
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {"fraction": self.fraction, "requests": dict(self.counts)}
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from ._optional import require
+
+# per-row quantities summed per segment; metrics are derived from the sums
+_SUMS = [
+    "err",
+    "sq_err",
+    "abs_err",
+    "ape",
+    "ape_n",
+    "dir_hit",
+    "dir_n",
+    "within_1pct",
+    "within_2pct",
+    "within_5pct",
+]
+
+
+def align_predictions(
+    predictions: pd.DataFrame,
+    actuals: pd.DataFrame,
+    date_col: str = "Date",
+    pred_col: str = "predicted_next_day_close",
+    target_col: str = "Close",
+    symbol_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Attach the realized next-period close (``y_true``) and the close at prediction time (``y_prev``) to each prediction."""
+    keys = [symbol_col, date_col] if symbol_col else [date_col]
+    act = actuals[keys + [target_col]].sort_values(keys, kind="stable")
+    close = act[target_col].to_numpy(dtype=np.float64)
+    nxt = np.empty_like(close)
+    nxt[:-1] = close[1:]
+    nxt[-1:] = np.nan
+    if symbol_col:
+        sym = act[symbol_col].to_numpy()
+        nxt[:-1][sym[1:] != sym[:-1]] = np.nan
+    act = pd.DataFrame(
+        {**{k: act[k].to_numpy() for k in keys}, "y_prev": close, "y_true": nxt}
+    )
+    merged = predictions[keys + [pred_col]].merge(act, on=keys, how="inner")
+    merged = merged.rename(columns={pred_col: "y_pred"})
+    return merged[np.isfinite(merged["y_true"].to_numpy())].reset_index(drop=True)
+
+
+def _error_matrix(
+    y_true: np.ndarray, y_pred: np.ndarray, y_prev: Optional[np.ndarray]
+) -> np.ndarray:
+    n = len(y_true)
+    M = np.zeros((n, len(_SUMS)))
+    err = y_pred - y_true
+    abs_err = np.abs(err)
+    nonzero = y_true != 0
+    ape = np.divide(abs_err, np.abs(y_true), out=np.zeros(n), where=nonzero)
+    M[:, 0] = err
+    M[:, 1] = err * err
+    M[:, 2] = abs_err
+    M[:, 3] = ape
+    M[:, 4] = nonzero
+    if y_prev is not None:
+        has_prev = np.isfinite(y_prev)
+        M[:, 5] = has_prev & (np.sign(y_pred - y_prev) == np.sign(y_true - y_prev))
+        M[:, 6] = has_prev
+    M[:, 7] = nonzero & (ape <= 0.01)
+    M[:, 8] = nonzero & (ape <= 0.02)
+    M[:, 9] = nonzero & (ape <= 0.05)
+    return M
+
+
+def _metrics_from_sums(sums: np.ndarray, counts: np.ndarray) -> Dict[str, np.ndarray]:
+    s = dict(zip(_SUMS, sums.T))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "count": counts,
+            "rmse": np.sqrt(s["sq_err"] / counts),
+            "mae": s["abs_err"] / counts,
+            "bias": s["err"] / counts,
+            "mape": 100 * s["ape"] / s["ape_n"],
+            "directional_accuracy": s["dir_hit"] / s["dir_n"],
+            "within_1pct": s["within_1pct"] / s["ape_n"],
+            "within_2pct": s["within_2pct"] / s["ape_n"],
+            "within_5pct": s["within_5pct"] / s["ape_n"],
+        }
+
+
+def segment_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    y_prev: Optional[np.ndarray] = None,
+    starts: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Error metrics for each contiguous segment beginning at ``starts`` (whole array if None).
+
+    All metrics come from one error matrix reduced with a single ``np.add.reduceat``.
+    """
+    M = _error_matrix(y_true, y_pred, y_prev)
+    starts = (
+        np.zeros(1, dtype=np.intp)
+        if starts is None
+        else np.asarray(starts, dtype=np.intp)
+    )
+    sums = (
+        np.add.reduceat(M, starts, axis=0)
+        if len(M)
+        else np.zeros((len(starts), len(_SUMS)))
+    )
+    counts = np.diff(np.append(starts, len(M)))
+    return _metrics_from_sums(sums, counts)
+
+
+def rolling_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    window: int,
+    starts: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Trailing-window RMSE/MAE per row from cumulative sums; windows never cross segment starts."""
+    err = y_pred - y_true
+    csum = np.zeros((len(err) + 1, 2))
+    np.cumsum(np.column_stack([err * err, np.abs(err)]), axis=0, out=csum[1:])
+    idx = np.arange(len(err))
+    starts = (
+        np.zeros(1, dtype=np.intp)
+        if starts is None
+        else np.asarray(starts, dtype=np.intp)
+    )
+    seg_start = np.repeat(starts, np.diff(np.append(starts, len(err))))
+    lo = idx + 1 - window
+    full = lo >= seg_start
+    totals = csum[idx + 1] - csum[np.maximum(lo, 0)]
+    rmse = np.where(full, np.sqrt(totals[:, 0] / window), np.nan)
+    mae = np.where(full, totals[:, 1] / window, np.nan)
+    return {f"rolling_rmse_{window}": rmse, f"rolling_mae_{window}": mae}
+
+
+def _to_records(
+    labels: Dict[str, np.ndarray], metrics: Dict[str, np.ndarray]
+) -> List[Dict]:
+    table = pd.DataFrame({**labels, **metrics})
+    table = table.astype({"count": int}).replace({np.nan: None})
+    return table.to_dict(orient="records")
+
+
+def evaluate_aligned(
+    aligned: pd.DataFrame,
+    group_col: str = "group",
+    date_col: str = "Date",
+    period: Optional[str] = "M",
+    window: Optional[int] = 20,
+) -> Tuple[Dict, pd.DataFrame]:
+    """Evaluate aligned predictions (see ``align_predictions``) overall, per group and per period.
+
+    Returns ``(report, rows)``: a JSON-serializable report and a per-row frame with rolling errors.
+    """
+    if group_col not in aligned.columns:
+        aligned = aligned.assign(**{group_col: "all"})
+    aligned = aligned.sort_values([group_col, date_col], kind="stable").reset_index(
+        drop=True
+    )
+    y_true = aligned["y_true"].to_numpy(dtype=np.float64)
+    y_pred = aligned["y_pred"].to_numpy(dtype=np.float64)
+    y_prev = (
+        aligned["y_prev"].to_numpy(dtype=np.float64)
+        if "y_prev" in aligned.columns
+        else None
+    )
+    groups = aligned[group_col].to_numpy()
+    group_starts = (
+        np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        if len(groups)
+        else np.zeros(0, dtype=np.intp)
+    )
+
+    report = {
+        "overall": _to_records({}, segment_metrics(y_true, y_pred, y_prev))[0],
+        "groups": _to_records(
+            {group_col: groups[group_starts]},
+            segment_metrics(y_true, y_pred, y_prev, group_starts),
+        ),
+    }
+    rows = aligned
+    if period:
+        periods = aligned[date_col].dt.to_period(period).array
+        codes = periods.asi8
+        change = np.r_[True, (groups[1:] != groups[:-1]) | (codes[1:] != codes[:-1])]
+        period_starts = np.flatnonzero(change)
+        report["periods"] = _to_records(
+            {
+                group_col: groups[period_starts],
+                "period": periods[period_starts].astype(str),
+            },
+            segment_metrics(y_true, y_pred, y_prev, period_starts),
+        )
+    if window:
+        rows = aligned.assign(**rolling_metrics(y_true, y_pred, window, group_starts))
+    return report, rows
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """Write ``df`` to .parquet (needs pyarrow) or .csv depending on the extension."""
+    if path.endswith(".parquet"):
+        require("pyarrow", "to write Parquet")
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
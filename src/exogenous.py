@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def _digests(
+    path: str, prefix_bytes: int, chunk_size: int = 1 << 20
+) -> Tuple[str, str]:
+    """sha256 of the first ``prefix_bytes`` of ``path`` and of the whole file, in one read."""
+    h = hashlib.sha256()
+    remaining = prefix_bytes
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+        prefix = h.hexdigest()
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return prefix, h.hexdigest()
+
+
+# derived columns kept per side series, in the order they are stored
+SERIES_FEATURES = ("level", "ret_1")
+
+
+def _derive(values: np.ndarray, previous: float = np.nan) -> np.ndarray:
+    """(n, len(SERIES_FEATURES)) matrix for new raw values; ``previous`` is the last cached raw value."""
+    out = np.empty((len(values), len(SERIES_FEATURES)))
+    out[:, 0] = values
+    prev = np.empty(len(values))
+    prev[:1] = previous
+    prev[1:] = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 1] = values / prev - 1
+    return out
+
+
+class ExogenousStore:
+    """Columnar cache of side series (index levels, FX, commodities) for as-of joins.
+
+    Each series is kept as a sorted int64 ``dates`` array (when the value became
+    available) and a float64 ``values`` matrix with one column per ``SERIES_FEATURES``,
+    persisted as .npy files under ``cache_dir`` when given. ``update`` only derives
+    features for rows newer than the cached tail. ``update_csv`` records how many bytes
+    of the source file were ingested and their digest: when the file only grew (a daily
+    append) just the new rows are derived, and when those bytes changed (corrected
+    history, or the name reused for another file) the series is rebuilt.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.series: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # name -> {"bytes": size of the CSV ingested, "sha256": digest of those bytes}
+        self.sources: Dict[str, Optional[Dict]] = {}
+        self._groups = None
+        if cache_dir and os.path.exists(os.path.join(cache_dir, "series.json")):
+            with open(os.path.join(cache_dir, "series.json")) as f:
+                saved = json.load(f)
+                # older caches stored a plain list of names without sources
+                self.sources = (
+                    saved if isinstance(saved, dict) else dict.fromkeys(saved)
+                )
+                for name in self.sources:
+                    self.series[name] = (
+                        np.load(os.path.join(cache_dir, f"{name}.dates.npy")),
+                        np.load(os.path.join(cache_dir, f"{name}.values.npy")),
+                    )
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.series)
+
+    def update(
+        self,
+        name: str,
+        df: pd.DataFrame,
+        date_col: str = "Date",
+        value_col: str = "Close",
+        publication_lag: Optional[str] = None,
+        replace: bool = False,
+    ) -> int:
+        """Append rows of ``df`` newer than the cached series; returns the number of rows added.
+
+        ``publication_lag`` (e.g. "16h") shifts each timestamp to when the value is actually
+        known, for series that settle after the target market closes. ``replace`` discards
+        the cached series first, so ``df`` becomes the whole history.
+        """
+        if replace and name in self.series:
+            del self.series[name]
+            self._groups = None
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        if publication_lag:
+            dates = dates + pd.Timedelta(publication_lag).value
+        values = df[value_col].to_numpy(dtype=np.float64)
+        order = np.argsort(dates, kind="stable")
+        dates, values = dates[order], values[order]
+        if len(dates):
+            # last value wins for repeated timestamps
+            keep = np.r_[dates[1:] != dates[:-1], True]
+            dates, values = dates[keep], values[keep]
+        cached_dates, cached_values = self.series.get(
+            name, (np.zeros(0, np.int64), np.zeros((0, len(SERIES_FEATURES))))
+        )
+        if len(cached_dates):
+            new = dates > cached_dates[-1]
+            dates, values = dates[new], values[new]
+            previous = cached_values[-1, 0]
+        else:
+            previous = np.nan
+        if len(dates) == 0:
+            if replace:
+                self.series[name] = (cached_dates, cached_values)
+                self._save(name)
+            return 0
+        self.series[name] = (
+            np.concatenate([cached_dates, dates]),
+            np.concatenate([cached_values, _derive(values, previous)]),
+        )
+        self._groups = None
+        self._save(name)
+        return len(dates)
+
+    def update_csv(
+        self,
+        name: str,
+        path: str,
+        date_col: str = "Date",
+        value_col: str = "Close",
+        **kwargs,
+    ) -> int:
+        """Load ``path`` into series ``name``; returns the number of rows added.
+
+        An unchanged file is not parsed; an appended one only adds rows newer than the
+        cache; one whose already-ingested bytes changed rebuilds the series.
+        """
+        size = os.path.getsize(path)
+        source = self.sources.get(name)
+        ingested = (
+            source["bytes"] if isinstance(source, dict) and name in self.series else -1
+        )
+        prefix, digest = _digests(path, ingested if 0 <= ingested <= size else 0)
+        appended = 0 <= ingested <= size and prefix == source["sha256"]
+        if appended and ingested == size:
+            return 0
+        df = pd.read_csv(path, usecols=[date_col, value_col])
+        df[date_col] = pd.to_datetime(df[date_col])
+        self.sources[name] = {"bytes": size, "sha256": digest}
+        rows = self.update(
+            name,
+            df,
+            date_col=date_col,
+            value_col=value_col,
+            replace=not appended,
+            **kwargs,
+        )
+        self._save(name)  # records the new source even when no row was added
+        return rows
+
+    def _save(self, name: str):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        dates, values = self.series[name]
+        np.save(os.path.join(self.cache_dir, f"{name}.dates.npy"), dates)
+        np.save(os.path.join(self.cache_dir, f"{name}.values.npy"), values)
+        with open(os.path.join(self.cache_dir, "series.json"), "w") as f:
+            json.dump({n: self.sources.get(n) for n in self.names}, f)
+
+    def feature_names(self, names: Optional[Sequence[str]] = None) -> List[str]:
+        return [
+            f"{name}_{feat}"
+            for name in (names or self.names)
+            for feat in SERIES_FEATURES
+        ]
+
+    def calendar_groups(self) -> List[Tuple[np.ndarray, List[str], np.ndarray]]:
+        """Series sharing identical timestamps, as ``(dates, names, stacked values)``; cached until the next update."""
+        if self._groups is None:
+            groups: Dict[str, Tuple[np.ndarray, List[str], List[np.ndarray]]] = {}
+            for name, (dates, values) in self.series.items():
+                key = hashlib.sha1(dates.tobytes()).hexdigest()
+                groups.setdefault(key, (dates, [], []))
+                groups[key][1].append(name)
+                groups[key][2].append(values)
+            self._groups = [(d, n, np.hstack(v)) for d, n, v in groups.values()]
+        return self._groups
+
+
+def add_exogenous_features(
+    df: pd.DataFrame,
+    store: ExogenousStore,
+    names: Optional[Sequence[str]] = None,
+    date_col: str = "Date",
+    max_staleness: Optional[str] = None,
+    as_of=None,
+) -> pd.DataFrame:
+    """As-of join of side series onto ``df``: each row gets the latest value available at or before its timestamp.
+
+    ``as_of`` overrides the timestamps joined on (one per row), e.g. the end of each
+    resampled bar rather than its label.
+
+    Series with the same calendar share one ``searchsorted`` and one fancy-index of their
+    stacked value matrix, so cost grows with the number of distinct calendars rather than
+    the number of covariates. Values older than ``max_staleness`` become NaN.
+    """
+    wanted = set(names or store.names)
+    ts = np.asarray(
+        df[date_col] if as_of is None else as_of, dtype="datetime64[ns]"
+    ).view(np.int64)
+    limit = pd.Timedelta(max_staleness).value if max_staleness else None
+    columns, blocks = [], []
+    for dates, group_names, values in store.calendar_groups():
+        keep = [i for i, name in enumerate(group_names) if name in wanted]
+        if not keep:
+            continue
+        width = len(SERIES_FEATURES)
+        cols = np.concatenate([np.arange(i * width, (i + 1) * width) for i in keep])
+        # index of the last side row with date <= ts; -1 when the series has not started
+        pos = np.searchsorted(dates, ts, side="right") - 1
+        valid = pos >= 0
+        if limit is not None:
+            valid &= ts - dates[np.maximum(pos, 0)] <= limit
+        block = values[np.maximum(pos, 0)[:, None], cols[None, :]]
+        block[~valid] = np.nan
+        blocks.append(block)
+        columns += store.feature_names([group_names[i] for i in keep])
+    if not blocks:
+        return df
+    features = pd.DataFrame(np.hstack(blocks), columns=columns, index=df.index)
+    # keep the caller's requested series order
+    features = features[
+        store.feature_names([n for n in (names or store.names) if n in store.series])
+    ]
+    return pd.concat(
+        [df.drop(columns=[c for c in features.columns if c in df.columns]), features],
+        axis=1,
+    )
+
+
+def load_exogenous(
+    specs: Sequence[str], cache_dir: Optional[str] = None
+) -> Tuple[ExogenousStore, List[str]]:
+    """Build a store from ``NAME=CSV`` specs (CSV with Date and Close columns); returns ``(store, names)``.
+
+    With a ``cache_dir`` a CSV that has not changed since the last run is not re-read.
+    """
+    store = ExogenousStore(cache_dir)
+    names = []
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            raise ValueError(
+                f"Exogenous series must be given as NAME=CSV, got {spec!r}"
+            )
+        store.update_csv(name, path)
+        names.append(name)
+    return store, names
+
+
+def exogenous_series_in(feature_names: Sequence[str]) -> List[str]:
+    """Side series a model was trained with, recognised by their full set of derived feature columns."""
+    present = set(feature_names)
+    suffix = f"_{SERIES_FEATURES[0]}"
+    candidates = [c[: -len(suffix)] for c in feature_names if c.endswith(suffix)]
+    return [
+        n
+        for n in candidates
+        if all(f"{n}_{feat}" in present for feat in SERIES_FEATURES)
+    ]
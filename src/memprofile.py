@@ -0,0 +1,260 @@
+import html
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active: Optional["MemoryProfiler"] = None
+
+MB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable, None where neither is)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryProfiler:
+    """Per-stage peak and net memory from tracemalloc plus a background RSS sampler.
+
+    tracemalloc sees Python and NumPy allocations (pandas frames, feature matrices);
+    native allocations such as XGBoost's DMatrix and boosters only show up in RSS,
+    which a thread samples every ``interval`` seconds (RSS is reported as unavailable on
+    platforms without /proc or ``resource``, e.g. Windows). Stages nest: a parent's peak
+    includes its children's, and each stage is reported under its ``parent/child`` path.
+    Python 3.8 has no ``tracemalloc.reset_peak``, so there a stage's traced peak is the
+    highest point reached since the profiler started (an upper bound).
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stages: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._rss_peak = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracing = False
+
+    def start(self) -> "MemoryProfiler":
+        global _active
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.rss_available = current_rss() is not None
+        self._rss_baseline = self._rss()
+        self._rss_peak = self._rss_baseline
+        self._running = True
+        if self.rss_available:
+            self._thread = threading.Thread(
+                target=self._sample, name="memprofile-rss", daemon=True
+            )
+            self._thread.start()
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.traced_peak = (
+            tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        )
+        if self._started_tracing:
+            tracemalloc.stop()
+        if _active is self:
+            _active = None
+
+    def __enter__(self) -> "MemoryProfiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _rss(self) -> int:
+        return current_rss() or 0
+
+    def _sample(self):
+        while self._running:
+            self._rss_peak = max(self._rss_peak, self._rss())
+            time.sleep(self.interval)
+
+    def _take_peaks(self):
+        """Peaks since the last call (traced, RSS); resets both so the next window starts fresh."""
+        rss = self._rss()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        rss_peak = max(self._rss_peak, rss)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._rss_peak = rss
+        return traced_peak, rss_peak
+
+    @contextmanager
+    def stage(self, name: str):
+        if self._stack:
+            # fold the parent's peak so far into its record before the child resets the counters
+            parent = self._stack[-1]
+            traced, rss = self._take_peaks()
+            parent["traced_peak"] = max(parent["traced_peak"], traced)
+            parent["rss_peak"] = max(parent["rss_peak"], rss)
+            name = f"{parent['stage']}/{name}"
+        else:
+            self._take_peaks()
+        record = {
+            "stage": name,
+            "traced_start": tracemalloc.get_traced_memory()[0],
+            "rss_start": self._rss(),
+            "traced_peak": 0,
+            "rss_peak": 0,
+            "seconds": time.perf_counter(),
+        }
+        self.stages.append(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            self._stack.pop()
+            traced, rss = self._take_peaks()
+            record["traced_peak"] = max(record["traced_peak"], traced)
+            record["rss_peak"] = max(record["rss_peak"], rss)
+            record["traced_net"] = (
+                tracemalloc.get_traced_memory()[0] - record["traced_start"]
+            )
+            record["rss_end"] = self._rss()
+            record["seconds"] = time.perf_counter() - record["seconds"]
+            if self._stack:
+                parent = self._stack[-1]
+                parent["traced_peak"] = max(
+                    parent["traced_peak"], record["traced_peak"]
+                )
+                parent["rss_peak"] = max(parent["rss_peak"], record["rss_peak"])
+
+    def report(self) -> Dict:
+        """Stage table in MB; the RSS columns are None when this platform cannot measure RSS."""
+        stages = [
+            {
+                "stage": s["stage"],
+                "seconds": round(s["seconds"], 4),
+                # peak Python/NumPy memory above what was live when the stage started
+                "traced_peak_mb": round((s["traced_peak"] - s["traced_start"]) / MB, 2),
+                "traced_net_mb": round(s.get("traced_net", 0) / MB, 2),
+                "rss_start_mb": round(s["rss_start"] / MB, 2),
+                "rss_peak_mb": round(s["rss_peak"] / MB, 2),
+                "rss_end_mb": round(s.get("rss_end", s["rss_start"]) / MB, 2),
+            }
+            for s in self.stages
+        ]
+        report = {
+            "rss_baseline_mb": round(getattr(self, "_rss_baseline", 0) / MB, 2),
+            "rss_peak_mb": max([s["rss_peak_mb"] for s in stages], default=0.0),
+            "traced_peak_mb": round(getattr(self, "traced_peak", 0) / MB, 2),
+            "stages": stages,
+        }
+        if not getattr(self, "rss_available", True):
+            report["rss_baseline_mb"] = report["rss_peak_mb"] = None
+            for s in stages:
+                s["rss_start_mb"] = s["rss_peak_mb"] = s["rss_end_mb"] = None
+        return report
+
+    def write(self, path: str) -> str:
+        """Write the report as HTML if ``path`` ends in .html, else JSON."""
+        report = self.report()
+        with open(path, "w") as f:
+            if path.endswith(".html"):
+                f.write(_render_html(report))
+            else:
+                json.dump(report, f, indent=2)
+        return path
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [
+            f"{'stage':<32}{'sec':>8}{'py peak MB':>12}{'py net MB':>11}{'RSS peak MB':>13}"
+        ]
+        for s in report["stages"]:
+            lines.append(
+                f"{s['stage']:<32}{s['seconds']:>8.2f}{s['traced_peak_mb']:>12.1f}"
+                f"{s['traced_net_mb']:>11.1f}{_mb(s['rss_peak_mb']):>13}"
+            )
+        if report["rss_peak_mb"] is None:
+            lines.append("peak RSS unavailable on this platform")
+        else:
+            lines.append(
+                f"peak RSS {report['rss_peak_mb']:.1f} MB (baseline {report['rss_baseline_mb']:.1f} MB)"
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def stage(name: str):
+    """Record ``name`` on the running profiler, if any; a no-op otherwise, so library code can always use it."""
+    if _active is None:
+        yield None
+    else:
+        with _active.stage(name) as record:
+            yield record
+
+
+def _mb(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.1f}"
+
+
+def _render_html(report: Dict) -> str:
+    peaks = [s["rss_peak_mb"] or 0.0 for s in report["stages"]] + [
+        s["traced_peak_mb"] for s in report["stages"]
+    ]
+    scale = max(peaks + [1.0])
+    rows = []
+    for s in report["stages"]:
+        depth = s["stage"].count("/")
+        rows.append(
+            "<tr><td style='padding-left:{pad}em'>{name}</td><td>{sec:.2f}</td><td>{tp:.1f}</td><td>{tn:.1f}</td>"
+            "<td>{rp}</td><td><div class='bar' style='width:{w:.0f}%'></div></td></tr>".format(
+                pad=1 + 1.5 * depth,
+                name=html.escape(s["stage"].rsplit("/", 1)[-1]),
+                sec=s["seconds"],
+                tp=s["traced_peak_mb"],
+                tn=s["traced_net_mb"],
+                rp=_mb(s["rss_peak_mb"]),
+                w=100 * (s["rss_peak_mb"] or 0.0) / scale,
+            )
+        )
+    return """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Memory profile</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border-bottom: 1px solid #ddd; padding: 4px 12px; text-align: right; }}
+td:first-child, th:first-child {{ text-align: left; }}
+td:last-child {{ width: 300px; }}
+.bar {{ background: #4a90d9; height: 10px; }}
+</style></head><body>
+<h1>Memory profile</h1>
+<p>Peak RSS {rss} MB (baseline {base} MB); peak traced Python/NumPy memory {traced:.1f} MB.</p>
+<table>
+<tr><th>Stage</th><th>Seconds</th><th>Py peak MB</th><th>Py net MB</th><th>RSS peak MB</th><th></th></tr>
+{rows}
+</table></body></html>
+""".format(
+        rss=_mb(report["rss_peak_mb"]),
+        base=_mb(report["rss_baseline_mb"]),
+        traced=report["traced_peak_mb"],
+        rows="\n".join(rows),
+    )
@@ -1,9 +1,36 @@
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import TimeSeriesSplit
-from sklearn.metrics import mean_squared_error, mean_absolute_error
 import joblib
-from typing import Tuple, Dict, Optional, Any
+from typing import Tuple, Dict, List, Optional, Sequence, Any
+
+from ._optional import require
+from .memprofile import stage
+
+# booster hyperparameters shared by the point, quantile and ensemble models
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": 4, "learning_rate": 0.05}
+
+
+def time_folds(times, n_splits: int = 5) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """``TimeSeriesSplit`` over the distinct values of ``times`` (rows sorted by time).
+
+    Every row of a timestamp lands on the same side of each split, so a panel with several
+    symbols per timestamp never validates on a moment it also trained on.
+    """
+    times = np.asarray(times)
+    if len(times) > 1 and (times[1:] < times[:-1]).any():
+        raise ValueError("Rows must be sorted by time for time-series cross-validation")
+    # first row of each distinct timestamp, plus the end
+    starts = np.append(np.flatnonzero(np.r_[True, times[1:] != times[:-1]]), len(times))
+    folds = []
+    for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(starts[:-1]):
+        folds.append(
+            (
+                np.arange(starts[train_idx[-1] + 1]),
+                np.arange(starts[test_idx[0]], starts[test_idx[-1] + 1]),
+            )
+        )
+    return folds
 
 
 def train_xgb(
@@ -11,39 +38,98 @@ def train_xgb(
     y: pd.Series,
     n_splits: int = 5,
     params: dict = None,
+    early_stopping_rounds: int = 10,
+    param_grid: Optional[List[dict]] = None,
+    times=None,
 ) -> Tuple[Any, Dict]:
+    """Time-series CV with ``xgboost.cv``, then refit one model on all rows with the chosen round count.
+
+    The full DMatrix is built once and each fold is sliced from it once; all folds are
+    boosted in lockstep and stop together when the mean validation RMSE stops improving.
+    ``param_grid`` entries override ``params``; the candidate with the lowest CV RMSE is refit.
+    Pass the rows' ``times`` for panels with several rows per timestamp (see ``time_folds``).
+    """
+    if params is None:
+        params = DEFAULT_PARAMS
+    # lazy import xgboost to avoid import errors if package missing
+    xgb = require("xgboost", "to train the model")
+    folds = (
+        time_folds(times, n_splits)
+        if times is not None
+        else list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    )
+    with stage("dmatrix"):
+        dtrain = xgb.DMatrix(X, label=y)
+    best_params, best_history = None, None
+    # the DMatrix and fold slices are shared by every candidate in the grid
+    for overrides in param_grid or [{}]:
+        candidate = {**params, **overrides}
+        max_rounds = candidate.get("n_estimators", 100)
+        booster_params = {
+            k: v
+            for k, v in candidate.items()
+            if k not in ("n_estimators", "random_state")
+        }
+        if "random_state" in candidate:
+            booster_params["seed"] = candidate["random_state"]
+        booster_params.setdefault("objective", "reg:squarederror")
+        # early stopping watches the last metric
+        booster_params["eval_metric"] = ["mae", "rmse"]
+        with stage("cv"):
+            history = xgb.cv(
+                booster_params,
+                dtrain,
+                num_boost_round=max_rounds,
+                folds=folds,
+                early_stopping_rounds=early_stopping_rounds,
+                as_pandas=True,
+            )
+        if (
+            best_history is None
+            or history["test-rmse-mean"].iloc[-1]
+            < best_history["test-rmse-mean"].iloc[-1]
+        ):
+            best_params, best_history = candidate, history
+    best_rounds = len(best_history)
+    best = best_history.iloc[-1]
+    model = xgb.XGBRegressor(**{**best_params, "n_estimators": best_rounds})
+    with stage("refit"):
+        model.fit(X, y, verbose=False)
+    summary = {
+        "mean_rmse": float(best["test-rmse-mean"]),
+        "mean_mae": float(best["test-mae-mean"]),
+        "std_rmse": float(best["test-rmse-std"]),
+        "n_estimators": int(best_rounds),
+    }
+    if param_grid:
+        summary["params"] = {
+            k: v for k, v in best_params.items() if k != "n_estimators"
+        }
+    return model, summary
+
+
+def train_quantile_xgb(
+    X: pd.DataFrame,
+    y: pd.Series,
+    alphas: Sequence[float] = (0.1, 0.5, 0.9),
+    params: dict = None,
+) -> Any:
+    """Fit one multi-output booster predicting every quantile in ``alphas`` (``reg:quantileerror``)."""
     if params is None:
-        params = {"n_estimators": 100, "max_depth": 4, "learning_rate": 0.05}
-    tscv = TimeSeriesSplit(n_splits=n_splits)
-    fold = 0
-    metrics = {"rmse": [], "mae": []}
-    models = []
-    for train_idx, val_idx in tscv.split(X):
-        fold += 1
-        X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-        y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-        # lazy import xgboost to avoid import errors if package missing
-        try:
-            import xgboost as xgb
-        except Exception as e:
-            raise RuntimeError("xgboost is required to train the model. Install it with `pip install xgboost`. Error: {}".format(e))
-        model = xgb.XGBRegressor(**params, early_stopping_rounds=10)
-        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
-        preds = model.predict(X_val)
-        mse = mean_squared_error(y_val, preds)
-        rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_val, preds)
-        metrics["rmse"].append(rmse)
-        metrics["mae"].append(mae)
-        models.append(model)
-    # choose best model by average RMSE
-    best_idx = int(np.argmin(metrics["rmse"]))
-    best_model = models[best_idx]
-    summary = {"mean_rmse": float(np.mean(metrics["rmse"])), "mean_mae": float(np.mean(metrics["mae"]))}
-    return best_model, summary
-
-
-def explain_model(model, X_sample: pd.DataFrame, max_display: int = 10) -> Optional[pd.DataFrame]:
+        params = DEFAULT_PARAMS
+    xgb = require("xgboost", "to train the model")
+    model = xgb.XGBRegressor(
+        **params,
+        objective="reg:quantileerror",
+        quantile_alpha=np.asarray(alphas, dtype=float)
+    )
+    model.fit(X, y, verbose=False)
+    return model
+
+
+def explain_model(
+    model, X_sample: pd.DataFrame, max_display: int = 10
+) -> Optional[pd.DataFrame]:
     # shap can be heavy or missing; import lazily and fail gracefully
     try:
         import shap
@@ -53,11 +139,15 @@ def explain_model(model, X_sample: pd.DataFrame, max_display: int = 10) -> Optio
         explainer = shap.Explainer(model)
         shap_values = explainer(X_sample)
         # return top features by mean absolute SHAP
-        shap_df = pd.DataFrame({
-            "feature": X_sample.columns,
-            "mean_abs_shap": np.abs(shap_values.values).mean(axis=0),
-        })
-        shap_df = shap_df.sort_values("mean_abs_shap", ascending=False).head(max_display)
+        shap_df = pd.DataFrame(
+            {
+                "feature": X_sample.columns,
+                "mean_abs_shap": np.abs(shap_values.values).mean(axis=0),
+            }
+        )
+        shap_df = shap_df.sort_values("mean_abs_shap", ascending=False).head(
+            max_display
+        )
         return shap_df
     except Exception:
         return None
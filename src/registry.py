@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_ALIAS = "production"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 hex digest of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _umask_mode(mode: int) -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return mode & ~umask
+
+
+def _mkstemp(directory: str, **kwargs):
+    # mkstemp creates 0600 files; published files get the usual umask-based mode
+    fd, tmp = tempfile.mkstemp(dir=directory, **kwargs)
+    os.chmod(tmp, _umask_mode(0o666))
+    return fd, tmp
+
+
+def atomic_write_json(path: str, obj) -> None:
+    """Write JSON to a temp file in the same directory and rename it over ``path``."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp = _mkstemp(directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def atomic_copy(src: str, dst: str, mtime: Optional[float] = None) -> None:
+    """Copy ``src`` to ``dst`` so readers see either the old or the new file, never a partial one.
+
+    The copy gets a fresh modification time (``mtime`` if given), never the source's.
+    """
+    directory = os.path.dirname(dst) or "."
+    fd, tmp = _mkstemp(directory, prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copy(src, tmp)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ModelRegistry:
+    """Local model registry with content-addressed versions.
+
+    Layout under ``root``::
+
+        versions/<sha256 of contents>/     model, companion files (.onnx, quantile model) and meta.json
+        refs/<alias>                       version id the alias (e.g. "production") points to
+
+    Version directories are immutable once written and appear with one atomic rename, so
+    the index is just the directory listing: concurrent ``register`` calls never contend
+    for a shared file. Aliases and full version ids resolve by opening ``refs/<alias>``
+    and ``versions/<id>/meta.json`` directly (metadata is cached), so serving lookups
+    never list the directory; only prefixes and listings scan it. Promotion atomically
+    replaces the alias file, so readers always see a complete old or new pointer.
+    """
+
+    def __init__(self, root: str = "models/registry"):
+        self.root = root
+        self._index: Dict[str, Dict] = {}
+
+    def _ref_path(self, alias: str) -> str:
+        return os.path.join(self.root, "refs", alias)
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.root, "versions", version)
+
+    def _meta(self, version: str) -> Dict:
+        """Metadata of one version id, read from its meta.json once; KeyError if absent."""
+        if version not in self._index:
+            try:
+                with open(os.path.join(self._version_dir(version), "meta.json")) as f:
+                    self._index[version] = json.load(f)
+            except (OSError, ValueError):
+                raise KeyError(f"Unknown model version {version!r}") from None
+        return self._index[version]
+
+    def index(self) -> Dict[str, Dict]:
+        """version -> metadata from the versions directory; each meta.json is read once and cached."""
+        versions_dir = os.path.join(self.root, "versions")
+        names = (
+            [n for n in os.listdir(versions_dir) if not n.startswith(".")]
+            if os.path.isdir(versions_dir)
+            else []
+        )
+        for name in names:
+            self._meta(name)
+        if len(self._index) != len(names):
+            self._index = {name: self._index[name] for name in names}
+        return self._index
+
+    def register(
+        self,
+        model_path: str,
+        extra_paths: Sequence[str] = (),
+        data_path: Optional[str] = None,
+        feature_config: Optional[Dict] = None,
+        metrics: Optional[Dict] = None,
+    ) -> str:
+        """Store ``model_path`` (plus companion files that exist) under their content hash and return the version id.
+
+        The version id is the sha256 of the files' names and digests, so registering
+        identical artifacts again returns the existing version unchanged.
+        """
+        paths = [model_path] + [p for p in extra_paths if p and os.path.exists(p)]
+        files = {os.path.basename(p): file_digest(p) for p in paths}
+        version = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+        if os.path.exists(os.path.join(self._version_dir(version), "meta.json")):
+            return version
+        final_dir = self._version_dir(version)
+        os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+        # stage in a sibling temp dir and rename, so a version directory is never half written;
+        # file names are kept so onnx_path_for / quantile_path_for resolve inside the version
+        staging = tempfile.mkdtemp(dir=os.path.dirname(final_dir), prefix=".tmp-")
+        os.chmod(staging, _umask_mode(0o777))
+        try:
+            for path in paths:
+                shutil.copy2(path, os.path.join(staging, os.path.basename(path)))
+            meta = {
+                "version": version,
+                "model_file": os.path.basename(model_path),
+                "files": files,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "data_path": data_path,
+                "data_fingerprint": (
+                    file_digest(data_path)
+                    if data_path and os.path.exists(data_path)
+                    else None
+                ),
+                "feature_config": feature_config or {},
+                "metrics": metrics or {},
+            }
+            atomic_write_json(os.path.join(staging, "meta.json"), meta)
+            try:
+                os.replace(staging, final_dir)
+            except OSError:
+                # a concurrent register of the same artifacts won the rename
+                if not os.path.exists(os.path.join(final_dir, "meta.json")):
+                    raise
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def resolve(self, ref: str) -> str:
+        """Version id for an alias, a full version id or a unique version prefix; KeyError if unknown."""
+        ref_path = self._ref_path(ref)
+        if os.path.exists(ref_path):
+            with open(ref_path) as f:
+                return f.read().strip()
+        if ref in self._index or os.path.exists(
+            os.path.join(self._version_dir(ref), "meta.json")
+        ):
+            return ref
+        if len(ref) >= 64:
+            # a full sha256 id that is not registered cannot be a prefix of one either
+            raise KeyError(f"Unknown model version {ref!r}")
+        index = self.index()
+        matches = [v for v in index if v.startswith(ref)] if len(ref) >= 6 else []
+        if len(matches) == 1:
+            return matches[0]
+        raise KeyError(f"Unknown or ambiguous model version {ref!r}")
+
+    def get(self, ref: str) -> Dict:
+        """Metadata of a version (by alias, id or prefix)."""
+        return self._meta(self.resolve(ref))
+
+    def model_path(self, ref: str = DEFAULT_ALIAS) -> str:
+        """Path of the model file of a version (by alias, id or prefix)."""
+        meta = self.get(ref)
+        return os.path.join(self._version_dir(meta["version"]), meta["model_file"])
+
+    def promote(self, ref: str, alias: str = DEFAULT_ALIAS) -> str:
+        """Point ``alias`` at a version with an atomic rename; returns the version id."""
+        version = self._meta(self.resolve(ref))["version"]
+        ref_path = self._ref_path(alias)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        fd, tmp = _mkstemp(os.path.dirname(ref_path), prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, ref_path)
+        return version
+
+    def aliases(self) -> Dict[str, str]:
+        refs_dir = os.path.join(self.root, "refs")
+        if not os.path.isdir(refs_dir):
+            return {}
+        return {
+            a: self.resolve(a)
+            for a in sorted(os.listdir(refs_dir))
+            if not a.startswith(".")
+        }
+
+    def list_versions(self) -> List[Dict]:
+        """All versions, newest first."""
+        return sorted(
+            self.index().values(), key=lambda m: m["created_at"], reverse=True
+        )
+
+    def export(self, ref: str, out_dir: str) -> List[str]:
+        """Atomically copy a version's files into ``out_dir`` (the legacy ``models/`` layout).
+
+        Files that any registered version contains but this one does not (an ONNX graph,
+        quantile model, drift reference or ensemble from another run) are removed first, so
+        they are never served next to this model. Every copy gets the same fresh mtime.
+        """
+        meta = self.get(ref)
+        src_dir = self._version_dir(meta["version"])
+        os.makedirs(out_dir, exist_ok=True)
+        known = {name for other in self.index().values() for name in other["files"]}
+        for name in sorted(known - set(meta["files"])):
+            stale = os.path.join(out_dir, name)
+            if os.path.exists(stale):
+                os.remove(stale)
+        # companions first and the model last, so a reader that sees the new model also
+        # finds its ONNX graph and quantile model; one shared stamp keeps them "as new"
+        stamp = time.time()
+        names = [n for n in meta["files"] if n != meta["model_file"]] + [
+            meta["model_file"]
+        ]
+        paths = []
+        for name in names:
+            dst = os.path.join(out_dir, name)
+            atomic_copy(os.path.join(src_dir, name), dst, mtime=stamp)
+            paths.append(dst)
+        return paths
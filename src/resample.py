@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from typing import List, Optional, Sequence, Tuple
+
+from .data import prepare_features, prepare_panel_features, segment_positions
+from .exogenous import ExogenousStore, add_exogenous_features
+
+OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _bin_starts(ns: np.ndarray, freq: str, offset: Optional[str] = None) -> np.ndarray:
+    """Start of the ``freq`` bin (int64 ns) containing each timestamp; bins are anchored at the epoch plus ``offset``."""
+    shift = pd.Timedelta(offset).value if offset else 0
+    try:
+        step = pd.Timedelta(to_offset(freq)).value
+    except (ValueError, TypeError):
+        step = None
+    if step:
+        return (ns - shift) // step * step + shift
+    # calendar frequencies (weeks, months, business days) have no fixed length
+    periods = pd.DatetimeIndex(ns - shift).to_period(freq)
+    return periods.start_time.as_unit("ns").asi8 + shift
+
+
+def _bin_ends(
+    starts: np.ndarray, freq: str, offset: Optional[str] = None
+) -> np.ndarray:
+    """Last nanosecond (int64) of the ``freq`` bins starting at ``starts``."""
+    shift = pd.Timedelta(offset).value if offset else 0
+    try:
+        step = pd.Timedelta(to_offset(freq)).value
+    except (ValueError, TypeError):
+        step = None
+    if step:
+        return starts + step - 1
+    periods = pd.DatetimeIndex(starts - shift).to_period(freq)
+    return periods.end_time.as_unit("ns").asi8 + shift
+
+
+def _sorted_segments(
+    df: pd.DataFrame, date_col: str, symbol_col: str
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """(order sorting rows by symbol then time, sorted int64 ns timestamps, sorted symbol codes or None)."""
+    ns = df[date_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    if symbol_col in df.columns:
+        # sorted codes so symbols come out in the same order as prepare_panel_features
+        codes = pd.factorize(df[symbol_col], sort=True)[0]
+        order = np.lexsort((ns, codes))
+        return order, ns[order], codes[order]
+    order = np.argsort(ns, kind="stable")
+    return order, ns[order], None
+
+
+def _bar_starts(bins: np.ndarray, codes: Optional[np.ndarray]) -> np.ndarray:
+    """Positions where a new (symbol, bin) bar begins in rows sorted by symbol and time."""
+    new = np.empty(len(bins), dtype=bool)
+    new[:1] = True
+    new[1:] = bins[1:] != bins[:-1]
+    if codes is not None:
+        new[1:] |= codes[1:] != codes[:-1]
+    return np.flatnonzero(new)
+
+
+def resample_ohlcv(
+    df: pd.DataFrame,
+    freq: str,
+    date_col: str = "Date",
+    symbol_col: str = "Symbol",
+    offset: Optional[str] = None,
+) -> pd.DataFrame:
+    """Aggregate OHLCV bars to ``freq`` (first open, max high, min low, last close, summed volume).
+
+    Rows are sorted once by (symbol, time); bar boundaries come from integer bin ids and
+    every column is reduced in one ``reduceat`` pass, so there is no per-symbol or per-bar
+    Python loop. Bars are labelled with their start time; ``offset`` shifts the bin
+    anchor (e.g. "15min" for hourly bars starting at 09:15). Empty bins are not emitted.
+    """
+    order, ns, codes = _sorted_segments(df, date_col, symbol_col)
+    if len(ns) == 0:
+        return df.iloc[:0].copy()
+    bins = _bin_starts(ns, freq, offset)
+    starts = _bar_starts(bins, codes)
+    ends = np.append(starts[1:], len(ns)) - 1
+    out = {}
+    if codes is not None:
+        out[symbol_col] = df[symbol_col].to_numpy()[order[starts]]
+    out[date_col] = bins[starts].view("datetime64[ns]")
+    for col in OHLCV_COLS:
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy()[order]
+        if col == "Open":
+            out[col] = values[starts]
+        elif col == "High":
+            out[col] = np.maximum.reduceat(values, starts)
+        elif col == "Low":
+            out[col] = np.minimum.reduceat(values, starts)
+        elif col == "Close":
+            out[col] = values[ends]
+        else:
+            out[col] = np.add.reduceat(values, starts)
+    return pd.DataFrame(out)
+
+
+def multi_frequency_names(
+    freqs: Sequence[str], momentum_bars: Sequence[int] = (3,)
+) -> List[str]:
+    """Columns added by ``add_multi_frequency_features``, in order."""
+    names = []
+    for freq in freqs:
+        names += [f"ret_{freq}", f"range_{freq}"] + [
+            f"mom_{freq}_{k}" for k in momentum_bars
+        ]
+    return names
+
+
+def add_multi_frequency_features(
+    df: pd.DataFrame,
+    freqs: Sequence[str] = ("1h", "1D"),
+    target_col: str = "Close",
+    date_col: str = "Date",
+    symbol_col: str = "Symbol",
+    momentum_bars: Sequence[int] = (3,),
+    offset: Optional[str] = None,
+) -> pd.DataFrame:
+    """Add features of coarser bars to every row, using only bars completed before the row's bar.
+
+    For each frequency: return and (High - Low) / Close of the last completed bar, and
+    momentum over ``momentum_bars`` completed bars. Coarse bars are reduced straight from
+    the sorted arrays (no resampled frame per frequency); each row reads the bar before
+    its own, so a row never sees prices from the rest of its (still open) coarse bar.
+    The result is sorted by (symbol, time).
+    """
+    order, ns, codes = _sorted_segments(df, date_col, symbol_col)
+    df = df.take(order).reset_index(drop=True)
+    n = len(df)
+    close = df[target_col].to_numpy(dtype=np.float64)
+    high = df["High"].to_numpy(dtype=np.float64) if "High" in df.columns else close
+    low = df["Low"].to_numpy(dtype=np.float64) if "Low" in df.columns else close
+    names = multi_frequency_names(freqs, momentum_bars)
+    values = np.full((n, len(names)), np.nan, order="F")
+    col = 0
+    for freq in freqs:
+        if n == 0:
+            break
+        starts = _bar_starts(_bin_starts(ns, freq, offset), codes)
+        ends = np.append(starts[1:], n) - 1
+        bar_close = close[ends]
+        bar_high = np.maximum.reduceat(high, starts)
+        bar_low = np.minimum.reduceat(low, starts)
+        # position of each bar within its symbol, and of each row's bar
+        bar_pos = (
+            segment_positions(codes[starts])
+            if codes is not None
+            else np.arange(len(starts))
+        )
+        row_bar = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+        prev = row_bar - 1
+        prev_pos = bar_pos[row_bar] - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bar_ret = np.full(len(starts), np.nan)
+            bar_ret[1:] = bar_close[1:] / bar_close[:-1] - 1
+            bar_ret[bar_pos == 0] = np.nan
+            ok = prev_pos >= 0
+            values[ok, col] = bar_ret[prev[ok]]
+            values[ok, col + 1] = (bar_high[prev[ok]] - bar_low[prev[ok]]) / bar_close[
+                prev[ok]
+            ]
+            for j, k in enumerate(momentum_bars):
+                ok = prev_pos >= k
+                values[ok, col + 2 + j] = (
+                    bar_close[prev[ok]] / bar_close[prev[ok] - k] - 1
+                )
+        col += 2 + len(momentum_bars)
+    features = pd.DataFrame(values, columns=names, index=df.index)
+    return pd.concat(
+        [df.drop(columns=[c for c in names if c in df.columns]), features], axis=1
+    )
+
+
+def add_intraday_calendar_features(
+    df: pd.DataFrame, date_col: str = "Date", symbol_col: str = "Symbol"
+) -> pd.DataFrame:
+    """Add ``minute_of_day`` and ``bar_of_day`` (bar index within the symbol's trading day).
+
+    Expects rows sorted by (symbol, time), as returned by ``resample_ohlcv``.
+    """
+    df = df.copy()
+    dates = df[date_col]
+    df["minute_of_day"] = dates.dt.hour * 60 + dates.dt.minute
+    day = dates.to_numpy(dtype="datetime64[D]").view(np.int64)
+    if symbol_col in df.columns:
+        # one key per (symbol, day); symbol codes are grouped, so keys change exactly at day or symbol boundaries
+        codes = pd.factorize(df[symbol_col])[0].astype(np.int64)
+        day = day + codes * (int(day.max()) - int(day.min()) + 1 if len(day) else 0)
+    df["bar_of_day"] = segment_positions(day)
+    return df
+
+
+def prepare_intraday_features(
+    df: pd.DataFrame,
+    freq: str = "5min",
+    context_freqs: Sequence[str] = ("1h", "1D"),
+    target_col: str = "Close",
+    date_col: str = "Date",
+    symbol_col: str = "Symbol",
+    dropna: bool = True,
+    offset: Optional[str] = None,
+    exogenous: Optional[Tuple[ExogenousStore, Sequence[str]]] = None,
+) -> pd.DataFrame:
+    """Resample raw bars to ``freq`` and build the usual features there, plus coarser-bar context.
+
+    ``target`` is the next ``freq`` bar's close. Context and intraday calendar columns are
+    added before ``prepare_features``, so they sit among the raw columns the model's
+    feature order check expects. ``exogenous`` is a ``(store, names)`` pair joined as of
+    each bar's end, the moment its close is known.
+    """
+    bars = resample_ohlcv(
+        df, freq, date_col=date_col, symbol_col=symbol_col, offset=offset
+    )
+    if context_freqs:
+        bars = add_multi_frequency_features(
+            bars,
+            context_freqs,
+            target_col=target_col,
+            date_col=date_col,
+            symbol_col=symbol_col,
+            offset=offset,
+        )
+    bars = add_intraday_calendar_features(
+        bars, date_col=date_col, symbol_col=symbol_col
+    )
+    if exogenous:
+        store, names = exogenous
+        starts = bars[date_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        ends = _bin_ends(starts, freq, offset).view("datetime64[ns]")
+        bars = add_exogenous_features(bars, store, names, date_col=date_col, as_of=ends)
+    if symbol_col in bars.columns:
+        return prepare_panel_features(
+            bars,
+            symbol_col=symbol_col,
+            target_col=target_col,
+            date_col=date_col,
+            dropna=dropna,
+        )
+    return prepare_features(
+        bars, target_col=target_col, date_col=date_col, dropna=dropna
+    )
@@ -0,0 +1,254 @@
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from .data import inference_matrix, load_data, prepare_features
+from .compiled import load_predictor, load_quantile_predictor, quantile_path_for
+from .drift import DriftMonitor, load_reference, reference_path_for
+from .exogenous import exogenous_series_in
+from .registry import ModelRegistry
+
+
+def file_signature(path: str):
+    """``(realpath, mtime, size)`` of ``path``, or None if it does not exist.
+
+    A different file at the same path (a registry alias switch, a copy that kept its
+    source's mtime) changes at least one field, where the mtime alone might not.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return os.path.realpath(path), stat.st_mtime, stat.st_size
+
+
+def share_history(df: pd.DataFrame, cache_dir: str) -> Dict[str, np.ndarray]:
+    """Persist the numeric/date columns of ``df`` as .npy files and map them back read-only.
+
+    The returned arrays are ``np.memmap`` views over the page cache, so every process
+    that maps the same files (forked gunicorn workers included) shares one physical copy.
+    Other processes may already have the files mapped, so a file whose bytes already
+    match is left alone and a changed one is written aside and renamed over it, never
+    rewritten in place.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            # object columns cannot be memory-mapped; history only needs numbers and dates
+            continue
+        path = os.path.join(cache_dir, f"{col}.npy")
+        if not _same_array(path, values):
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-", suffix=".npy")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        arrays[col] = np.load(path, mmap_mode="r")
+    return arrays
+
+
+def _same_array(path: str, values: np.ndarray) -> bool:
+    """Whether the .npy file at ``path`` already holds exactly ``values`` (compared byte for byte)."""
+    if not os.path.exists(path):
+        return False
+    try:
+        existing = np.load(path, mmap_mode="r")
+    except ValueError:
+        return False
+    if existing.dtype != values.dtype or existing.shape != values.shape:
+        return False
+    raw = np.ascontiguousarray(values).view(np.uint8)
+    return bool(np.array_equal(np.asarray(existing).view(np.uint8), raw))
+
+
+class ServingState:
+    """Model and seeded history shared by all requests of a serving process.
+
+    Load it once at import time of the app module; with gunicorn's ``preload_app``
+    that happens in the master, and forked workers inherit the booster copy-on-write
+    instead of each holding a private copy.
+
+    With a ``registry`` the model is taken from ``version`` instead of ``model_path``:
+    a version id pins the model, an alias (e.g. "production") follows promotions.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        history_path: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        date_col: str = "Date",
+        registry: Optional[ModelRegistry] = None,
+        version: Optional[str] = None,
+    ):
+        self.model_path = model_path
+        self.registry = registry
+        self.version = version
+        self.history_path = history_path
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.dirname(model_path) or ".", "history_cache"
+        )
+        self.date_col = date_col
+        self.model = None
+        self.quantile_model = None
+        self.monitor: Optional[DriftMonitor] = None
+        self.history: Dict[str, np.ndarray] = {}
+        self._signature = None
+        self._quantile_signature = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def load(self) -> "ServingState":
+        # never call model.predict here: the master must not start OpenMP threads before fork
+        self._load_model()
+        if self.history_path and os.path.exists(self.history_path):
+            self.history = share_history(
+                load_data(self.history_path, date_col=self.date_col), self.cache_dir
+            )
+        return self
+
+    def _load_model(self):
+        if self.registry is not None and self.version:
+            try:
+                self.model_path = self.registry.model_path(self.version)
+            except KeyError:
+                self.model, self._signature = None, None
+                return
+        signature = file_signature(self.model_path)
+        if signature is None:
+            self.model, self._signature = None, None
+            return
+        # onnxruntime sessions own thread pools that do not survive fork, so a preloaded
+        # ONNX predictor is rebuilt once per worker; the native booster is shared as is
+        forked = (
+            self.model is not None
+            and self.model.kind == "onnx"
+            and self._pid != os.getpid()
+        )
+        if signature != self._signature or forked:
+            changed = signature != self._signature
+            model = load_predictor(self.model_path)
+            side = exogenous_series_in(model.feature_names)
+            if side:
+                # requests only carry OHLCV rows, so these columns could never be filled
+                raise ValueError(
+                    f"{self.model_path} was trained with exogenous series {side}, which the API cannot supply; "
+                    "serve a model trained without --exogenous"
+                )
+            self.model = model
+            self._signature = signature
+            self._pid = os.getpid()
+            if changed:
+                # a new model starts a fresh drift window against its own training reference
+                reference = load_reference(reference_path_for(self.model_path))
+                self.monitor = DriftMonitor(reference) if reference else None
+        quantile_signature = file_signature(quantile_path_for(self.model_path))
+        if quantile_signature != self._quantile_signature:
+            self.quantile_model = load_quantile_predictor(self.model_path)
+            self._quantile_signature = quantile_signature
+
+    def get_model(self):
+        """Return the loaded predictor, reloading it only if the file on disk changed (e.g. after /train)."""
+        with self._lock:
+            self._load_model()
+        return self.model
+
+    def predict(self, X) -> np.ndarray:
+        """Point forecasts, followed by one column per quantile when a quantile model was trained.
+
+        Use this as a MicroBatcher's ``predict_fn`` so the quantile model runs once per batch
+        alongside the point model instead of once per request.
+        """
+        with self._lock:
+            self._load_model()
+            model, quantile_model = self.model, self.quantile_model
+        predictions = model.predict(X)
+        if quantile_model is None:
+            return predictions
+        return np.column_stack([predictions, quantile_model.predict(X)])
+
+    def get_quantile_model(self):
+        """Return the quantile predictor trained with the model, or None."""
+        with self._lock:
+            self._load_model()
+        return self.quantile_model
+
+    def get_monitor(self) -> Optional[DriftMonitor]:
+        """Drift monitor for the current model, or None if it was trained without a reference."""
+        with self._lock:
+            self._load_model()
+        return self.monitor
+
+    def history_frame(self) -> Optional[pd.DataFrame]:
+        if not self.history:
+            return None
+        return pd.DataFrame(self.history, copy=False)
+
+
+def predict_records(
+    model,
+    df: pd.DataFrame,
+    date_col: str = "Date",
+    feature_names: Optional[List[str]] = None,
+    quantile_model=None,
+    monitor=None,
+    monitor_rows: int = 1,
+) -> List[Dict]:
+    """Build features for ``df`` and return one ``{"date", "predicted_close"}`` record per complete row.
+
+    ``model`` only needs ``predict``; pass ``feature_names`` when it does not carry them (e.g. a MicroBatcher).
+    With a ``quantile_model`` each record also gets its quantiles (``p10``, ``p50``, ``p90``, ...); when
+    ``model.predict`` already returns them as extra columns (``ServingState.predict``) they are not recomputed.
+    A drift ``monitor`` sees the features of the newest ``monitor_rows`` rows and the errors
+    of the forecasts whose next close is already in ``df``; it skips rows it has already
+    ingested for the same symbol, so resubmitted history is not recounted.
+    """
+    dfp = prepare_features(df, date_col=date_col, dropna=False)
+    X, dates = inference_matrix(
+        dfp, feature_names or model.feature_names, date_col=date_col
+    )
+    predictions = np.asarray(model.predict(X))
+    quantiles = None
+    if predictions.ndim == 2:
+        predictions, quantiles = predictions[:, 0], predictions[:, 1:]
+    elif quantile_model is not None:
+        quantiles = quantile_model.predict(X)
+    if monitor is not None and len(X):
+        times = dates.to_numpy()
+        symbols = (
+            dfp.loc[dates.index, "Symbol"].to_numpy()
+            if "Symbol" in dfp.columns
+            else None
+        )
+        newest = slice(-monitor_rows, None)
+        monitor.update(
+            X[newest],
+            times=times[newest],
+            symbols=None if symbols is None else symbols[newest],
+        )
+        # target is the next row's close: known for every row but the last
+        actual = dfp["target"].to_numpy()[dfp.index.get_indexer(dates.index)]
+        realized = slice(-monitor_rows - 1, -1)
+        monitor.update_errors(
+            (np.asarray(predictions, dtype=np.float64) - actual)[realized],
+            times=times[realized],
+            symbols=None if symbols is None else symbols[realized],
+        )
+    records = [
+        {"date": date.strftime("%Y-%m-%d"), "predicted_close": round(float(pred), 2)}
+        for date, pred in zip(dates, predictions)
+    ]
+    if quantiles is not None and quantile_model is not None:
+        for record, row in zip(
+            records, np.round(quantiles.astype(np.float64), 2).tolist()
+        ):
+            record.update(zip(quantile_model.columns, row))
+    return records
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import BusinessDay, Day
+from scipy.signal import lfilter
+from typing import Iterator, Optional, Sequence
+
+from ._optional import require
+
+
+def _bar_dates(start: pd.Timestamp, offset, begin: int, n: int) -> pd.DatetimeIndex:
+    """Timestamps of bars ``begin .. begin + n - 1`` counted from ``start``.
+
+    Fixed-length frequencies and plain business days are computed with array arithmetic
+    (``np.busday_offset`` for the latter); ``pd.date_range`` steps through business days
+    one at a time, which dominated generation time for ``freq="B"``.
+    """
+    if start.tz is not None:
+        return pd.date_range(start + begin * offset, periods=n, freq=offset)
+    steps = np.arange(begin, begin + n, dtype=np.int64) * offset.n
+    origin = start.to_datetime64().astype("datetime64[ns]")
+    if isinstance(offset, Day):
+        step = pd.Timedelta(days=1)
+    else:
+        try:
+            step = pd.Timedelta(type(offset)())
+        except ValueError:
+            step = None
+    # the resolution pd.date_range would give (it differs between pandas versions)
+    dtype = pd.date_range(start, periods=1, freq=offset).dtype
+    if step is not None:
+        return pd.DatetimeIndex((origin + steps * step.to_timedelta64()).astype(dtype))
+    if type(offset) is BusinessDay and not offset.offset:
+        day = origin.astype("datetime64[D]")
+        days = np.busday_offset(day, steps, roll="forward")
+        return pd.DatetimeIndex(
+            (days.astype("datetime64[ns]") + (origin - day)).astype(dtype)
+        )
+    return pd.date_range(start + begin * offset, periods=n, freq=offset)
+
+
+def _ticker_chunks(
+    rng: np.random.Generator,
+    rows: int,
+    chunk_rows: int,
+    start: pd.Timestamp,
+    freq: str,
+    start_price: float,
+    drift: float,
+    reversion: float,
+    regimes: Sequence[float],
+    regime_length: float,
+) -> Iterator[pd.DataFrame]:
+    offset = to_offset(freq)
+    # anchor on the first valid bar so start + k * offset is the k-th bar (e.g. business days)
+    start = offset.rollforward(start)
+    vols = np.asarray(regimes, dtype=np.float64)
+    phi = 1.0 - reversion
+    price = start_price
+    deviation = 0.0
+    regime = 0
+    for begin in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - begin)
+        # volatility regimes: Markov switching with mean block length ``regime_length``
+        switches = rng.random(n) < 1.0 / regime_length
+        block = np.cumsum(switches)
+        block_regime = np.empty(block[-1] + 1, dtype=np.intp)
+        block_regime[0] = regime
+        block_regime[1:] = rng.integers(len(vols), size=block[-1])
+        sigma = vols[block_regime[block]]
+        regime = block_regime[-1]
+        # log price = log(start) + drift * t + x_t with x_t = phi * x_{t-1} + sigma_t * z_t;
+        # phi == 1 is plain geometric Brownian motion, phi < 1 keeps very long series bounded
+        x, _ = lfilter(
+            [1.0], [1.0, -phi], sigma * rng.standard_normal(n), zi=[phi * deviation]
+        )
+        deviation = x[-1]
+        t = np.arange(begin + 1, begin + n + 1)
+        close = start_price * np.exp(drift * t + x)
+        prev = np.empty(n)
+        prev[0] = price
+        prev[1:] = close[:-1]
+        open_ = prev * np.exp(0.25 * sigma * rng.standard_normal(n))
+        wick = np.abs(rng.standard_normal((2, n))) * 0.5 * sigma
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        volume = rng.lognormal(np.log(300_000), 0.4 + 10 * sigma, n).astype(np.int64)
+        price = close[-1]
+        yield pd.DataFrame(
+            {
+                "Date": _bar_dates(start, offset, begin, n),
+                "Open": open_,
+                "High": high,
+                "Low": low,
+                "Close": close,
+                "Volume": volume,
+            }
+        )
+
+
+def iter_ohlcv(
+    rows: int,
+    tickers: int = 1,
+    freq: str = "D",
+    start: str = "2023-01-01",
+    start_price: float = 100.0,
+    drift: float = 0.0,
+    reversion: float = 0.0,
+    regimes: Sequence[float] = (0.02,),
+    regime_length: float = 250,
+    seed: Optional[int] = 42,
+    chunk_rows: int = 1_000_000,
+) -> Iterator[pd.DataFrame]:
+    """Yield synthetic OHLCV bars in chunks of at most ``chunk_rows``, ticker by ticker.
+
+    ``rows`` is per ticker; ``drift`` and ``regimes`` (per-bar volatilities) are per-bar
+    log-price parameters. The default is plain geometric Brownian motion; a positive
+    ``reversion`` (e.g. 0.001) pulls log prices back to trend, which keeps very long series bounded.
+    With more than one ticker a ``Symbol`` column is added.
+    Every ticker has its own random stream, so output is reproducible for a given seed and chunk size.
+    """
+    streams = np.random.SeedSequence(seed).spawn(tickers)
+    start = pd.Timestamp(start)
+    for t, stream in enumerate(streams):
+        rng = np.random.default_rng(stream)
+        # spread starting prices so tickers are distinguishable
+        price = (
+            start_price * float(np.exp(rng.normal(0, 0.5)))
+            if tickers > 1
+            else start_price
+        )
+        for chunk in _ticker_chunks(
+            rng,
+            rows,
+            chunk_rows,
+            start,
+            freq,
+            price,
+            drift,
+            reversion,
+            regimes,
+            regime_length,
+        ):
+            if tickers > 1:
+                chunk.insert(0, "Symbol", f"SYM{t:04d}")
+            yield chunk
+
+
+def generate_ohlcv(rows: int, tickers: int = 1, **kwargs) -> pd.DataFrame:
+    """Return the whole synthetic dataset as one frame (see ``iter_ohlcv`` for parameters)."""
+    return pd.concat(list(iter_ohlcv(rows, tickers, **kwargs)), ignore_index=True)
+
+
+def write_ohlcv(path: str, rows: int, tickers: int = 1, **kwargs) -> int:
+    """Stream synthetic data to .csv or .parquet chunk by chunk; returns the number of rows written."""
+    written = 0
+    if path.endswith(".parquet"):
+        pa = require("pyarrow", "to write Parquet")
+        pq = require("pyarrow.parquet", "to write Parquet", "pyarrow")
+        writer = None
+        try:
+            for chunk in iter_ohlcv(rows, tickers, **kwargs):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+    for chunk in iter_ohlcv(rows, tickers, **kwargs):
+        chunk.to_csv(
+            path, mode="w" if written == 0 else "a", header=written == 0, index=False
+        )
+        written += len(chunk)
+    return written
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Tuple
+
+PRICE_COLS = ["Open", "High", "Low", "Close"]
+# issues that corrupt the Close-based features and make the report not ok; the rest are informational
+HARD_ISSUES = ("duplicate_timestamps", "missing_prices", "non_positive_prices")
+
+
+def _examples(dates: np.ndarray, mask: np.ndarray, limit: int):
+    return [str(d)[:19] for d in dates[mask][:limit]]
+
+
+def validate_ohlcv(
+    df: pd.DataFrame,
+    date_col: str = "Date",
+    symbol_col: str = "Symbol",
+    repair: bool = False,
+    max_return_z: float = 8.0,
+    holidays: Optional[Sequence] = None,
+    max_examples: int = 5,
+) -> Tuple[pd.DataFrame, Dict]:
+    """Check an OHLCV frame with vectorized NumPy passes and return ``(df sorted by date, report)``.
+
+    Checks (per symbol when ``symbol_col`` is present): input date order, duplicate
+    timestamps, missing or non-positive prices, High/Low inconsistent with Open/Close,
+    outlier log returns (robust z-score above ``max_return_z``) and trading days missing
+    from a business-day calendar with optional ``holidays``.
+    With ``repair=True`` duplicates keep their last row, rows with missing or non-positive
+    prices are dropped and High/Low are widened to cover Open/Close.
+    """
+    n = len(df)
+    dates = df[date_col].to_numpy(dtype="datetime64[ns]")
+    if symbol_col in df.columns:
+        sym = pd.factorize(df[symbol_col])[0]
+        order = np.lexsort((dates, sym))
+    else:
+        sym = np.zeros(n, dtype=np.int64)
+        order = np.argsort(dates, kind="stable")
+    key_sym = sym[order]
+    key_dates = dates[order]
+    same = key_sym[1:] == key_sym[:-1]
+
+    in_sym = sym[1:] == sym[:-1]
+    out_of_order = int(np.count_nonzero(in_sym & (dates[1:] < dates[:-1])))
+
+    # duplicates: flag every row that has a later row with the same (symbol, timestamp)
+    dup = np.zeros(n, dtype=bool)
+    dup[:-1] = same & (key_dates[1:] == key_dates[:-1])
+
+    cols = [c for c in PRICE_COLS if c in df.columns]
+    prices = df[cols].to_numpy(dtype=np.float64)[order]
+    missing = np.isnan(prices).any(axis=1)
+    with np.errstate(invalid="ignore"):
+        non_positive = (prices <= 0).any(axis=1)
+    inconsistent = np.zeros(n, dtype=bool)
+    if len(cols) == 4:
+        o, h, l, c = prices.T
+        with np.errstate(invalid="ignore"):
+            inconsistent = (h < l) | (h < np.maximum(o, c)) | (l > np.minimum(o, c))
+        # rows with missing or non-positive prices are reported (and dropped) under those checks
+        inconsistent &= ~(missing | non_positive)
+
+    outliers = np.zeros(n, dtype=bool)
+    if "Close" in df.columns and n > 2:
+        close = df["Close"].to_numpy(dtype=np.float64)[order]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.diff(np.log(close))
+        ok = same & np.isfinite(r)
+        if ok.sum() > 2:
+            med = np.median(r[ok])
+            mad = 1.4826 * np.median(np.abs(r[ok] - med))
+            if mad > 0:
+                outliers[1:] = ok & (np.abs(r - med) / mad > max_return_z)
+
+    # calendar: business days (plus holidays) between first and last date
+    days = np.unique(dates.astype("datetime64[D]"))
+    missing_days = off_calendar = np.zeros(0, dtype="datetime64[D]")
+    if len(days):
+        expected = pd.bdate_range(
+            days[0], days[-1], freq="C", holidays=holidays
+        ).to_numpy(dtype="datetime64[D]")
+        missing_days = np.setdiff1d(expected, days, assume_unique=True)
+        off_calendar = np.setdiff1d(days, expected, assume_unique=True)
+
+    report = {
+        "rows": n,
+        "out_of_order": out_of_order,
+        "duplicate_timestamps": int(dup.sum()),
+        "missing_prices": int(missing.sum()),
+        "non_positive_prices": int(non_positive.sum()),
+        "ohlc_inconsistent": int(inconsistent.sum()),
+        "outlier_returns": int(outliers.sum()),
+        "missing_trading_days": int(len(missing_days)),
+        "off_calendar_days": int(len(off_calendar)),
+        "examples": {
+            "duplicate_timestamps": _examples(key_dates, dup, max_examples),
+            "missing_prices": _examples(key_dates, missing, max_examples),
+            "non_positive_prices": _examples(key_dates, non_positive, max_examples),
+            "ohlc_inconsistent": _examples(key_dates, inconsistent, max_examples),
+            "outlier_returns": _examples(key_dates, outliers, max_examples),
+            "missing_trading_days": [str(d) for d in missing_days[:max_examples]],
+        },
+    }
+    report["ok"] = not any(report[k] for k in HARD_ISSUES)
+    report["repaired"] = False
+
+    by_date = np.argsort(dates, kind="stable")
+    if repair:
+        drop = np.zeros(n, dtype=bool)
+        drop[order] = dup | missing | non_positive
+        fix = np.zeros(n, dtype=bool)
+        fix[order] = inconsistent & ~dup
+        df = df.copy()
+        if fix.any():
+            rows = df[cols].to_numpy(dtype=np.float64)[fix]
+            df.loc[df.index[fix], "High"] = rows.max(axis=1)
+            df.loc[df.index[fix], "Low"] = rows.min(axis=1)
+        by_date = by_date[~drop[by_date]]
+        report.update(
+            repaired=True, rows_dropped=int(drop.sum()), rows_fixed=int(fix.sum())
+        )
+    return df.take(by_date).reset_index(drop=True), report
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+import api_async
+from src.data import load_data, prepare_features
+from src.model import train_xgb, save_model
+from src.serving import ServingState
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    dfp = prepare_features(load_data(DATA_PATH))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    X = dfp[features].select_dtypes(include=[np.number])
+    model, _ = train_xgb(X, dfp["target"], n_splits=2)
+    model_path = str(tmp_path / "xgb_model.joblib")
+    save_model(model, model_path)
+    monkeypatch.setattr(api_async, "MODEL_PATH", model_path)
+    monkeypatch.setattr(api_async, "state", ServingState(model_path).load())
+    return TestClient(api_async.app)
+
+
+def test_health(client):
+    resp = client.get("/health")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "healthy"
+
+
+def test_predict(client):
+    resp = client.post("/predict", json={"data_path": DATA_PATH})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == len(body["predictions"]) > 0
+
+
+def test_predict_errors(client):
+    assert client.post("/predict", json={}).status_code == 400
+    assert client.post("/predict", json={"data_path": "missing.csv"}).status_code == 404
+
+
+def test_predict_sheds_load_when_saturated(client, monkeypatch):
+    monkeypatch.setattr(api_async, "MAX_INFLIGHT", 0)
+    resp = client.post("/predict", json={"data_path": DATA_PATH})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_drift_endpoint(client, tmp_path):
+    assert client.get("/drift").status_code == 404
+    from src.drift import build_reference, reference_path_for, save_reference
+
+    dfp = prepare_features(load_data(DATA_PATH))
+    model = api_async.state.get_model()
+    reference = build_reference(
+        dfp[model.feature_names], model.feature_names, np.zeros(10)
+    )
+    save_reference(reference, reference_path_for(api_async.state.model_path))
+    api_async.state._signature = None  # force the reload that picks up the reference
+    client.post("/predict", json={"data_path": DATA_PATH})
+    body = client.get("/drift").json()
+    assert body["drift"]["rows"] == 1 and body["drift"]["errors"]["count"] == 1
+    assert "triggered" not in body["retrain"]
+    # the same history again adds nothing: its rows were already ingested
+    client.post("/predict", json={"data_path": DATA_PATH})
+    assert client.get("/drift").json()["drift"]["rows"] == 1
+    assert client.post("/drift/check").json()["retrain"]["triggered"] is False
+
+
+def test_candidate_routing(client, tmp_path, monkeypatch):
+    from src.batching import MicroBatcher
+    from src.ensemble import ABRouter, train_ensemble
+
+    dfp = prepare_features(load_data(DATA_PATH))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    ensemble = train_ensemble(
+        dfp[features], dfp["target"], seeds=(0,), params={"n_estimators": 10}
+    )
+    candidate_path = str(tmp_path / "xgb_ensemble.joblib")
+    save_model(ensemble.to_spec(), candidate_path)
+    candidate_state = ServingState(candidate_path).load()
+    monkeypatch.setattr(api_async, "candidate_state", candidate_state)
+    monkeypatch.setattr(
+        api_async, "candidate_batcher", MicroBatcher(candidate_state.predict)
+    )
+    monkeypatch.setattr(api_async, "router", ABRouter(1.0))
+    body = client.post("/predict", json={"data_path": DATA_PATH}).json()
+    assert body["status"] == "success" and body["model_arm"] == "candidate"
+    metrics = client.get("/metrics").json()
+    assert metrics["routing"]["requests"] == {"primary": 0, "candidate": 1}
+    assert metrics["candidate_batching"]["batches"] >= 1
+
+
+def test_train_reaps_failed_process(client, caplog):
+    # a context-managed client keeps one event loop alive across requests for the watcher task
+    with TestClient(api_async.app) as c:
+        assert (
+            c.post("/train", json={"data_path": "does/not/exist.csv"}).json()["status"]
+            == "training started"
+        )
+        for _ in range(300):
+            if not api_async._training:
+                break
+            time.sleep(0.1)
+    assert not api_async._training
+    assert "exited with status 1" in caplog.text
@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batching import MicroBatcher
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return X.sum(axis=1)
+
+
+def test_results_fan_out_to_callers():
+    model = CountingModel()
+    batcher = MicroBatcher(model.predict, max_batch_rows=1000, max_wait_ms=50)
+    inputs = [np.full((i + 1, 3), float(i)) for i in range(8)]
+    results = [None] * len(inputs)
+    barrier = threading.Barrier(len(inputs))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.predict(inputs[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(inputs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for X, preds in zip(inputs, results):
+        assert np.allclose(preds, X.sum(axis=1))
+    # concurrent requests were coalesced into fewer model calls
+    assert len(model.calls) < len(inputs)
+    m = batcher.metrics()
+    assert m["requests"] == len(inputs)
+    assert m["rows"] == sum(len(X) for X in inputs)
+    assert m["batches"] == len(model.calls)
+
+
+def test_max_batch_rows_caps_batch():
+    model = CountingModel()
+    batcher = MicroBatcher(model.predict, max_batch_rows=4, max_wait_ms=100)
+    futures = [batcher.submit(np.ones((2, 2))) for _ in range(6)]
+    for f in futures:
+        assert np.allclose(f.result(), 2.0)
+    assert max(model.calls) <= 4
+
+
+def test_overflowing_request_starts_next_batch():
+    model = CountingModel()
+    batcher = MicroBatcher(model.predict, max_batch_rows=4, max_wait_ms=100)
+    futures = [batcher.submit(np.ones((n, 2))) for n in (3, 3, 10, 1)]
+    for n, f in zip((3, 3, 10, 1), futures):
+        assert f.result().shape == (n,) and np.allclose(f.result(), 2.0)
+    # oversized requests are split into max_batch_rows chunks; no model call exceeds the cap
+    assert max(model.calls) <= 4
+    assert sum(model.calls) == 17
+
+
+def test_errors_propagate_to_every_caller():
+    def broken(X):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(broken, max_wait_ms=1)
+    with pytest.raises(ValueError, match="boom"):
+        batcher.predict(np.ones((1, 2)))
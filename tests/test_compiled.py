@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import load_data, prepare_features
+from src.model import train_xgb, save_model
+from src.compiled import NativePredictor, export_onnx, load_predictor, onnx_path_for
+
+
+@pytest.fixture(scope="module")
+def trained():
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    dfp = prepare_features(load_data(data_path))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    X = dfp[features].select_dtypes(include=[np.number])
+    model, _ = train_xgb(X, dfp["target"], n_splits=2)
+    return model, X
+
+
+def test_native_predictor_matches_sklearn(trained):
+    model, X = trained
+    predictor = NativePredictor(model)
+    assert predictor.feature_names == list(X.columns)
+    assert np.allclose(predictor.predict(X.to_numpy()), model.predict(X))
+
+
+def test_load_predictor_prefers_fresh_onnx(trained, tmp_path):
+    pytest.importorskip("onnxmltools")
+    pytest.importorskip("onnxruntime")
+    model, X = trained
+    model_path = str(tmp_path / "xgb_model.joblib")
+    save_model(model, model_path)
+    assert load_predictor(model_path).kind == "native"
+
+    export_onnx(model, onnx_path_for(model_path))
+    # explicit timestamps: filesystems with coarse mtimes cannot order back-to-back writes
+    os.utime(model_path, (1_000_000, 1_000_000))
+    os.utime(onnx_path_for(model_path), (1_000_010, 1_000_010))
+    predictor = load_predictor(model_path)
+    assert predictor.kind == "onnx"
+    assert np.allclose(
+        predictor.predict(X.to_numpy()), model.predict(X), rtol=1e-5, atol=1e-3
+    )
+
+    # a model saved after the export makes the ONNX graph stale
+    save_model(model, model_path)
+    os.utime(model_path, (1_000_020, 1_000_020))
+    assert load_predictor(model_path).kind == "native"
@@ -4,9 +4,14 @@ import pandas as pd
 import numpy as np
 
 # Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.data import load_data, add_lag_features, add_return_and_rolling, prepare_features
+from src.data import (
+    load_data,
+    add_lag_features,
+    add_return_and_rolling,
+    prepare_features,
+)
 
 
 def test_load_data():
@@ -31,11 +36,15 @@ def test_add_lag_features():
 
 def test_add_return_and_rolling():
     """Test return and rolling feature creation."""
-    df = pd.DataFrame({
-        "Date": pd.date_range("2020-01-01", periods=30),
-        "Close": np.linspace(100, 130, 30)
-    })
-    df_features = add_return_and_rolling(df, target_col="Close", date_col="Date", rolling_windows=[5, 10])
+    df = pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=30),
+            "Close": np.linspace(100, 130, 30),
+        }
+    )
+    df_features = add_return_and_rolling(
+        df, target_col="Close", date_col="Date", rolling_windows=[5, 10]
+    )
     assert "return_1" in df_features.columns
     assert "roll_mean_5" in df_features.columns
     assert "roll_std_5" in df_features.columns
@@ -49,33 +58,112 @@ def test_prepare_features():
     data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
     df = load_data(data_path)
     dfp = prepare_features(df, target_col="Close", date_col="Date")
-    
+
     # Check that features were created
     assert "Close_lag_1" in dfp.columns
     assert "return_1_lag" in dfp.columns
     assert "roll_mean_5" in dfp.columns
     assert "target" in dfp.columns
-    
+
     # Check no NaN after dropna
     assert dfp.isna().sum().sum() == 0
-    
+
     # Check target is correctly shifted
     assert len(dfp) > 0
 
 
 def test_feature_no_leakage():
     """Test that features don't use future information."""
-    df = pd.DataFrame({
-        "Date": pd.date_range("2020-01-01", periods=10),
-        "Close": [100, 101, 102, 103, 104, 105, 106, 107, 108, 109]
-    })
+    df = pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=10),
+            "Close": [100, 101, 102, 103, 104, 105, 106, 107, 108, 109],
+        }
+    )
     dfp = prepare_features(df, target_col="Close", date_col="Date", dropna=False)
-    
+
     # Lag features should be NaN in first rows
     assert pd.isna(dfp["Close_lag_1"].iloc[0])
-    
+
     # Rolling features should be NaN in early rows
     assert pd.isna(dfp["roll_mean_5"].iloc[0])
-    
+
     # Target should be next day's close
     assert dfp["target"].iloc[0] == 101
+
+
+def test_prepare_panel_features_matches_per_symbol():
+    """Panel features equal prepare_features run symbol by symbol; windows never cross symbols."""
+    from src.data import prepare_panel_features
+    from src.synthetic import generate_ohlcv
+
+    df = generate_ohlcv(60, tickers=3, seed=1).sample(frac=1, random_state=0)
+    panel = prepare_panel_features(df, dropna=False)
+    for sym, group in df.groupby("Symbol"):
+        expected = prepare_features(
+            group.sort_values("Date").reset_index(drop=True),
+            dropna=False,
+            backend="pandas",
+        )
+        got = panel[panel["Symbol"] == sym].reset_index(drop=True)[expected.columns]
+        pd.testing.assert_frame_equal(
+            got, expected, check_exact=False, rtol=1e-9, atol=1e-12
+        )
+    assert len(prepare_panel_features(df)) == 3 * (60 - 21)
+
+
+def test_panel_rolling_state_restarts_per_symbol():
+    """A large-priced symbol earlier in the panel must not cost the next one precision."""
+    from src.data import prepare_panel_features
+    from src.synthetic import generate_ohlcv
+
+    big = generate_ohlcv(5000, seed=2, start_price=1e9).assign(Symbol="AAA")
+    small = generate_ohlcv(200, seed=3, start_price=1.0).assign(Symbol="BBB")
+    panel = prepare_panel_features(
+        pd.concat([big, small]), dropna=False, backend="numpy"
+    )
+    got = panel[panel["Symbol"] == "BBB"].reset_index(drop=True)
+    alone = prepare_panel_features(small, dropna=False, backend="numpy")
+    pd.testing.assert_frame_equal(got, alone, check_exact=True)
+
+
+def test_inference_matrix_matches_nan_mask():
+    """The analytic warm-up plus the NaN row filter drop exactly the rows training's dropna would."""
+    from src.data import feature_columns, inference_matrix
+
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    dfp = prepare_features(load_data(data_path), dropna=False)
+    dfp.loc[40, "Volume"] = np.nan  # a gap after the warm-up
+    features = feature_columns(dfp)
+    X, dates = inference_matrix(dfp, features)
+    expected = dfp[features].dropna()
+    assert X.dtype == np.float32 and X.flags["C_CONTIGUOUS"]
+    assert np.array_equal(X, expected.to_numpy(dtype=np.float32))
+    assert dates.index.equals(expected.index)
+    assert 40 not in dates.index
+
+
+def test_inference_matrix_rejects_feature_mismatch():
+    import pytest
+    from src.data import feature_columns, inference_matrix
+
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    dfp = prepare_features(load_data(data_path), dropna=False)
+    features = feature_columns(dfp)
+    with pytest.raises(ValueError, match="different order"):
+        inference_matrix(dfp, features[::-1])
+    # a raw column the model never saw is an error, not silently ignored
+    with pytest.raises(ValueError, match="unexpected \\['Adj Close'\\]"):
+        inference_matrix(dfp.assign(**{"Adj Close": dfp["Close"]}), features)
+
+
+def test_check_feature_order():
+    import pytest
+    from src.data import check_feature_order, engineered_feature_names
+
+    engineered = engineered_feature_names()
+    check_feature_order(["Open", "Close"] + engineered)
+    with pytest.raises(ValueError):
+        check_feature_order(["Open", "Close"] + engineered[::-1])
+    with pytest.raises(ValueError):
+        check_feature_order(None)
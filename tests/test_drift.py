@@ -0,0 +1,144 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import feature_columns, prepare_features
+from src.drift import DriftMonitor, RetrainTrigger, build_reference, ks, psi
+from src.serving import predict_records
+
+
+def _reference(rng, n=5000):
+    X = np.column_stack([rng.normal(size=n), rng.integers(0, 5, n)])
+    return build_reference(X, ["x", "weekday"], errors=rng.normal(scale=2.0, size=n))
+
+
+def test_same_distribution_does_not_drift():
+    rng = np.random.default_rng(0)
+    monitor = DriftMonitor(_reference(rng))
+    for _ in range(50):
+        monitor.update(np.column_stack([rng.normal(size=40), rng.integers(0, 5, 40)]))
+    report = monitor.report()
+    assert report["rows"] == 2000
+    assert (
+        report["features"]["x"]["psi"] < 0.05 and report["features"]["x"]["ks"] < 0.05
+    )
+    assert not report["drift"]
+    # counters stay one per reference bin however much traffic arrives
+    # 10 decile bins + a NaN bin for x; duplicate decile edges collapse for the discrete weekday
+    assert [len(c) for c in monitor.counts] == [11, 7]
+
+
+def test_shifted_feature_and_errors_drift():
+    rng = np.random.default_rng(1)
+    monitor = DriftMonitor(_reference(rng))
+    monitor.update(
+        np.column_stack([rng.normal(loc=1.0, size=500), rng.integers(0, 5, 500)])
+    )
+    errors = rng.normal(loc=1.0, scale=4.0, size=500)
+    for chunk in np.array_split(errors, 7):
+        monitor.update_errors(chunk)
+    report = monitor.report()
+    assert report["drifted_features"] == ["x"]
+    e = report["errors"]
+    assert e["count"] == 500
+    # Welford accumulators match a full pass over the raw errors
+    assert np.isclose(e["mean"], errors.mean(), atol=1e-4)
+    assert np.isclose(e["std"], errors.std(), atol=1e-4)
+    assert np.isclose(e["rmse"], np.sqrt(np.mean(errors**2)), atol=1e-4)
+    assert e["drift"] and report["drift"]
+    monitor.reset()
+    assert monitor.report()["rows"] == 0
+
+
+def test_psi_and_ks_from_histograms():
+    a = np.array([10, 20, 30, 40.0])
+    assert psi(a, a) == 0 and ks(a, a) == 0
+    assert ks(a, a[::-1]) > 0.3 and psi(a, a[::-1]) > 0.5
+
+
+def test_retrain_trigger_cooldown():
+    calls = []
+    trigger = RetrainTrigger(lambda: calls.append(1), cooldown=3600)
+    assert not trigger.check({"drift": False})
+    assert trigger.check({"drift": True})
+    assert not trigger.check({"drift": True})
+    assert len(calls) == 1
+    assert not RetrainTrigger(lambda: calls.append(1), enabled=False).check(
+        {"drift": True}
+    )
+
+
+def test_retrain_trigger_marker_is_shared_across_workers(tmp_path):
+    calls = []
+    marker = str(tmp_path / "models" / "retrain_marker.json")
+    workers = [
+        RetrainTrigger(lambda: calls.append(1), cooldown=3600, marker_path=marker)
+        for _ in range(3)
+    ]
+    assert [w.check({"drift": True}) for w in workers] == [True, False, False]
+    assert len(calls) == 1
+    assert workers[2].status()["last_triggered"] == workers[0].last_triggered
+    assert not os.path.exists(marker + ".lock")
+    # once the shared cooldown has passed, any worker may start the next run
+    expired = RetrainTrigger(lambda: calls.append(1), cooldown=0, marker_path=marker)
+    assert expired.check({"drift": True})
+    assert len(calls) == 2
+
+
+def test_retrain_trigger_skips_while_another_worker_holds_the_lock(tmp_path):
+    marker = str(tmp_path / "retrain_marker.json")
+    open(marker + ".lock", "w").close()
+    trigger = RetrainTrigger(lambda: None, cooldown=3600, marker_path=marker)
+    assert not trigger.check({"drift": True})
+    # a lock left behind by a dead process expires
+    os.utime(marker + ".lock", (0, 0))
+    assert not trigger.check({"drift": True})
+    assert trigger.check({"drift": True})
+
+
+class _LastClose:
+    def __init__(self, feature_names):
+        self.feature_names = feature_names
+
+    def predict(self, X):
+        return X[:, self.feature_names.index("Close")] + 1.0
+
+
+def test_predict_records_feeds_monitor_newest_rows():
+    df = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2023-01-02", periods=40),
+            "Close": np.arange(40, dtype=float),
+        }
+    )
+    features = feature_columns(prepare_features(df))
+    reference = build_reference(
+        np.arange(100.0)[:, None].repeat(len(features), 1),
+        features,
+        errors=np.zeros(10),
+    )
+    monitor = DriftMonitor(reference)
+    records = predict_records(_LastClose(features), df, monitor=monitor, monitor_rows=3)
+    assert len(records) > 3
+    assert monitor.rows == 3
+    # prediction (close + 1) equals the next close exactly for the rows whose next close is known
+    assert monitor.n_errors == 3 and monitor.error_abs_sum == 0
+
+
+def test_resubmitted_rows_counted_once_per_symbol():
+    monitor = DriftMonitor(_reference(np.random.default_rng(3)))
+    times = pd.date_range("2024-01-01", periods=4).to_numpy().repeat(2)
+    symbols = np.array(["AAA", "BBB"] * 4)
+    X = np.zeros((8, 2))
+    monitor.update(X[:6], times=times[:6], symbols=symbols[:6])
+    # overlapping history plus one new bar per symbol
+    monitor.update(X[2:], times=times[2:], symbols=symbols[2:])
+    assert monitor.report()["rows"] == 8
+    monitor.update_errors([1.0, np.nan], times=times[:2], symbols=symbols[:2])
+    # BBB's first error was NaN, so it still counts once it is known
+    monitor.update_errors([1.0, 1.0], times=times[:2], symbols=symbols[:2])
+    assert monitor.report()["errors"]["count"] == 2
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.compiled import load_predictor
+from src.data import load_data, prepare_features
+from src.ensemble import (
+    ABRouter,
+    EnsemblePredictor,
+    LinearPredictor,
+    ensemble_path_for,
+    stacking_weights,
+    train_ensemble,
+)
+from src.model import save_model
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+PARAMS = {"n_estimators": 20, "max_depth": 3, "learning_rate": 0.1}
+
+
+def _xy():
+    dfp = prepare_features(load_data(DATA_PATH))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    return dfp[features].select_dtypes(include=[np.number]), dfp["target"]
+
+
+def test_mean_ensemble_is_average_of_members():
+    X, y = _xy()
+    ensemble = train_ensemble(X, y, seeds=(0, 1), params=PARAMS)
+    assert ensemble.names == ["xgb_seed_0", "xgb_seed_1", "ridge"]
+    np.testing.assert_allclose(ensemble.weights, [1 / 3] * 3)
+    members = ensemble.predict_members(X)
+    np.testing.assert_allclose(ensemble.predict(X), members.mean(axis=1))
+    # seeds change the row/column subsampling, so members differ
+    assert not np.allclose(members[:, 0], members[:, 1])
+    # the parallel path gives the same answer as the inline one
+    ensemble.parallel_min_rows = 1
+    np.testing.assert_allclose(ensemble.predict_members(X), members)
+
+
+def test_members_split_the_cores():
+    X, y = _xy()
+    ensemble = train_ensemble(X, y, seeds=(0, 1), params=PARAMS)
+    expected = max(1, (os.cpu_count() or 1) // 2)
+    assert ensemble.threads_per_member == expected
+    for member in ensemble.members[:2]:
+        config = json.loads(member.booster.save_config())
+        assert int(config["learner"]["generic_param"]["nthread"]) == expected
+    pinned = EnsemblePredictor(
+        ensemble.members, ensemble.weights, ensemble.feature_names, threads_per_member=1
+    )
+    assert pinned.threads_per_member == 1
+
+
+def test_ensemble_path_follows_the_model_stem():
+    assert ensemble_path_for(
+        os.path.join("models", "xgb_model.joblib")
+    ) == os.path.join("models", "xgb_model_ensemble.joblib")
+    assert ensemble_path_for("other.joblib") != ensemble_path_for("xgb_model.joblib")
+
+
+def test_linear_member_matches_sklearn_pipeline():
+    X, y = _xy()
+    ridge = train_ensemble(X, y, seeds=(), params=PARAMS).members[0]
+    X_missing = X.to_numpy(dtype=np.float32)
+    X_missing[::5, 3] = np.nan
+    np.testing.assert_allclose(
+        ridge.predict(X_missing), ridge.model.predict(X_missing), rtol=1e-6, atol=1e-6
+    )
+
+
+def test_stacking_weights_favour_the_accurate_member():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=500)
+    predictions = np.column_stack(
+        [y + rng.normal(scale=0.1, size=500), rng.normal(size=500)]
+    )
+    weights = stacking_weights(predictions, y)
+    assert weights.sum() == 1.0 and (weights >= 0).all()
+    assert weights[0] > 0.9
+
+
+def test_ensemble_round_trips_through_load_predictor(tmp_path):
+    X, y = _xy()
+    ensemble = train_ensemble(X, y, seeds=(0,), params=PARAMS, combine="stack")
+    path = str(tmp_path / "xgb_ensemble.joblib")
+    save_model(ensemble.to_spec(), path)
+    loaded = load_predictor(path)
+    assert isinstance(loaded, EnsemblePredictor)
+    assert isinstance(loaded.members[1], LinearPredictor)
+    assert loaded.feature_names == list(X.columns)
+    np.testing.assert_allclose(loaded.weights, ensemble.weights)
+    np.testing.assert_allclose(
+        loaded.predict(X.to_numpy(dtype=np.float32)), ensemble.predict(X), rtol=1e-6
+    )
+
+
+def test_ab_router_splits_traffic():
+    router = ABRouter(0.25, seed=0)
+    arms = pd.Series([router.choose() for _ in range(4000)])
+    assert abs((arms == "candidate").mean() - 0.25) < 0.03
+    assert router.metrics()["requests"] == arms.value_counts().to_dict()
+    assert {ABRouter(0.0).choose() for _ in range(100)} == {"primary"}
@@ -0,0 +1,76 @@
+import os
+import sys
+import pandas as pd
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.evaluate import (
+    align_predictions,
+    evaluate_aligned,
+    rolling_metrics,
+    segment_metrics,
+)
+
+
+def test_segment_metrics_match_direct_computation():
+    rng = np.random.default_rng(0)
+    y_true = rng.uniform(90, 110, 200)
+    y_pred = y_true + rng.normal(0, 2, 200)
+    y_prev = y_true + rng.normal(0, 1, 200)
+    m = segment_metrics(y_true, y_pred, y_prev, starts=np.array([0, 50]))
+    for i, sl in enumerate([slice(0, 50), slice(50, 200)]):
+        err = y_pred[sl] - y_true[sl]
+        assert m["count"][i] == len(err)
+        assert np.isclose(m["rmse"][i], np.sqrt(np.mean(err**2)))
+        assert np.isclose(m["mae"][i], np.mean(np.abs(err)))
+        assert np.isclose(m["mape"][i], 100 * np.mean(np.abs(err) / y_true[sl]))
+        hits = np.sign(y_pred[sl] - y_prev[sl]) == np.sign(y_true[sl] - y_prev[sl])
+        assert np.isclose(m["directional_accuracy"][i], hits.mean())
+
+
+def test_rolling_metrics_do_not_cross_segments():
+    y_true = np.zeros(6)
+    y_pred = np.array([1.0, 2.0, 3.0, 1.0, 1.0, 1.0])
+    r = rolling_metrics(y_true, y_pred, window=2, starts=np.array([0, 3]))
+    mae = r["rolling_mae_2"]
+    assert np.isnan(mae[0]) and np.isnan(mae[3])
+    assert np.allclose(mae[[1, 2, 4, 5]], [1.5, 2.5, 1.0, 1.0])
+
+
+def test_align_predictions_uses_next_close_per_symbol():
+    actuals = pd.DataFrame(
+        {
+            "Symbol": ["A", "A", "A", "B", "B"],
+            "Date": pd.to_datetime(
+                ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-01", "2023-01-02"]
+            ),
+            "Close": [10.0, 11.0, 12.0, 50.0, 51.0],
+        }
+    )
+    preds = actuals[["Symbol", "Date"]].assign(predicted_next_day_close=1.0)
+    aligned = align_predictions(preds, actuals, symbol_col="Symbol")
+    # last row of each symbol has no realized next close
+    assert len(aligned) == 3
+    assert aligned.set_index(["Symbol", "Date"])["y_true"].tolist() == [
+        11.0,
+        12.0,
+        51.0,
+    ]
+
+
+def test_evaluate_aligned_report():
+    aligned = pd.DataFrame(
+        {
+            "Date": pd.date_range("2023-01-25", periods=20),
+            "y_true": np.linspace(100, 120, 20),
+            "y_pred": np.linspace(101, 121, 20),
+            "y_prev": np.linspace(99, 119, 20),
+        }
+    )
+    report, rows = evaluate_aligned(aligned, window=5)
+    assert report["overall"]["count"] == 20
+    assert np.isclose(report["overall"]["mae"], 1.0)
+    assert [p["period"] for p in report["periods"]] == ["2023-01", "2023-02"]
+    assert "rolling_rmse_5" in rows.columns
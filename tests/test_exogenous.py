@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import check_feature_order, prepare_features
+from src.exogenous import ExogenousStore, add_exogenous_features, load_exogenous
+
+
+def _side(dates, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {"Date": dates, "Close": 100 + np.cumsum(rng.normal(size=len(dates)))}
+    )
+
+
+def _target():
+    return pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2023-01-02", periods=60).as_unit("ns"),
+            "Close": np.linspace(100, 110, 60),
+        }
+    )
+
+
+def test_asof_join_matches_merge_asof():
+    df = _target()
+    store = ExogenousStore()
+    store.update("nifty", _side(pd.bdate_range("2023-01-02", periods=60), 0))
+    store.update("metal", _side(pd.bdate_range("2023-01-02", periods=60), 1))
+    # calendar days and a late start: a second calendar group with leading NaNs
+    store.update("ore", _side(pd.date_range("2023-01-10", periods=90), 2))
+    out = add_exogenous_features(df, store)
+    assert len(store.calendar_groups()) == 2
+    assert list(out.columns[2:]) == store.feature_names()
+    for name, side in [("nifty", 0), ("ore", 2)]:
+        dates, values = store.series[name]
+        right = pd.DataFrame({"Date": dates.view("datetime64[ns]"), "x": values[:, 0]})
+        expected = pd.merge_asof(df, right, on="Date")["x"]
+        np.testing.assert_allclose(out[f"{name}_level"], expected, equal_nan=True)
+    assert out["ore_level"].iloc[:5].isna().all()
+    # exogenous columns are raw columns ahead of prepare_features' columns
+    dfp = prepare_features(out)
+    check_feature_order([c for c in dfp.columns if c not in ["Date", "target"]])
+
+
+def test_asof_join_cannot_look_ahead():
+    df = _target()
+    late = _side(pd.bdate_range("2023-01-02", periods=60), 3)
+    store = ExogenousStore()
+    store.update("usdinr", late, publication_lag="16h")
+    out = add_exogenous_features(df, store)
+    # a value published 16h after its date is first usable on the next row
+    np.testing.assert_allclose(out["usdinr_level"].iloc[1:], late["Close"].iloc[:-1])
+    assert np.isnan(out["usdinr_level"].iloc[0])
+    stale = add_exogenous_features(
+        df.assign(Date=df["Date"] + pd.Timedelta("30D")), store, max_staleness="3D"
+    )
+    assert stale["usdinr_level"].iloc[-10:].isna().all()
+
+
+def test_incremental_update_and_cache(tmp_path):
+    side = _side(pd.bdate_range("2023-01-02", periods=60), 4)
+    full = ExogenousStore()
+    full.update("nifty", side)
+    store = ExogenousStore(str(tmp_path))
+    assert store.update("nifty", side.iloc[:40]) == 40
+    # overlapping rows are skipped, only the tail is derived and appended
+    assert store.update("nifty", side.iloc[30:]) == 20
+    assert store.update("nifty", side) == 0
+    np.testing.assert_allclose(
+        store.series["nifty"][1], full.series["nifty"][1], equal_nan=True
+    )
+    reloaded = ExogenousStore(str(tmp_path))
+    np.testing.assert_array_equal(reloaded.series["nifty"][0], full.series["nifty"][0])
+    path = str(tmp_path / "nifty.csv")
+    side.to_csv(path, index=False)
+    _, names = load_exogenous([f"nifty={path}"], cache_dir=str(tmp_path))
+    assert names == ["nifty"]
+
+
+def test_changed_source_file_rebuilds_cache(tmp_path):
+    path = str(tmp_path / "nifty.csv")
+    side = _side(pd.bdate_range("2023-01-02", periods=60), 4)
+    side.to_csv(path, index=False)
+    cache_dir = str(tmp_path / "cache")
+    store, _ = load_exogenous([f"nifty={path}"], cache_dir=cache_dir)
+    assert ExogenousStore(cache_dir).update_csv("nifty", path) == 0
+    # a vendor correction to history already in the cache
+    side.loc[10, "Close"] += 5
+    side.to_csv(path, index=False)
+    store, _ = load_exogenous([f"nifty={path}"], cache_dir=cache_dir)
+    assert store.series["nifty"][1][10, 0] == side.loc[10, "Close"]
+    # caches written before sources were recorded are rebuilt once
+    with open(os.path.join(cache_dir, "series.json"), "w") as f:
+        json.dump(["nifty"], f)
+    assert ExogenousStore(cache_dir).update_csv("nifty", path) == 60
+
+
+def test_appended_source_file_updates_incrementally(tmp_path):
+    path = str(tmp_path / "nifty.csv")
+    side = _side(pd.bdate_range("2023-01-02", periods=60), 4)
+    side.iloc[:40].to_csv(path, index=False)
+    cache_dir = str(tmp_path / "cache")
+    assert ExogenousStore(cache_dir).update_csv("nifty", path) == 40
+    # a daily append: only the new rows are derived, the cached history is kept
+    side.iloc[40:].to_csv(path, mode="a", header=False, index=False)
+    store = ExogenousStore(cache_dir)
+    assert store.update_csv("nifty", path) == 20
+    assert store.update_csv("nifty", path) == 0
+    full = ExogenousStore()
+    full.update("nifty", side)
+    np.testing.assert_allclose(
+        store.series["nifty"][1], full.series["nifty"][1], equal_nan=True
+    )
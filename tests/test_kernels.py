@@ -0,0 +1,68 @@
+import os
+import sys
+import pandas as pd
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import add_return_and_rolling, prepare_features
+from src.kernels import return_and_rolling_matrix
+from src.synthetic import generate_ohlcv
+
+
+def _frame(n=300):
+    df = generate_ohlcv(n, seed=3)
+    df.loc[50, "Close"] = np.nan  # NaNs must propagate exactly like pandas rolling
+    return df
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+def test_backend_matches_pandas(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    df = _frame()
+    expected = add_return_and_rolling(
+        df, rolling_windows=[3, 5, 20], returns_lags=[1, 2], backend="pandas"
+    )
+    result = add_return_and_rolling(
+        df, rolling_windows=[3, 5, 20], returns_lags=[1, 2], backend=backend
+    )
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(
+        result, expected, check_exact=False, rtol=1e-9, atol=1e-12
+    )
+
+
+def test_prepare_features_backends_agree():
+    df = _frame()
+    pd.testing.assert_frame_equal(
+        prepare_features(df, backend="numpy"),
+        prepare_features(df, backend="pandas"),
+        check_exact=False,
+        rtol=1e-9,
+        atol=1e-12,
+    )
+
+
+def test_prepare_features_defaults_to_pandas():
+    # "auto" is opt-in: the default must not change with whether numba is installed
+    df = _frame()
+    pd.testing.assert_frame_equal(
+        prepare_features(df), prepare_features(df, backend="pandas"), check_exact=True
+    )
+
+
+def test_short_series_is_all_nan():
+    names, out = return_and_rolling_matrix(
+        np.array([100.0, 101.0]), rolling_windows=[5]
+    )
+    assert out.shape == (2, len(names))
+    assert np.isnan(out[:, names.index("roll_mean_5")]).all()
+    assert np.isnan(out[:, names.index("mom_5")]).all()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        return_and_rolling_matrix(np.ones(10), backend="cuda")
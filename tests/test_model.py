@@ -1,16 +1,16 @@
 import os
 import sys
-import pandas as pd
 import numpy as np
 
 # Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.data import load_data, prepare_features
 
 # Try to import model functions
 try:
     from src.model import train_xgb, save_model, load_model
+
     XGBOOST_AVAILABLE = True
 except ImportError:
     XGBOOST_AVAILABLE = False
@@ -20,18 +20,19 @@ def test_pipeline_runs():
     """Test that the full pipeline runs end-to-end."""
     if not XGBOOST_AVAILABLE:
         import pytest
+
         pytest.skip("XGBoost not available")
-    
+
     data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
     df = load_data(data_path)
     dfp = prepare_features(df)
     features = [c for c in dfp.columns if c not in ["Date", "target"]]
     X = dfp[features].select_dtypes(include=[np.number])
     y = dfp["target"]
-    
+
     # Train with fewer splits for faster testing
     model, summary = train_xgb(X, y, n_splits=2)
-    
+
     assert "mean_rmse" in summary
     assert "mean_mae" in summary
     assert summary["mean_rmse"] > 0
@@ -44,31 +45,32 @@ def test_model_save_load():
     """Test model saving and loading."""
     if not XGBOOST_AVAILABLE:
         import pytest
+
         pytest.skip("XGBoost not available")
-    
+
     data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
     df = load_data(data_path)
     dfp = prepare_features(df)
     features = [c for c in dfp.columns if c not in ["Date", "target"]]
     X = dfp[features].select_dtypes(include=[np.number])
     y = dfp["target"]
-    
+
     # Train model
     model, _ = train_xgb(X, y, n_splits=2)
-    
+
     # Save model
     model_path = os.path.join(os.path.dirname(__file__), "test_model.joblib")
     save_model(model, model_path)
     assert os.path.exists(model_path)
-    
+
     # Load model
     loaded_model = load_model(model_path)
-    
+
     # Test predictions match
     pred1 = model.predict(X)
     pred2 = loaded_model.predict(X)
     assert np.allclose(pred1, pred2)
-    
+
     # Cleanup
     if os.path.exists(model_path):
         os.remove(model_path)
@@ -78,18 +80,85 @@ def test_predictions_reasonable():
     """Test that predictions are in a reasonable range."""
     if not XGBOOST_AVAILABLE:
         import pytest
+
         pytest.skip("XGBoost not available")
-    
+
     data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
     df = load_data(data_path)
     dfp = prepare_features(df)
     features = [c for c in dfp.columns if c not in ["Date", "target"]]
     X = dfp[features].select_dtypes(include=[np.number])
     y = dfp["target"]
-    
+
     model, _ = train_xgb(X, y, n_splits=2)
     predictions = model.predict(X)
-    
+
     # Predictions should be close to actual values
     assert predictions.min() > 0  # Prices should be positive
     assert np.abs(predictions.mean() - y.mean()) < y.std() * 2  # Reasonable range
+
+
+def test_cv_refits_with_chosen_rounds():
+    """The returned model is refit on all rows with the round count chosen by CV."""
+    if not XGBOOST_AVAILABLE:
+        import pytest
+
+        pytest.skip("XGBoost not available")
+
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    dfp = prepare_features(load_data(data_path))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    X = dfp[features].select_dtypes(include=[np.number])
+    y = dfp["target"]
+
+    model, summary = train_xgb(
+        X,
+        y,
+        n_splits=3,
+        params={"n_estimators": 300, "max_depth": 2, "learning_rate": 0.3},
+    )
+    assert 1 <= summary["n_estimators"] <= 300
+    assert model.get_booster().num_boosted_rounds() == summary["n_estimators"]
+    assert summary["std_rmse"] >= 0
+
+    _, grid_summary = train_xgb(
+        X, y, n_splits=3, param_grid=[{"max_depth": 2}, {"max_depth": 3}]
+    )
+    assert grid_summary["params"]["max_depth"] in (2, 3)
+
+
+def test_quantile_model_intervals():
+    """One multi-output booster yields ordered p10/p50/p90 for every row."""
+    if not XGBOOST_AVAILABLE:
+        import pytest
+
+        pytest.skip("XGBoost not available")
+    from src.model import train_quantile_xgb
+    from src.compiled import QuantilePredictor
+
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    dfp = prepare_features(load_data(data_path))
+    features = [c for c in dfp.columns if c not in ["Date", "target"]]
+    X = dfp[features].select_dtypes(include=[np.number])
+    y = dfp["target"]
+
+    predictor = QuantilePredictor(train_quantile_xgb(X, y, alphas=[0.9, 0.1, 0.5]))
+    assert predictor.columns == ["p90", "p10", "p50"]
+    q = predictor.predict(X.to_numpy())
+    assert q.shape == (len(X), 3)
+    assert (q[:, 1] <= q[:, 2]).all() and (q[:, 2] <= q[:, 0]).all()
+
+
+def test_time_folds_never_split_a_timestamp():
+    from src.model import time_folds
+
+    times = np.repeat(np.arange(20), 3)  # three symbols per timestamp, sorted by time
+    folds = time_folds(times, n_splits=4)
+    assert len(folds) == 4
+    for train_idx, test_idx in folds:
+        assert times[train_idx].max() < times[test_idx].min()
+        assert len(train_idx) % 3 == 0 and len(test_idx) % 3 == 0
+    import pytest
+
+    with pytest.raises(ValueError):
+        time_folds(times[::-1])
@@ -0,0 +1,168 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import prepare_features
+from src.model import save_model, train_xgb
+from src.registry import ModelRegistry
+from src.serving import ServingState
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_register_is_content_addressed(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    data = _write(tmp_path / "data.csv", "Date,Close\n2023-01-02,1\n")
+    a = _write(tmp_path / "a.joblib", "model a")
+    v1 = registry.register(a, data_path=data, metrics={"mean_rmse": 1.0})
+    # same bytes -> same version, nothing new stored
+    assert registry.register(a) == v1
+    assert len(registry.list_versions()) == 1
+    meta = registry.get(v1[:8])
+    assert meta["data_fingerprint"] and meta["metrics"] == {"mean_rmse": 1.0}
+    assert open(registry.model_path(v1)).read() == "model a"
+    with pytest.raises(KeyError):
+        registry.resolve("production")
+
+
+def test_promote_and_rollback(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    out_dir = tmp_path / "models"
+    v1 = registry.register(_write(tmp_path / "m.joblib", "one"))
+    registry.promote(v1)
+    v2 = registry.register(_write(tmp_path / "m.joblib", "two"))
+    registry.promote(v2)
+    registry.export("production", str(out_dir))
+    assert open(out_dir / "m.joblib").read() == "two"
+    registry.promote(v1)
+    registry.export("production", str(out_dir))
+    assert registry.resolve("production") == v1
+    assert open(out_dir / "m.joblib").read() == "one"
+    # the index follows versions registered by another process
+    other = ModelRegistry(registry.root)
+    other.register(_write(tmp_path / "m.joblib", "three"))
+    assert len(registry.list_versions()) == 3
+    assert not [f for f in os.listdir(out_dir) if f.startswith(".tmp-")]
+
+
+def test_alias_and_id_lookups_do_not_scan_versions(tmp_path, monkeypatch):
+    root = str(tmp_path / "registry")
+    registry = ModelRegistry(root)
+    for i in range(3):
+        version = registry.register(_write(tmp_path / "m.joblib", f"model {i}"))
+    registry.promote(version)
+
+    def no_listing(path):
+        raise AssertionError(f"listed {path}")
+
+    # a fresh registry, as each serving process has, resolves without listing versions/
+    monkeypatch.setattr(os, "listdir", no_listing)
+    fresh = ModelRegistry(root)
+    assert open(fresh.model_path()).read() == "model 2"
+    assert fresh.get(version)["version"] == version
+    with pytest.raises(KeyError):
+        fresh.promote("f" * 64)
+
+
+def test_export_removes_companions_of_other_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    out_dir = tmp_path / "models"
+    plain = registry.register(_write(tmp_path / "m.joblib", "plain"))
+    graph = _write(tmp_path / "m.onnx", "graph")
+    with_onnx = registry.register(
+        _write(tmp_path / "m.joblib", "compiled"), extra_paths=[graph]
+    )
+    registry.export(with_onnx, str(out_dir))
+    model_mtime = os.path.getmtime(out_dir / "m.joblib")
+    assert os.path.getmtime(out_dir / "m.onnx") == model_mtime
+    # roll back to a version without a graph: the newer graph must not linger next to it
+    os.utime(
+        tmp_path / "registry" / "versions" / plain / "m.joblib", (1_000_000, 1_000_000)
+    )
+    registry.export(plain, str(out_dir))
+    assert sorted(os.listdir(out_dir)) == ["m.joblib"]
+    # copies get fresh mtimes, not the stored file's
+    assert os.path.getmtime(out_dir / "m.joblib") >= model_mtime
+
+
+def test_concurrent_register_keeps_every_version(tmp_path):
+    import threading
+
+    root = str(tmp_path / "registry")
+    paths = [_write(tmp_path / f"m{i}.joblib", f"model {i}") for i in range(8)]
+    barrier = threading.Barrier(len(paths) + 1)
+
+    def worker(path):
+        barrier.wait()
+        # every thread registers its own model and one shared artifact
+        ModelRegistry(root).register(path)
+        ModelRegistry(root).register(paths[0])
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in paths + paths[:1]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(ModelRegistry(root).list_versions()) == len(paths)
+    assert not [
+        n for n in os.listdir(os.path.join(root, "versions")) if n.startswith(".")
+    ]
+
+
+def test_serving_state_pins_registry_version(tmp_path):
+    dates = pd.date_range("2020-01-01", periods=80)
+    df = pd.DataFrame(
+        {
+            "Date": dates,
+            "Close": 100 + np.cumsum(np.random.default_rng(0).normal(size=80)),
+        }
+    )
+    dfp = prepare_features(df)
+    X = dfp.drop(columns=["Date", "target"])
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    versions = []
+    for seed in (1, 2):
+        model, _ = train_xgb(
+            X,
+            dfp["target"],
+            n_splits=2,
+            params={"n_estimators": 5, "random_state": seed, "subsample": 0.5},
+        )
+        path = str(tmp_path / "xgb_model.joblib")
+        save_model(model, path)
+        versions.append(registry.register(path))
+    registry.promote(versions[0])
+    pinned = ServingState(
+        "unused.joblib", registry=registry, version=versions[1]
+    ).load()
+    following = ServingState(
+        "unused.joblib", registry=registry, version="production"
+    ).load()
+    assert pinned.model_path == registry.model_path(versions[1])
+    assert (
+        following.get_model() is not None
+        and following.model_path == registry.model_path(versions[0])
+    )
+    X32 = X.to_numpy(dtype=np.float32)
+    before = following.get_model().predict(X32)
+    registry.promote(versions[1])
+    after = following.get_model().predict(X32)
+    assert following.model_path == registry.model_path(versions[1])
+    # the alias switch swaps the model actually serving, not just the path
+    assert not np.allclose(before, after)
+    np.testing.assert_allclose(after, pinned.get_model().predict(X32))
+    assert (
+        ServingState("unused.joblib", registry=registry, version="staging")
+        .load()
+        .get_model()
+        is None
+    )
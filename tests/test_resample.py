@@ -0,0 +1,153 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import check_feature_order, engineered_feature_names
+from src.resample import (
+    add_intraday_calendar_features,
+    add_multi_frequency_features,
+    multi_frequency_names,
+    prepare_intraday_features,
+    resample_ohlcv,
+)
+
+
+def _minute_bars(days=6, symbols=("AAA", "BBB"), seed=0):
+    rng = np.random.default_rng(seed)
+    minutes = pd.to_timedelta(np.arange(555, 930), unit="min")  # 09:15 - 15:29
+    idx = (
+        pd.bdate_range("2024-01-01", periods=days).values[:, None]
+        + minutes.values[None, :]
+    ).ravel()
+    frames = []
+    for s in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, len(idx))))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Symbol": s,
+                    "Date": idx,
+                    "Open": close * (1 + rng.normal(0, 1e-4, len(idx))),
+                    "High": close * 1.001,
+                    "Low": close * 0.999,
+                    "Close": close,
+                    "Volume": rng.integers(1, 100, len(idx)),
+                }
+            )
+        )
+    # shuffled so resampling has to sort
+    return pd.concat(frames).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_resample_matches_pandas():
+    df = _minute_bars()
+    agg = {
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Volume": "sum",
+    }
+    for freq in ["5min", "1h", "1D"]:
+        out = resample_ohlcv(df, freq)
+        expected = (
+            df.set_index("Date")
+            .groupby("Symbol")
+            .resample(freq)
+            .agg(agg)
+            .dropna()
+            .reset_index()
+        )
+        assert list(out["Symbol"]) == list(expected["Symbol"])
+        assert (out["Date"].to_numpy() == expected["Date"].to_numpy()).all()
+        np.testing.assert_allclose(
+            out[list(agg)].to_numpy(float), expected[list(agg)].to_numpy(float)
+        )
+
+
+def test_resample_offset_and_single_series():
+    df = _minute_bars(days=1, symbols=("AAA",)).drop(columns="Symbol")
+    out = resample_ohlcv(df, "1h", offset="15min")
+    assert out["Date"].iloc[0] == pd.Timestamp("2024-01-01 09:15")
+    assert "Symbol" not in out.columns
+    assert out["Volume"].sum() == df["Volume"].sum()
+
+
+def test_multi_frequency_features_have_no_lookahead():
+    df = resample_ohlcv(_minute_bars(), "5min")
+    out = add_multi_frequency_features(df, ("1h", "1D"))
+    cut = pd.Timestamp("2024-01-04 11:30")
+    # rewrite every price from the cut onward; features before it must not change
+    future = df["Date"] >= cut
+    changed = df.copy()
+    changed.loc[future, ["Open", "High", "Low", "Close"]] *= 1.5
+    out_changed = add_multi_frequency_features(changed, ("1h", "1D"))
+    names = multi_frequency_names(("1h", "1D"))
+    before = out["Date"] < cut
+    pd.testing.assert_frame_equal(
+        out.loc[before, names], out_changed.loc[before, names]
+    )
+    # rows in the 11:00 hourly bar only see the 10:00 bar, even after the cut
+    row = out[(out["Symbol"] == "AAA") & (out["Date"] == cut)].iloc[0]
+    bars = resample_ohlcv(df[df["Symbol"] == "AAA"], "1h")
+    closes = bars.set_index("Date")["Close"]
+    expected = (
+        closes[pd.Timestamp("2024-01-04 10:00")]
+        / closes[pd.Timestamp("2024-01-04 09:00")]
+        - 1
+    )
+    assert np.isclose(row["ret_1h"], expected)
+    # the first day of each symbol has no completed daily bar
+    first_day = out["Date"] < pd.Timestamp("2024-01-02")
+    assert out.loc[first_day, "ret_1D"].isna().all()
+
+
+def test_intraday_calendar_and_pipeline():
+    bars = add_intraday_calendar_features(resample_ohlcv(_minute_bars(), "5min"))
+    assert bars["minute_of_day"].iloc[0] == 555
+    assert bars["bar_of_day"].max() == 74  # 75 five-minute bars per session
+    dfp = prepare_intraday_features(_minute_bars(), "5min", ("1h", "1D"))
+    assert len(dfp) and not dfp.isna().any().any()
+    features = [c for c in dfp.columns if c not in ["Date", "target", "Symbol"]]
+    check_feature_order(features)
+    assert features[-len(engineered_feature_names()) :] == engineered_feature_names()
+
+
+def test_inference_rows_match_training_rows():
+    """Inference keeps exactly the rows training keeps, context warm-up included."""
+    from src.data import feature_columns, inference_matrix
+
+    bars = _minute_bars()
+    train = prepare_intraday_features(bars, "5min", ("1h", "1D"))
+    full = prepare_intraday_features(bars, "5min", ("1h", "1D"), dropna=False)
+    X, dates = inference_matrix(full, feature_columns(full), warmup=0)
+    # training also drops each symbol's last bar, whose target is unknown
+    known = full.loc[dates.index, "target"].notna().to_numpy()
+    np.testing.assert_array_equal(
+        X[known], train[feature_columns(train)].to_numpy(dtype=np.float32)
+    )
+
+
+def test_exogenous_join_as_of_bar_end():
+    from src.exogenous import ExogenousStore
+
+    bars = _minute_bars(symbols=("AAA",))
+    side = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", "2024-01-09", freq="7min").as_unit("ns")}
+    )
+    side["Close"] = np.arange(len(side), dtype=float) + 1
+    store = ExogenousStore()
+    store.update("idx", side)
+    out = prepare_intraday_features(
+        bars, "1h", (), offset="15min", dropna=False, exogenous=(store, ["idx"])
+    )
+    # the last side value published before each bar closes, none from after it
+    ends = out["Date"] + pd.Timedelta("1h") - pd.Timedelta(1, "ns")
+    expected = pd.merge_asof(
+        pd.DataFrame({"end": ends}), side, left_on="end", right_on="Date"
+    )["Close"]
+    np.testing.assert_array_equal(out["idx_level"].to_numpy(), expected.to_numpy())
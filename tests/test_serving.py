@@ -0,0 +1,160 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving import ServingState, share_history
+
+
+def _anonymous_kb() -> int:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Anonymous:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _fork_workers(arrays, n_workers: int):
+    """Fork n workers that each read every shared array; return each worker's anonymous-memory growth (kB)."""
+    pipes = []
+    for _ in range(n_workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            before = _anonymous_kb()
+            total = sum(float(a.sum()) for a in arrays.values())
+            os.write(w, f"{_anonymous_kb() - before} {total}".encode())
+            os._exit(0)
+        os.close(w)
+        pipes.append((pid, r))
+    growth = []
+    for pid, r in pipes:
+        growth.append(int(os.read(r, 64).split()[0]))
+        os.close(r)
+        os.waitpid(pid, 0)
+    return growth
+
+
+def test_share_history_is_readonly_memmap(tmp_path):
+    df = pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=10),
+            "Close": np.arange(10, dtype=float),
+            "Symbol": ["TATASTEEL"] * 10,
+        }
+    )
+    arrays = share_history(df, str(tmp_path))
+    assert set(arrays) == {"Date", "Close"}
+    assert isinstance(arrays["Close"], np.memmap)
+    with pytest.raises(ValueError):
+        arrays["Close"][0] = 1.0
+
+
+def test_share_history_never_rewrites_mapped_files(tmp_path):
+    df = pd.DataFrame({"Close": np.arange(10, dtype=float)})
+    first = share_history(df, str(tmp_path))
+    path = str(tmp_path / "Close.npy")
+    stat = os.stat(path)
+    # a second worker sharing the same history leaves the file alone
+    share_history(df, str(tmp_path))
+    assert (os.stat(path).st_ino, os.stat(path).st_mtime_ns) == (
+        stat.st_ino,
+        stat.st_mtime_ns,
+    )
+    if os.name == "nt":
+        return  # Windows refuses to replace a file that is still mapped
+    # new history is renamed over it; the old mapping keeps reading its own copy
+    second = share_history(df.assign(Close=df["Close"] + 1), str(tmp_path))
+    assert first["Close"][0] == 0.0 and second["Close"][0] == 1.0
+    assert not [n for n in os.listdir(tmp_path) if n.startswith(".tmp-")]
+
+
+def test_serving_state_without_model(tmp_path):
+    state = ServingState(str(tmp_path / "missing.joblib")).load()
+    assert state.get_model() is None
+    assert state.history_frame() is None
+
+
+@pytest.mark.skipif(
+    not (hasattr(os, "fork") and os.path.exists("/proc/self/smaps_rollup")),
+    reason="needs Linux fork + smaps",
+)
+def test_worker_memory_flat_as_workers_added(tmp_path):
+    """Per-worker private memory stays flat when more workers read the shared history.
+
+    Each worker reads ~32 MB of history. If every worker held its own copy, each
+    would grow its anonymous memory by ~32 MB; with the memory-mapped arrays the pages
+    live in the shared page cache, so growth is a small constant regardless of worker count.
+    """
+    n = 4_000_000
+    df = pd.DataFrame({"Close": np.random.default_rng(0).random(n)})
+    arrays = share_history(df, str(tmp_path))
+    copy_kb = n * 8 // 1024
+    one = _fork_workers(arrays, 1)
+    four = _fork_workers(arrays, 4)
+    assert max(one) < copy_kb / 4
+    assert max(four) < copy_kb / 4
+
+
+def test_quantiles_ride_in_the_batch(tmp_path):
+    """ServingState.predict returns point and quantile columns together, so the batcher runs both once per batch."""
+    from src.batching import MicroBatcher
+    from src.compiled import quantile_path_for
+    from src.data import feature_columns, load_data, prepare_features
+    from src.model import save_model, train_quantile_xgb, train_xgb
+    from src.serving import predict_records
+
+    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    df = load_data(data_path)
+    dfp = prepare_features(df)
+    X, y = dfp[feature_columns(dfp)], dfp["target"]
+    model, _ = train_xgb(X, y, n_splits=2, params={"n_estimators": 10})
+    model_path = str(tmp_path / "point.joblib")
+    save_model(model, model_path)
+    assert quantile_path_for(model_path) == str(tmp_path / "point_quantile.joblib")
+    save_model(
+        train_quantile_xgb(X, y, params={"n_estimators": 10}),
+        quantile_path_for(model_path),
+    )
+
+    state = ServingState(model_path).load()
+    calls = []
+    quantile_predict = state.get_quantile_model().predict
+    state.quantile_model.predict = lambda X: calls.append(len(X)) or quantile_predict(X)
+    batcher = MicroBatcher(state.predict)
+    records = predict_records(
+        batcher,
+        df,
+        feature_names=X.columns.tolist(),
+        quantile_model=state.get_quantile_model(),
+    )
+    assert set(records[0]) == {"date", "predicted_close", "p10", "p50", "p90"}
+    assert calls == [len(records)]
+
+
+def test_model_with_exogenous_features_is_rejected(tmp_path):
+    from src.data import feature_columns, load_data, prepare_features
+    from src.exogenous import ExogenousStore, add_exogenous_features
+    from src.model import save_model, train_xgb
+
+    df = load_data(
+        os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    )
+    store = ExogenousStore()
+    store.update("nifty", df[["Date", "Close"]])
+    dfp = prepare_features(add_exogenous_features(df, store))
+    model, _ = train_xgb(
+        dfp[feature_columns(dfp)],
+        dfp["target"],
+        n_splits=2,
+        params={"n_estimators": 10},
+    )
+    model_path = str(tmp_path / "side.joblib")
+    save_model(model, model_path)
+    with pytest.raises(ValueError, match="exogenous series \\['nifty'\\]"):
+        ServingState(model_path).load()
@@ -0,0 +1,71 @@
+import os
+import sys
+import pandas as pd
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import load_data
+from src.synthetic import generate_ohlcv, iter_ohlcv, write_ohlcv
+
+
+def test_generate_shape_and_ohlc_consistency():
+    df = generate_ohlcv(500, tickers=3, freq="B", regimes=(0.01, 0.04), chunk_rows=128)
+    assert len(df) == 1500
+    assert list(df.columns) == [
+        "Symbol",
+        "Date",
+        "Open",
+        "High",
+        "Low",
+        "Close",
+        "Volume",
+    ]
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    assert (df["Low"] > 0).all()
+    # dates continue across chunk boundaries without gaps or repeats
+    dates = df.loc[df["Symbol"] == "SYM0000", "Date"]
+    assert dates.is_monotonic_increasing and dates.is_unique
+    assert dates.iloc[-1] == pd.bdate_range("2023-01-02", periods=500)[-1]
+
+
+def test_seed_reproducible():
+    a = generate_ohlcv(200, seed=7)
+    b = generate_ohlcv(200, seed=7)
+    c = generate_ohlcv(200, seed=8)
+    pd.testing.assert_frame_equal(a, b)
+    assert not np.allclose(a["Close"], c["Close"])
+
+
+def test_chunks_are_bounded():
+    sizes = [len(chunk) for chunk in iter_ohlcv(1000, tickers=2, chunk_rows=300)]
+    assert sizes == [300, 300, 300, 100] * 2
+
+
+def test_write_csv_streams_loadable_file(tmp_path):
+    path = str(tmp_path / "synthetic.csv")
+    assert write_ohlcv(path, 250, chunk_rows=100) == 250
+    df = load_data(path)
+    assert len(df) == 250
+    assert pd.api.types.is_datetime64_any_dtype(df["Date"])
+
+
+def test_default_is_plain_gbm():
+    base = generate_ohlcv(300, seed=5)
+    pd.testing.assert_frame_equal(base, generate_ohlcv(300, seed=5, reversion=0.0))
+    assert not np.allclose(
+        base["Close"], generate_ohlcv(300, seed=5, reversion=0.05)["Close"]
+    )
+
+
+def test_bar_dates_match_date_range():
+    from pandas.tseries.frequencies import to_offset
+    from src.synthetic import _bar_dates
+
+    for freq in ["D", "B", "2B", "5min", "W", "MS"]:
+        offset = to_offset(freq)
+        start = offset.rollforward(pd.Timestamp("2023-01-06 09:15"))
+        expected = pd.date_range(start + 37 * offset, periods=400, freq=offset)
+        assert _bar_dates(start, offset, 37, 400).equals(expected), freq
@@ -0,0 +1,89 @@
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import train
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+
+
+def _train(tmp_path, *extra):
+    out_dir = str(tmp_path / "models")
+    train.main(["--data", DATA_PATH, "--out_dir", out_dir, *extra])
+    return out_dir
+
+
+def test_onnx_export_failure_does_not_abort_training(tmp_path, monkeypatch):
+    def broken(model, path):
+        raise ValueError("unsupported operator")
+
+    monkeypatch.setattr(train, "export_onnx", broken)
+    out_dir = _train(tmp_path, "--quantiles")
+    assert os.path.exists(os.path.join(out_dir, "xgb_model.joblib"))
+    assert not os.path.exists(os.path.join(out_dir, "xgb_model.onnx"))
+
+
+def test_run_without_quantiles_removes_previous_intervals(tmp_path):
+    out_dir = _train(tmp_path, "--n_estimators", "20")
+    quantile_path = os.path.join(out_dir, "xgb_model_quantile.joblib")
+    assert os.path.exists(quantile_path)
+    _train(tmp_path, "--n_estimators", "20", "--quantiles")
+    assert not os.path.exists(quantile_path)
+
+
+def test_exogenous_series_survive_resampling(tmp_path):
+    import numpy as np
+    import pandas as pd
+    from predict import predict
+    from src.compiled import load_predictor
+
+    dates = pd.read_csv(DATA_PATH, usecols=["Date"])["Date"]
+    side = str(tmp_path / "nifty.csv")
+    pd.DataFrame({"Date": dates, "Close": np.linspace(100, 120, len(dates))}).to_csv(
+        side, index=False
+    )
+    flags = [
+        "--resample",
+        "1D",
+        "--context_freqs",
+        "--exogenous",
+        f"nifty={side}",
+        "--quantiles",
+    ]
+    out_dir = _train(tmp_path, "--n_estimators", "20", *flags)
+    model_path = os.path.join(out_dir, "xgb_model.joblib")
+    assert {"nifty_level", "nifty_ret_1"} <= set(
+        load_predictor(model_path).feature_names
+    )
+    results = predict(
+        model_path,
+        DATA_PATH,
+        resample="1D",
+        context_freqs=(),
+        exogenous=[f"nifty={side}"],
+    )
+    assert len(results) and results["predicted_next_bar_close"].notna().all()
+
+
+def test_ensemble_companions_belong_to_their_own_model(tmp_path):
+    from src.ensemble import ensemble_path_for
+    from src.serving import ServingState
+
+    out_dir = _train(
+        tmp_path,
+        "--n_estimators",
+        "20",
+        "--quantiles",
+        "--ensemble",
+        "--ensemble_seeds",
+        "0",
+    )
+    model_path = os.path.join(out_dir, "xgb_model.joblib")
+    ensemble_path = ensemble_path_for(model_path)
+    assert ServingState(model_path).load().get_monitor() is not None
+    # the candidate does not borrow the primary model's drift reference
+    assert ServingState(ensemble_path).load().get_monitor() is None
+    _train(tmp_path, "--n_estimators", "20", "--quantiles")
+    assert not os.path.exists(ensemble_path)
@@ -0,0 +1,98 @@
+import os
+import sys
+import warnings
+import pandas as pd
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data import load_data
+from src.validation import validate_ohlcv
+
+
+def _bad_frame():
+    dates = pd.bdate_range("2023-01-02", periods=10)
+    df = pd.DataFrame(
+        {
+            "Date": dates,
+            "Open": np.linspace(100, 109, 10),
+            "High": np.linspace(101, 110, 10),
+            "Low": np.linspace(99, 108, 10),
+            "Close": np.linspace(100.5, 109.5, 10),
+            "Volume": 1000,
+        }
+    )
+    df.loc[3, "High"] = 90.0  # High below Low / Open / Close
+    df.loc[5, "Close"] = -1.0  # non-positive price
+    df = df.drop(index=7)  # missing trading day
+    dup = df.iloc[[1]].assign(
+        Close=101.7
+    )  # duplicate timestamp, last row in the file wins
+    df = pd.concat([df, dup]).reset_index(drop=True)
+    return df.iloc[[1, 0] + list(range(2, len(df)))].reset_index(drop=True)
+
+
+def test_validate_reports_issues():
+    df, report = validate_ohlcv(_bad_frame())
+    assert report["duplicate_timestamps"] == 1
+    assert report["non_positive_prices"] == 1
+    assert report["ohlc_inconsistent"] == 1
+    assert report["missing_trading_days"] == 1
+    assert report["out_of_order"] > 0
+    assert not report["ok"] and not report["repaired"]
+    assert df["Date"].is_monotonic_increasing
+
+
+def test_validate_repair():
+    df, report = validate_ohlcv(_bad_frame(), repair=True)
+    assert (
+        report["repaired"] and report["rows_dropped"] == 2 and report["rows_fixed"] == 1
+    )
+    assert df["Date"].is_unique and df["Date"].is_monotonic_increasing
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert (df[["Open", "High", "Low", "Close"]] > 0).all().all()
+    assert df.loc[df["Date"] == pd.Timestamp("2023-01-03"), "Close"].item() == 101.7
+    assert validate_ohlcv(df)[1]["ok"]
+
+
+def test_validate_per_symbol_and_outliers():
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 50)))
+    a = pd.DataFrame(
+        {
+            "Symbol": "A",
+            "Date": pd.bdate_range("2023-01-02", periods=50),
+            "Close": close,
+        }
+    )
+    b = a.assign(Symbol="B")
+    b.loc[25, "Close"] *= 3  # one spike: jump up and back down
+    _, report = validate_ohlcv(pd.concat([a, b]))
+    # same dates in two symbols are not duplicates
+    assert report["duplicate_timestamps"] == 0
+    assert report["outlier_returns"] == 2
+
+
+def test_load_data_modes(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    _bad_frame().to_csv(path, index=False)
+    with pytest.warns(UserWarning):
+        df = load_data(path, validation="report")
+    assert df.attrs["validation"]["duplicate_timestamps"] == 1
+    with pytest.raises(ValueError):
+        load_data(path, validation="raise")
+    assert len(load_data(path, validation="repair")) == 8
+    assert "validation" not in load_data(path, validation="off").attrs
+    # validation is opt-in: plain loads (e.g. every API request) neither check nor warn
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert "validation" not in load_data(path).attrs
+
+
+def test_sample_data_is_valid():
+    path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_data.csv")
+    report = load_data(path, validation="report").attrs["validation"]
+    assert report["ok"]
+    assert report["duplicate_timestamps"] == 0
@@ -1,36 +1,160 @@
 import argparse
 import os
-import json
+import shutil
+import tempfile
 import numpy as np
-from src.data import load_data, prepare_features
-from src.model import train_xgb, save_model, explain_model
+from sklearn.base import clone
+from src.data import LAGS, RETURNS_LAGS, ROLLING_WINDOWS, feature_columns, load_data, prepare_features
+from src.exogenous import add_exogenous_features, load_exogenous
+from src.resample import prepare_intraday_features
+from src.model import DEFAULT_PARAMS, train_xgb, train_quantile_xgb, save_model, explain_model
+from src.compiled import export_onnx, onnx_path_for, quantile_path_for
+from src.drift import build_reference, reference_path_for, save_reference
+from src.ensemble import COMBINE_MODES, ensemble_path_for, train_ensemble
+from src.memprofile import MemoryProfiler, stage
+from src.registry import ModelRegistry, atomic_write_json
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Train XGBoost on stock data")
     parser.add_argument("--data", required=True, help="Path to CSV data")
     parser.add_argument("--date_col", default="Date")
     parser.add_argument("--target", default="Close")
     parser.add_argument("--out_dir", default="models")
-    args = parser.parse_args()
+    parser.add_argument("--registry", default=None, help="Model registry directory (default: <out_dir>/registry)")
+    parser.add_argument("--no_promote", action="store_true",
+                        help="Register the new version without promoting it or replacing the files in out_dir")
+    parser.add_argument("--validation", default="report", choices=["off", "report", "raise", "repair"],
+                        help="How to handle duplicate timestamps and bad prices in the data")
+    parser.add_argument("--resample", default=None,
+                        help="Resample intraday bars to this frequency (e.g. 5min, 1h) and forecast the next bar")
+    parser.add_argument("--context_freqs", nargs="*", default=["1h", "1D"],
+                        help="Coarser bar frequencies added as features when resampling")
+    parser.add_argument("--exogenous", nargs="*", default=[], metavar="NAME=CSV",
+                        help="Side series joined as of each row's date (each bar's end when resampling), "
+                             "e.g. nifty=data/nifty.csv usdinr=data/usdinr.csv")
+    parser.add_argument("--n_estimators", type=int, default=DEFAULT_PARAMS["n_estimators"],
+                        help="Maximum boosting rounds; CV early stopping picks the count every model uses")
+    parser.add_argument("--max_depth", type=int, default=DEFAULT_PARAMS["max_depth"])
+    parser.add_argument("--learning_rate", type=float, default=DEFAULT_PARAMS["learning_rate"])
+    parser.add_argument("--quantiles", type=float, nargs="*", default=[0.1, 0.5, 0.9],
+                        help="Quantiles for prediction intervals (pass none to skip the quantile model)")
+    parser.add_argument("--ensemble", action="store_true",
+                        help="Also train a seed-bagged XGBoost + Ridge ensemble (serve it with MODEL_PATH=<out_dir>/xgb_model_ensemble.joblib)")
+    parser.add_argument("--ensemble_seeds", type=int, nargs="+", default=[0, 1, 2],
+                        help="One XGBoost ensemble member per seed")
+    parser.add_argument("--ensemble_combine", default="mean", choices=COMBINE_MODES,
+                        help="Average members, or fit non-negative stacking weights on a holdout")
+    parser.add_argument("--memprofile", nargs="?", const="memprofile.json", default=None, metavar="PATH",
+                        help="Record per-stage memory (tracemalloc + RSS) and write it to PATH (.json or .html)")
+    args = parser.parse_args(argv)
 
+    if args.memprofile:
+        profiler = MemoryProfiler().start()
+        try:
+            run(args)
+        finally:
+            profiler.stop()
+            print(profiler.summary())
+            print("Memory profile saved to", profiler.write(args.memprofile))
+    else:
+        run(args)
+
+
+def build_features(df, args):
+    """Feature frame for training and the names of the side series joined to it."""
+    side = None
+    if args.exogenous:
+        side = load_exogenous(args.exogenous, cache_dir=os.path.join(args.out_dir, "exogenous_cache"))
+    if args.resample:
+        # side series join the resampled bars, not the raw rows resampling would drop them from
+        dfp = prepare_intraday_features(
+            df, args.resample, args.context_freqs, target_col=args.target, date_col=args.date_col, exogenous=side
+        )
+        # panels come out grouped by symbol; CV and the holdouts below need time order
+        dfp = dfp.sort_values([c for c in (args.date_col, "Symbol") if c in dfp.columns], kind="stable")
+        return dfp.reset_index(drop=True), side[1] if side else []
+    if side:
+        df = add_exogenous_features(df, *side, date_col=args.date_col)
+    return prepare_features(df, target_col=args.target, date_col=args.date_col), side[1] if side else []
+
+
+def run(args):
     os.makedirs(args.out_dir, exist_ok=True)
-    df = load_data(args.data, date_col=args.date_col)
-    dfp = prepare_features(df, target_col=args.target, date_col=args.date_col)
-    # exclude date column and the target column
-    features = [c for c in dfp.columns if c not in [args.date_col, "target"]]
-    X = dfp[features].select_dtypes(include=[np.number])
-    y = dfp["target"]
-    model, summary = train_xgb(X, y)
-    model_path = os.path.join(args.out_dir, "xgb_model.joblib")
-    save_model(model, model_path)
-    # save metrics
-    metrics_path = os.path.join(args.out_dir, "metrics.json")
-    with open(metrics_path, "w") as f:
-        json.dump(summary, f, indent=2)
+    with stage("load_data"):
+        df = load_data(args.data, date_col=args.date_col, validation=args.validation)
+    with stage("features"):
+        dfp, exogenous = build_features(df, args)
+        # numeric columns except the date and target, the same list inference_matrix checks
+        X = dfp[feature_columns(dfp, args.date_col)]
+        y = dfp["target"]
+    with stage("train"):
+        params = {"n_estimators": args.n_estimators, "max_depth": args.max_depth, "learning_rate": args.learning_rate}
+        model, summary = train_xgb(X, y, params=params, times=dfp[args.date_col].to_numpy())
+    # companion models reuse the point model's hyperparameters and the round count CV chose
+    params = {**params, "n_estimators": summary["n_estimators"]}
+    # write artifacts to a staging dir; out_dir only ever receives complete files via the registry
+    staging = tempfile.mkdtemp(dir=args.out_dir, prefix=".train-")
+    try:
+        model_path = os.path.join(staging, "xgb_model.joblib")
+        save_model(model, model_path)
+        # compiled inference graph, picked up automatically by predict.py and the API
+        with stage("onnx_export"):
+            try:
+                print("Exported ONNX model to", export_onnx(model, onnx_path_for(model_path)))
+            except RuntimeError:
+                print("onnxmltools is not available; skipping ONNX export (install onnxmltools, onnx and onnxruntime to enable).")
+            except Exception as e:
+                # a converter failure must not throw away the fitted booster; serving falls back to it
+                print(f"ONNX export failed ({type(e).__name__}: {e}); continuing without the compiled graph.")
+        if args.quantiles:
+            with stage("quantile_model"):
+                quantile_model = train_quantile_xgb(X, y, alphas=args.quantiles, params=params)
+            save_model(quantile_model, quantile_path_for(model_path))
+        if args.ensemble:
+            with stage("ensemble"):
+                ensemble = train_ensemble(
+                    X, y, seeds=args.ensemble_seeds, combine=args.ensemble_combine, params=params
+                )
+            save_model(ensemble.to_spec(), ensemble_path_for(model_path))
+            print("Ensemble members:", dict(zip(ensemble.names, np.round(ensemble.weights, 3).tolist())))
+        with stage("drift_reference"):
+            # serving compares live features and realized errors to these fixed-bin histograms;
+            # errors come from a holdout fit so they are out of sample like live ones
+            cut = int(len(X) * 0.8)
+            holdout = clone(model).fit(X.iloc[:cut], y.iloc[:cut], verbose=False)
+            errors = holdout.predict(X.iloc[cut:]) - y.iloc[cut:].to_numpy()
+            save_reference(build_reference(X, list(X.columns), errors), reference_path_for(model_path))
+        registry = ModelRegistry(args.registry or os.path.join(args.out_dir, "registry"))
+        version = registry.register(
+            model_path,
+            extra_paths=[
+                onnx_path_for(model_path), quantile_path_for(model_path),
+                reference_path_for(model_path), ensemble_path_for(model_path),
+            ],
+            data_path=args.data,
+            feature_config={
+                "target": args.target, "features": list(X.columns), "lags": LAGS,
+                "returns_lags": RETURNS_LAGS, "rolling_windows": ROLLING_WINDOWS, "quantiles": args.quantiles,
+                "resample": args.resample, "context_freqs": args.context_freqs if args.resample else None,
+                "exogenous": exogenous,
+            },
+            metrics=summary,
+        )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    print("Registered model version", version)
+    if not args.no_promote:
+        registry.promote(version)
+        # also removes companions (quantiles, ensemble, ...) from earlier runs that this one lacks
+        registry.export(version, args.out_dir)
+        # save metrics
+        atomic_write_json(os.path.join(args.out_dir, "metrics.json"), summary)
+        print("Promoted", version[:12], "and updated", args.out_dir)
     print("Training summary:", summary)
     # explain top features on last 100 rows
-    shap_df = explain_model(model, X.tail(100))
+    with stage("shap"):
+        shap_df = explain_model(model, X.tail(100))
     if shap_df is not None:
         print("Top SHAP features:\n", shap_df)
     else: